@@ -1,21 +1,27 @@
-import google.generativeai as genai
 import re
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import os
 from dotenv import load_dotenv
 import ast
 import json
 from datetime import datetime
 
+from key_pool import register_api_key
+from llm_gateway import generate
+from tracing import trace_span
+from stream_parser import iter_response_text, stream_list_items
+from plan_structure import PlanMilestone, PlanStructure, as_plan_structure, milestone_markdown, parse_action_plan, patch_milestones
+
 
 class ActionPlanAssistant:
     def __init__(self, api_key: str = None, model: str = 'gemini-2.0-flash'):
         load_dotenv()
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.model = model
-        genai.configure(api_key=self.api_key)
+        # Keys live in the shared pool, each with its own client; genai.configure is process-global
+        register_api_key(self.api_key)
 
-    def _create_adaptive_plan(self, career_paths: List[str], current_skills: List[str], personality_profile: Dict) -> str:
+    def _create_adaptive_plan(self, career_paths: List[str], current_skills: List[str], personality_profile: Dict, on_chunk: Callable[[str], None] = None) -> str:
         """Create an adaptive action plan that can be updated based on user progress"""
         prompt = (
             f"SYSTEM: You are a certified career mentor AI powered by a global L&D engine.\n\n"
@@ -38,12 +44,17 @@ class ActionPlanAssistant:
             f"FORMAT: Use markdown with clear sections, timelines, and measurable goals. Make it actionable and trackable."
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
+        # Stream the plan so callers can forward markdown as it is written
+        response = generate(self.model, prompt, stream=True)
+        chunks = []
+        for text in iter_response_text(response):
+            chunks.append(text)
+            if on_chunk:
+                on_chunk(text)
         
-        return response.text.strip()
+        return "".join(chunks).strip()
 
-    def _identify_skill_gaps(self, career_paths: List[str], current_skills: List[str]) -> List[str]:
+    def _identify_skill_gaps(self, career_paths: List[str], current_skills: List[str], on_item: Callable[[str], None] = None) -> List[str]:
         """Identify specific skill gaps for the chosen career paths"""
         prompt = (
             f"SYSTEM: You are a precision skill auditor AI used in Fortune 500 hiring platforms.\n\n"
@@ -58,28 +69,156 @@ class ActionPlanAssistant:
             f"OUTPUT: Return a Python list of specific skill names that need to be addressed."
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
+        def _emit_gap(gap):
+            if on_item and gap and str(gap).lower() not in ["none", "undefined", "n/a"]:
+                on_item(gap)
         
-        try:
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+        with trace_span("skill_gaps", parse_outcome="stream") as span:
+            response = generate(self.model, prompt, stream=True)
+            skill_gaps, raw_text = stream_list_items(iter_response_text(response), _emit_gap)
+            
+            if skill_gaps is None:
+                try:
+                    text = raw_text.strip()
+                    if text.startswith('```'):
+                        text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                    
+                    skill_gaps = ast.literal_eval(text)
+                    span.set(parse_outcome="literal")
+                    if not isinstance(skill_gaps, list):
+                        span.set(parse_outcome="fallback")
+                        skill_gaps = [text]
+                except Exception:
+                    span.set(parse_outcome="fallback")
+                    skill_gaps = ["Technical skills", "Leadership skills", "Industry knowledge"]
             
-            skill_gaps = ast.literal_eval(text)
-            if not isinstance(skill_gaps, list):
-                skill_gaps = [text]
-        except Exception:
-            skill_gaps = ["Technical skills", "Leadership skills", "Industry knowledge"]
+            skill_gaps = [gap for gap in skill_gaps if gap and str(gap).lower() not in ["none", "undefined", "n/a"]]
+            span.set(items=len(skill_gaps))
+        return skill_gaps
+
+    def _affected_milestones(self, plan_structure: PlanStructure, skills: List[str]) -> List[PlanMilestone]:
+        """Find the milestones whose title or tasks mention any of the given skills"""
+        affected = []
+        for milestone in plan_structure.milestones:
+            haystack = ' '.join([milestone.title] + milestone.tasks).lower()
+            for skill in skills:
+                phrase = str(skill).lower().strip()
+                words = [w for w in re.findall(r'[a-z0-9+#]+', phrase) if len(w) > 2]
+                if phrase and (phrase in haystack or (words and all(w in haystack for w in words[:3]))):
+                    affected.append(milestone)
+                    break
+        return affected
+
+    def _update_sections(self, input: Dict, plan_structure: PlanStructure) -> Optional[Dict]:
+        """Regenerate only the monthly sections touched by newly completed skills and patch them into the plan.
+
+        Returns None when the model's 'sections' is not a month mapping, so the caller can revise the whole plan.
+        """
+        completed_skills = input.get('completed_skills', [])
+        previous_skills = input.get('previous_completed_skills', [])
+        remaining_skills = input.get('remaining_skills', [])
+        current_plan = input.get('current_plan', '')
+        career_paths = input.get('career_paths', [])
+        
+        new_skills = [skill for skill in completed_skills if skill not in previous_skills]
+        affected = self._affected_milestones(plan_structure, new_skills)
+        progress_percentage = len(completed_skills) / max(len(completed_skills) + len(remaining_skills), 1) * 100
+        update_result = {
+            'updated_plan': current_plan,
+            'updated_sections': [],
+            'new_recommendations': [f"Focus next on {skill}" for skill in remaining_skills[:3]] or ['Continue with current plan'],
+            'progress_percentage': progress_percentage,
+            'plan_structure': plan_structure
+        }
+        if not affected:
+            return update_result
         
-        return [gap for gap in skill_gaps if gap and str(gap).lower() not in ["none", "undefined", "n/a"]]
+        sections = "\n\n".join(milestone_markdown(current_plan, m) for m in affected)
+        prompt = (
+            f"SYSTEM: You are an intelligent roadmap optimizer AI.\n\n"
+            f"TASK: The user just completed some skills. Rewrite ONLY the monthly sections below to reflect that progress.\n\n"
+            f"INPUT:\n"
+            f"Newly_Completed_Skills: {new_skills}\n"
+            f"Remaining_Skills: {remaining_skills}\n"
+            f"Career_Paths: {career_paths}\n"
+            f"Sections_To_Update:\n{sections}\n\n"
+            f"OUTPUT: Return a Python dict with keys:\n"
+            f"- 'sections': dict mapping each month number (int) to its rewritten markdown section, starting with the original month heading line\n"
+            f"- 'new_recommendations': list of 3-5 new action items based on progress\n"
+            f"- 'motivation_message': personalized encouragement message\n\n"
+            f"INSTRUCTIONS:\n"
+            f"1. Keep each section's heading format and roughly its length\n"
+            f"2. Replace tasks for completed skills with next-level goals toward the remaining skills\n"
+            f"3. Do not return sections that were not given"
+        )
+        
+        with trace_span("progress_sections") as span:
+            response = generate(self.model, prompt)
+            
+            try:
+                text = response.text.strip()
+                if text.startswith('```'):
+                    text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                
+                section_result = ast.literal_eval(text)
+                if not isinstance(section_result, dict):
+                    span.set(parse_outcome="fallback")
+                    return update_result
+            except Exception:
+                span.set(parse_outcome="fallback")
+                return update_result
+            sections = section_result.get('sections')
+            if not isinstance(sections, dict):
+                # A list or string of sections cannot be matched to months
+                span.set(parse_outcome="fallback")
+                return None
+            span.set(parse_outcome="literal", sections=len(affected))
+        
+        replacements = {}
+        for milestone in affected:
+            section = sections.get(milestone.month) or sections.get(str(milestone.month))
+            if not section or not str(section).strip():
+                continue
+            section = str(section).strip()
+            # Keep the original heading if the model dropped it, so the plan stays scannable
+            heading = milestone_markdown(current_plan, milestone).splitlines()[0]
+            if parse_action_plan(section.splitlines()[0]).milestone(milestone.month) is None:
+                section = f"{heading}\n{section}"
+            replacements[milestone.month] = section
+        
+        updated_plan = patch_milestones(current_plan, plan_structure, replacements)
+        update_result.update({
+            'updated_plan': updated_plan,
+            'updated_sections': sorted(replacements),
+            'plan_structure': parse_action_plan(updated_plan)
+        })
+        if section_result.get('new_recommendations'):
+            update_result['new_recommendations'] = section_result['new_recommendations']
+        if section_result.get('motivation_message'):
+            update_result['motivation_message'] = section_result['motivation_message']
+        return update_result
 
     def update_progress(self, input: Dict) -> Dict:
-        """Update action plan based on user progress feedback"""
+        """Update action plan based on user progress feedback.
+
+        In the default 'incremental' mode only the monthly sections affected by newly completed skills
+        (those not in 'previous_completed_skills') are regenerated and patched into 'current_plan'.
+        Mode 'full' asks the model to revise the whole plan from its outline.
+        """
         completed_skills = input.get('completed_skills', [])
         current_plan = input.get('current_plan', '')
         career_paths = input.get('career_paths', [])
         remaining_skills = input.get('remaining_skills', [])
+        # Send the plan's compact structure rather than a truncated slice of its markdown
+        plan_structure = as_plan_structure(input.get('plan_structure')) or parse_action_plan(current_plan)
+        if input.get('mode', 'incremental') == 'incremental' and plan_structure.milestones:
+            if not any(m.end_line for m in plan_structure.milestones):
+                # Structures restored from older exports carry no line spans to patch against
+                plan_structure = parse_action_plan(current_plan)
+            update_result = self._update_sections(input, plan_structure)
+            if update_result is not None:
+                return update_result
+        plan_outline = plan_structure.to_prompt() or current_plan[:500]
         
         prompt = (
             f"SYSTEM: You are an intelligent roadmap optimizer AI.\n\n"
@@ -88,7 +227,7 @@ class ActionPlanAssistant:
             f"Completed_Skills: {completed_skills}\n"
             f"Remaining_Skills: {remaining_skills}\n"
             f"Career_Paths: {career_paths}\n"
-            f"Current_Plan: {current_plan[:500]}...\n\n"
+            f"Current_Plan_Outline:\n{plan_outline}\n\n"
             f"OUTPUT: Return a Python dict with keys:\n"
             f"- 'updated_plan': markdown string with the revised plan\n"
             f"- 'new_recommendations': list of 3-5 new action items based on progress\n"
@@ -101,40 +240,56 @@ class ActionPlanAssistant:
             f"4. Provide motivation and next steps"
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
-        
-        try:
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+        with trace_span("progress_update") as span:
+            response = generate(self.model, prompt)
             
-            update_result = ast.literal_eval(text)
-            if not isinstance(update_result, dict):
-                update_result = {
-                    'updated_plan': text,
-                    'new_recommendations': ['Continue with current plan'],
-                    'progress_percentage': len(completed_skills) / max(len(completed_skills) + len(remaining_skills), 1) * 100
-                }
-        except Exception:
+            try:
+                text = response.text.strip()
+                if text.startswith('```'):
+                    text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                
+                update_result = ast.literal_eval(text)
+                span.set(parse_outcome="literal")
+                if not isinstance(update_result, dict) or not isinstance(update_result.get('updated_plan'), str) \
+                        or not update_result['updated_plan'].strip():
+                    span.set(parse_outcome="text")
+                    update_result = None
+            except Exception:
+                span.set(parse_outcome="fallback")
+                update_result = None
+        
+        if update_result is None:
+            # An unusable reply must never replace the user's plan; hand back the current one unchanged
             update_result = {
-                'updated_plan': f"Great progress on completing: {', '.join(completed_skills)}. Continue focusing on: {', '.join(remaining_skills[:3])}",
-                'new_recommendations': ['Continue with current plan', 'Consider advanced courses'],
+                'updated_plan': current_plan,
+                'plan_unchanged': True,
+                'new_recommendations': [f"Focus next on {skill}" for skill in remaining_skills[:3]] or ['Continue with current plan'],
                 'progress_percentage': len(completed_skills) / max(len(completed_skills) + len(remaining_skills), 1) * 100
             }
-        
+        update_result['plan_structure'] = parse_action_plan(update_result['updated_plan'])
         return update_result
 
-    def run(self, input: Dict) -> Dict:
+    def run(self, input: Dict, on_item: Callable[[str, str], None] = None, on_stage: Callable[[str, object], None] = None) -> Dict:
         career_paths = input.get('career_paths', [])
         current_skills = input.get('current_skills', [])
         personality_profile = input.get('personality_profile', {})
         
-        # Create adaptive action plan
-        action_plan = self._create_adaptive_plan(career_paths, current_skills, personality_profile)
+        # Create adaptive action plan and parse its structure once for all consumers
+        chunk_callback = (lambda text: on_stage("plan_chunk", text)) if on_stage else None
+        with trace_span("plan") as span:
+            action_plan = self._create_adaptive_plan(career_paths, current_skills, personality_profile, chunk_callback)
+            plan_structure = parse_action_plan(action_plan)
+            # A plan without month headings still renders, but timeline and progress features need milestones
+            span.set(parse_outcome="structured" if plan_structure.milestones else "unstructured",
+                     milestones=len(plan_structure.milestones), plan_chars=len(action_plan))
+        if on_stage:
+            on_stage("plan", plan_structure)
         
         # Identify skill gaps
-        skill_gaps = self._identify_skill_gaps(career_paths, current_skills)
+        gap_callback = (lambda gap: on_item("skill_gaps", gap)) if on_item else None
+        skill_gaps = self._identify_skill_gaps(career_paths, current_skills, gap_callback)
+        if on_stage:
+            on_stage("skill_gaps", skill_gaps)
         
         # Create progress tracking structure
         progress_tracker = {
@@ -146,93 +301,13 @@ class ActionPlanAssistant:
         
         return {
             "action_plan": action_plan,
+            "plan_structure": plan_structure,
             "skill_gaps": skill_gaps,
             "progress_tracker": progress_tracker,
             "plan_type": "adaptive",
             "monetization_ready": True,  # This output is ready for PDF/dashboard export
             "plan_summary": f"Generated adaptive plan with {len(skill_gaps)} skill gaps identified"
         }
-    def __init__(self, api_key: str = None, model: str = 'gemini-2.0-flash'):
-        load_dotenv()
-        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
-        self.model = model
-        genai.configure(api_key=self.api_key)
-
-    def run(self, input: Dict) -> Dict:
-        career_paths = input.get('career_paths', [])
-        current_skills = input.get('current_skills', [])
-        # Enhanced prompt for more actionable and specific output
-        prompt = (
-            f"SYSTEM: You are a senior career planning expert. For the following user information, generate a highly actionable, detailed, and visually structured action plan and a precise list of skill gaps.\n"
-            f"User's career paths: {career_paths}\nUser's current skills: {current_skills}\n"
-            "The action plan must be tailored to the user's skills and the specified career paths. Include a timeline (Month 1, Month 2, etc.), milestones, and clear next steps. "
-            "Use markdown formatting: bullet points, bold section headers, and tables if appropriate. "
-            "Skill gaps must be a Python list of specific missing skills required for the career paths, based on the user's current skills. "
-            "Return a Python dict with keys 'action_plan' (markdown str) and 'skill_gaps' (list of str). "
-            "If information is missing, make reasonable assumptions and still provide a full, non-generic, and non-empty plan. Do not return placeholders or generic advice."
-        )
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        # Remove code block markers if present
-        if text.startswith('```'):
-            text = text.strip('`').split('\n', 1)[-1].strip()
-        # Try to extract only the dict or variables from the LLM output
-        result = None
-        # 1. Try to extract a dict from anywhere in the output
-        match = re.search(r"\{[\s\S]*?\}", text)
-        if match:
-            try:
-                result = ast.literal_eval(match.group(0))
-            except Exception:
-                result = None
-        # 2. If not found, try to extract action_plan and skill_gaps variables (robust fallback)
-        if not result:
-            # Try to extract everything between action_plan = and skill_gaps =
-            action_plan = ""
-            skill_gaps = []
-            ap_start = text.find('action_plan =')
-            sg_start = text.find('skill_gaps =')
-            if ap_start != -1 and sg_start != -1:
-                action_plan_raw = text[ap_start+len('action_plan ='):sg_start].strip()
-                # Remove triple/single quotes if present
-                action_plan_raw = re.sub(r'^[fr]?(["\"]).*?\1', '', action_plan_raw, flags=re.DOTALL)
-                action_plan = action_plan_raw.strip('"\'\n ')
-            elif ap_start != -1:
-                # If skill_gaps not found, take everything after action_plan =
-                action_plan = text[ap_start+len('action_plan ='):].strip('"\'\n ')
-            # Try to extract skill_gaps as before
-            skill_gaps_match = re.search(r"skill_gaps\s*=\s*(\[[^\]]*\])", text)
-            if skill_gaps_match:
-                try:
-                    skill_gaps = ast.literal_eval(skill_gaps_match.group(1))
-                except Exception:
-                    skill_gaps = [skill_gaps_match.group(1)]
-            result = {"action_plan": action_plan, "skill_gaps": skill_gaps}
-        # 3. If still not found, fallback to the whole text
-        if not result:
-            result = {"action_plan": text, "skill_gaps": []}
-        # Clean up action_plan: remove only the function definition line, not the body
-        plan = result.get('action_plan', '')
-        plan = re.sub(r'^def\s+\w+\(.*?\):\s*', '', plan, flags=re.MULTILINE)
-        plan = re.split(r'Key Improvements|Explanations|```', plan, flags=re.IGNORECASE)[0].strip()
-        # Ensure the plan is not empty or generic
-        if not plan or plan.strip().lower() in ["no action plan generated.", "none", "undefined", "generic", "n/a"]:
-            plan = "**No actionable plan could be generated. Please provide more specific skills and career paths.**"
-        result['action_plan'] = plan
-        # Clean up skill_gaps
-        skill_gaps = result.get('skill_gaps', [])
-        if isinstance(skill_gaps, str):
-            try:
-                skill_gaps = ast.literal_eval(skill_gaps)
-            except Exception:
-                skill_gaps = [skill_gaps]
-        skill_gaps = [g for g in skill_gaps if g and str(g).lower() not in ["none", "undefined", "n/a"]]
-        # If skill_gaps is empty, add a message for clarity
-        if not skill_gaps:
-            skill_gaps = ["No significant skill gaps identified based on your current skills and chosen career paths."]
-        result['skill_gaps'] = skill_gaps
-        return result
 
 # Example usage:
 # assistant = ActionPlanAssistant(api_key="YOUR_GEMINI_API_KEY")
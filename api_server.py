@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from career_results import CareerResults
+from llm_gateway import BATCH, DEFAULT_TENANT, INTERACTIVE, get_gateway, llm_priority, llm_tenant
+from plan_structure import PlanStructure, as_plan_structure, parse_action_plan
+
+DEFAULT_CONCURRENCY = int(os.getenv('VISHCRAFT_API_CONCURRENCY', '32'))
+# How long a request may wait for a free slot before the server answers 503
+DEFAULT_QUEUE_TIMEOUT = float(os.getenv('VISHCRAFT_API_QUEUE_TIMEOUT', '30'))
+
+MAX_LIST_ITEMS = 50
+MAX_ITEM_LENGTH = 200
+MAX_PLAN_LENGTH = 200000
+MAX_BODY_BYTES = 1024 * 1024
+
+CONCURRENCY_KEY = web.AppKey("concurrency", asyncio.Semaphore)
+EXECUTOR_KEY = web.AppKey("executor", ThreadPoolExecutor)
+QUEUE_TIMEOUT_KEY = web.AppKey("queue_timeout", float)
+
+
+def _json_default(value):
+    if isinstance(value, (CareerResults, PlanStructure)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_dumps = partial(json.dumps, default=_json_default)
+
+
+def json_response(data, status: int = 200, **kwargs) -> web.Response:
+    return web.json_response(data, status=status, dumps=_dumps, **kwargs)
+
+
+def error_response(status: int, message: str, details: List[str] = None, **kwargs) -> web.Response:
+    body = {"error": message}
+    if details:
+        body["details"] = details
+    return json_response(body, status=status, **kwargs)
+
+
+def _string_list(payload: Dict, key: str, errors: List[str], required: bool = False) -> List[str]:
+    value = payload.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        errors.append(f"'{key}' must be a list of strings")
+        return []
+    items = [item.strip() for item in value if item.strip()]
+    if required and not items:
+        errors.append(f"'{key}' must contain at least one entry")
+    if len(items) > MAX_LIST_ITEMS:
+        errors.append(f"'{key}' may contain at most {MAX_LIST_ITEMS} entries")
+    if any(len(item) > MAX_ITEM_LENGTH for item in items):
+        errors.append(f"'{key}' entries may be at most {MAX_ITEM_LENGTH} characters")
+    return items
+
+
+def validate_guidance_input(payload) -> Tuple[Dict, List[str]]:
+    """Validate a /v1/guidance body; returns (user_input, errors)"""
+    if not isinstance(payload, dict):
+        return {}, ["Request body must be a JSON object"]
+    errors = []
+    skills = _string_list(payload, "skills", errors, required=True)
+    interests = _string_list(payload, "interests", errors)
+    experience = payload.get("experience", 0)
+    if isinstance(experience, bool) or not isinstance(experience, int) or not 0 <= experience <= 60:
+        errors.append("'experience' must be an integer between 0 and 60")
+    return {"skills": skills, "interests": interests, "experience": experience}, errors
+
+
+def _plan_structure_input(raw, current_plan: str, errors: List[str]) -> Optional[PlanStructure]:
+    """Client-supplied plan structure, or None to re-parse current_plan when its line spans do not fit the plan"""
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        errors.append("'plan_structure' must be an object")
+        return None
+    try:
+        structure = as_plan_structure(raw)
+    except (TypeError, ValueError, AttributeError) as e:
+        errors.append(f"'plan_structure' is malformed: {str(e)}")
+        return None
+    for milestone in structure.milestones:
+        if not isinstance(milestone.month, int) or not isinstance(milestone.title, str) \
+                or not isinstance(milestone.tasks, list) or not all(isinstance(task, str) for task in milestone.tasks) \
+                or not isinstance(milestone.start_line, int) or not isinstance(milestone.end_line, int):
+            errors.append("'plan_structure' milestones need an integer 'month' and line span, a string 'title' and a list of string 'tasks'")
+            return None
+    if not isinstance(current_plan, str):
+        return None
+    # Line spans drive section patching, so they must point at the matching month headings in current_plan
+    lines = current_plan.splitlines()
+    for milestone in structure.milestones:
+        if not 0 <= milestone.start_line < milestone.end_line <= len(lines) \
+                or parse_action_plan(lines[milestone.start_line]).milestone(milestone.month) is None:
+            return None
+    return structure
+
+
+def validate_progress_input(payload) -> Tuple[Dict, List[str]]:
+    """Validate a /v1/progress body; returns (update_progress input, errors)"""
+    if not isinstance(payload, dict):
+        return {}, ["Request body must be a JSON object"]
+    errors = []
+    current_plan = payload.get("current_plan", "")
+    if not isinstance(current_plan, str) or not current_plan.strip():
+        errors.append("'current_plan' must be a non-empty string")
+    elif len(current_plan) > MAX_PLAN_LENGTH:
+        errors.append(f"'current_plan' may be at most {MAX_PLAN_LENGTH} characters")
+    plan_structure = _plan_structure_input(payload.get("plan_structure"), current_plan, errors)
+    mode = payload.get("mode", "incremental")
+    if mode not in ("incremental", "full"):
+        errors.append("'mode' must be 'incremental' or 'full'")
+    update_input = {
+        "completed_skills": _string_list(payload, "completed_skills", errors),
+        "previous_completed_skills": _string_list(payload, "previous_completed_skills", errors),
+        "remaining_skills": _string_list(payload, "remaining_skills", errors),
+        "career_paths": _string_list(payload, "career_paths", errors),
+        "current_plan": current_plan,
+        "plan_structure": plan_structure,
+        "mode": mode
+    }
+    return update_input, errors
+
+
+async def _read_json(request: web.Request):
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise web.HTTPBadRequest(text=_dumps({"error": "Request body must be valid JSON"}), content_type="application/json")
+
+
+@asynccontextmanager
+async def pipeline_slot(app: web.Application):
+    """Hold one of the app's pipeline slots; answers 503 if none frees up within the queue timeout"""
+    try:
+        await asyncio.wait_for(app[CONCURRENCY_KEY].acquire(), timeout=app[QUEUE_TIMEOUT_KEY])
+    except asyncio.TimeoutError:
+        raise web.HTTPServiceUnavailable(text=_dumps({"error": "Server is busy, retry later"}),
+                                         content_type="application/json", headers={"Retry-After": "5"})
+    try:
+        yield app[EXECUTOR_KEY]
+    finally:
+        app[CONCURRENCY_KEY].release()
+
+
+async def run_blocking(request: web.Request, fn, *args, **kwargs):
+    """Run a blocking pipeline call on the worker pool, bounded by the app's concurrency limit.
+
+    The event loop only awaits here, so other requests keep being accepted while LLM calls are in flight.
+    """
+    async with pipeline_slot(request.app) as executor:
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args, **kwargs))
+
+
+def request_priority(request: web.Request) -> str:
+    """Batch clients send 'X-Priority: batch' so their LLM calls yield to interactive traffic"""
+    return BATCH if request.headers.get("X-Priority", "").lower() == BATCH else INTERACTIVE
+
+
+def request_tenant(request: web.Request) -> str:
+    """Business unit the request is billed to, from the X-Tenant header"""
+    tenant = request.headers.get("X-Tenant", "").strip()
+    return tenant[:64] if tenant else DEFAULT_TENANT
+
+
+def _run_graph(user_input: Dict, on_item=None, on_stage=None, priority: str = INTERACTIVE,
+               tenant: str = DEFAULT_TENANT) -> CareerResults:
+    from career_graph import build_career_graph
+    # Executor threads do not inherit the request's context, so the priority is set here
+    with llm_priority(priority):
+        return build_career_graph().run(user_input, on_item=on_item, on_stage=on_stage, tenant=tenant)
+
+
+def _update_progress(update_input: Dict, priority: str = INTERACTIVE, tenant: str = DEFAULT_TENANT) -> Dict:
+    from career_graph import action_plan
+    with llm_priority(priority), llm_tenant(tenant):
+        return action_plan.update_progress(update_input)
+
+
+async def guidance(request: web.Request) -> web.Response:
+    user_input, errors = validate_guidance_input(await _read_json(request))
+    if errors:
+        return error_response(422, "Invalid request", errors)
+    try:
+        results = await run_blocking(request, _run_graph, user_input, priority=request_priority(request),
+                                     tenant=request_tenant(request))
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        return error_response(502, f"Career analysis failed: {str(e)}")
+    return json_response({"user_input": user_input, "results": results})
+
+
+def sse_event(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {_dumps(data)}\n\n".encode("utf-8")
+
+
+_DONE = object()
+
+
+async def guidance_stream(request: web.Request) -> web.StreamResponse:
+    """Server-sent events for one graph run.
+
+    Events: 'item' for each streamed list element, one event per completed stage ('personality', 'roles',
+    'vertical_paths', 'lateral_paths', 'plan_chunk', 'plan', 'skill_gaps'), then 'summary' with the full
+    results, or 'error'. Headers go out before the first model call, and each stage is written the
+    moment the worker thread reports it.
+    """
+    user_input, errors = validate_guidance_input(await _read_json(request))
+    if errors:
+        return error_response(422, "Invalid request", errors)
+
+    async with pipeline_slot(request.app) as executor:
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def emit(event, data):
+            # Called from the worker thread; hand the event to the loop that owns the response
+            loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
+
+        future = loop.run_in_executor(executor, partial(
+            _run_graph, user_input,
+            on_item=lambda stage, item: emit("item", {"stage": stage, "item": item}),
+            on_stage=emit,
+            priority=request_priority(request),
+            tenant=request_tenant(request)
+        ))
+        # Runs on the loop after every event the worker queued before finishing
+        future.add_done_callback(lambda _: events.put_nowait((_DONE, None)))
+
+        while True:
+            event, data = await events.get()
+            if event is _DONE:
+                break
+            await response.write(sse_event(event, data))
+
+        try:
+            results = future.result()
+        except Exception as e:
+            await response.write(sse_event("error", {"error": f"Career analysis failed: {str(e)}"}))
+        else:
+            await response.write(sse_event("summary", {
+                "profile_summary": results.role_fit.profile_summary,
+                "path_summary": results.career_path.path_summary,
+                "plan_summary": results.action_plan.plan_summary,
+                "user_input": user_input,
+                "results": results
+            }))
+        await response.write_eof()
+    return response
+
+
+async def progress(request: web.Request) -> web.Response:
+    update_input, errors = validate_progress_input(await _read_json(request))
+    if errors:
+        return error_response(422, "Invalid request", errors)
+    try:
+        update_result = await run_blocking(request, _update_progress, update_input, priority=request_priority(request),
+                                           tenant=request_tenant(request))
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        return error_response(502, f"Progress update failed: {str(e)}")
+    return json_response(update_result)
+
+
+async def health(request: web.Request) -> web.Response:
+    return json_response({"status": "ok"})
+
+
+async def usage(request: web.Request) -> web.Response:
+    """Per-tenant LLM usage counters for this process"""
+    return json_response(get_gateway().usage())
+
+
+async def _shutdown_executor(app: web.Application):
+    app[EXECUTOR_KEY].shutdown(wait=False, cancel_futures=True)
+
+
+def create_app(max_concurrency: int = DEFAULT_CONCURRENCY, queue_timeout: float = DEFAULT_QUEUE_TIMEOUT) -> web.Application:
+    """Build the API application; at most max_concurrency pipeline calls run at once per process"""
+    app = web.Application(client_max_size=MAX_BODY_BYTES)
+    app[CONCURRENCY_KEY] = asyncio.Semaphore(max_concurrency)
+    app[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='api-pipeline')
+    app[QUEUE_TIMEOUT_KEY] = queue_timeout
+    app.add_routes([
+        web.post("/v1/guidance", guidance),
+        web.post("/v1/guidance/stream", guidance_stream),
+        web.post("/v1/progress", progress),
+        web.get("/v1/usage", usage),
+        web.get("/healthz", health)
+    ])
+    app.on_cleanup.append(_shutdown_executor)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VishCraft career guidance HTTP API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv('PORT', '8080')))
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Pipeline calls in flight per process")
+    args = parser.parse_args(argv)
+    web.run_app(create_app(max_concurrency=args.concurrency), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import time
 from datetime import datetime
 import os
 from export_utils import export_results_as_json, format_results_as_markdown
+from key_pool import load_api_keys
 
 # Page configuration
 st.set_page_config(
@@ -87,8 +88,8 @@ local_css("assets/style.css")
 
 # Check API key configuration
 def check_api_key():
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key or api_key == 'YOUR_GEMINI_API_KEY_HERE':
+    # Either a single GEMINI_API_KEY or a comma-separated GEMINI_API_KEYS pool is enough
+    if not load_api_keys():
         st.error("🔑 **API Key Not Configured!**")
         st.markdown("""
         **To use this application, you need a valid Gemini API key:**
@@ -392,7 +393,7 @@ if submitted:
             progress_bar.progress(30)
             time.sleep(0.5)
             
-            results = graph.run(user_input)
+            results = graph.run(user_input).to_dict()
             
             # Stage 3: Generating career paths
             status_text.text("🛣️ Mapping potential career paths...")
@@ -317,7 +317,7 @@ if submitted:
             progress_bar.progress(30)
             time.sleep(0.5)
             
-            results = graph.run(user_input)
+            results = graph.run(user_input).to_dict()
             
             # Stage 3: Generating career paths
             status_text.text("🛣️ Mapping potential career paths...")
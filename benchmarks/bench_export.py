@@ -0,0 +1,87 @@
+"""
+Benchmark: report export across report sizes, string concatenation vs. streamed chunks vs. cached
+
+Run from the repository root (export_utils imports streamlit):
+    python -m benchmarks.bench_export
+"""
+import io
+import json
+import time
+from datetime import datetime
+
+from benchmarks.bench_plan_parser import make_plan
+from career_results import CareerResults
+from export_utils import _export_cache, export_report, iter_results_json, iter_results_markdown
+from plan_structure import parse_action_plan
+
+USER_INPUT = {"skills": ["Python", "SQL", "Communication"], "interests": ["AI", "Healthcare"], "experience": 3}
+
+
+def make_results(months: int, tasks: int, words: int, items: int) -> CareerResults:
+    plan = make_plan(months, tasks, words)
+    return CareerResults.from_dict({
+        "role_fit": {"recommended_roles": [f"Role {i}" for i in range(items)],
+                     "personality_profile": {"personality_traits": ["Analytical", "Curious"], "work_style": "Independent"}},
+        "career_path": {"vertical_paths": [f"Role {i} → Senior Role {i}" for i in range(items)],
+                        "lateral_paths": [f"Role {i} → Product Role {i}" for i in range(items)]},
+        "action_plan": {"action_plan": plan, "plan_structure": parse_action_plan(plan).to_dict(),
+                        "skill_gaps": [f"Skill gap {i}" for i in range(items)],
+                        "progress_tracker": {"total_skills_needed": items, "skills_completed": 1, "last_updated": "now"}},
+    })
+
+
+def legacy_markdown(results: CareerResults, user_input) -> str:
+    # The previous implementation: one string grown with += per line
+    md = f"# Enhanced Career Guidance Report\nGenerated on {datetime.now()}\n\n## Your Profile\n"
+    md += f"- **Skills**: {', '.join(user_input.get('skills', []))}\n"
+    md += "\n## Recommended Roles\n"
+    for role in results.role_fit.recommended_roles:
+        md += f"- {role}\n"
+    md += "\n## Career Paths\n"
+    for path in results.career_path.vertical_paths:
+        md += f"- {path}\n"
+    for path in results.career_path.lateral_paths:
+        md += f"- {path}\n"
+    md += "\n## Skill Gaps Analysis\n"
+    for gap in results.action_plan.skill_gaps:
+        md += f"- {gap}\n"
+    md += "\n## Milestone Overview\n"
+    for milestone in results.action_plan.plan_structure.milestones:
+        md += f"- **Month {milestone.month}**: {milestone.title}\n"
+    md += "\n## Adaptive Action Plan\n"
+    action_plan = results.action_plan.action_plan
+    if action_plan and action_plan.strip() and action_plan.strip().lower() not in ["no action plan generated.", "none", "undefined"]:
+        md += action_plan
+    return md
+
+
+def legacy_json(results: CareerResults, user_input) -> str:
+    return json.dumps({"user_input": user_input, "results": results.to_dict(), "exported_at": str(datetime.now())}, indent=2)
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    sizes = [("small", (6, 4, 10, 5)), ("medium", (12, 10, 20, 15)), ("large", (60, 20, 30, 50)), ("huge", (240, 40, 40, 200))]
+    print(f"{'report':<8}{'KiB':>8}{'md +=':>10}{'md chunks':>11}{'to file':>10}{'json':>10}{'json chunks':>13}{'cached':>10}   (ms)")
+    for name, shape in sizes:
+        results = make_results(*shape)
+        size = len(export_report(results, USER_INPUT, result_key=name).decode("utf-8")) / 1024
+        repeat = max(3, int(2000 / max(size, 1)))
+        md_legacy = _time(lambda: legacy_markdown(results, USER_INPUT), repeat)
+        md_stream = _time(lambda: "".join(iter_results_markdown(results, USER_INPUT)), repeat)
+        md_file = _time(lambda: io.StringIO().writelines(iter_results_markdown(results, USER_INPUT)), repeat)
+        js_legacy = _time(lambda: legacy_json(results, USER_INPUT), repeat)
+        js_stream = _time(lambda: io.StringIO().writelines(iter_results_json(results, USER_INPUT)), repeat)
+        cached = _time(lambda: export_report(results, USER_INPUT, result_key=name), repeat)
+        print(f"{name:<8}{size:>8.1f}{md_legacy:>10.3f}{md_stream:>11.3f}{md_file:>10.3f}{js_legacy:>10.3f}{js_stream:>13.3f}{cached:>10.4f}")
+    _export_cache.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: Results/Progress tab figure construction per rerun, uncached vs. memoized
+
+Run from the repository root (requires plotly and pandas):
+    python -m benchmarks.bench_figure_cache
+"""
+import time
+
+from benchmarks.bench_plan_parser import make_plan
+from charts import (
+    cached_progress_chart,
+    cached_skill_radar_chart,
+    cached_timeline_flowchart,
+    create_progress_chart,
+    create_skill_radar_chart,
+    create_timeline_flowchart,
+    figure_cache,
+    generate_skill_categories,
+)
+
+SKILLS = ["Python", "SQL", "Communication", "Leadership", "Tableau", "Statistics", "Docker", "Public Speaking"]
+
+
+def uncached_rerun(plan_text):
+    create_timeline_flowchart(plan_text)
+    create_skill_radar_chart(generate_skill_categories(SKILLS))
+    create_progress_chart(8, 3)
+
+
+def cached_rerun(plan_text):
+    cached_timeline_flowchart(plan_text)
+    cached_skill_radar_chart(SKILLS)
+    cached_progress_chart(8, 3)
+
+
+def _time(fn, plan_text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(plan_text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(repeat: int = 20):
+    plan_text = make_plan(12, 6, 12)
+    figure_cache.clear()
+    before = _time(uncached_rerun, plan_text, repeat)
+    first = _time(cached_rerun, plan_text, 1)
+    after = _time(cached_rerun, plan_text, repeat)
+    print(f"rerun figure build, uncached: {before:8.2f} ms")
+    print(f"rerun figure build, first   : {first:8.2f} ms (cache miss)")
+    print(f"rerun figure build, cached  : {after:8.3f} ms ({figure_cache.hits} hits / {figure_cache.misses} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: aggregate LLM-call throughput as API keys are added to the pool
+
+A fake per-key API (sleep-based, no API key needed) admits RATE_PER_KEY calls per second per key and
+answers a quota error beyond that. Each pool key is rate limited to the same rate, and one scenario
+adds a key whose quota is exhausted to show cooldown keeping it out of rotation.
+
+Run from the repository root:
+    python -m benchmarks.bench_key_pool
+"""
+import threading
+import time
+
+from key_pool import KeyPool
+
+RATE_PER_KEY = 20
+CALL_SECONDS = 0.02
+THREADS = 32
+DURATION = 3.0
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+class FakeApi:
+    """Per-key token-bucket quota of RATE_PER_KEY calls per second, like a provider rate limit"""
+
+    def __init__(self, exhausted=()):
+        self.exhausted = set(exhausted)
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    def __call__(self, api_key, model_name, prompt, stream=False):
+        with self.lock:
+            now = time.monotonic()
+            tokens, last = self.buckets.get(api_key.key, (RATE_PER_KEY, now))
+            tokens = min(RATE_PER_KEY, tokens + (now - last) * RATE_PER_KEY)
+            if api_key.key in self.exhausted or tokens < 1:
+                self.buckets[api_key.key] = (tokens, now)
+                self.rejected += 1
+                raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+            self.buckets[api_key.key] = (tokens - 1, now)
+        time.sleep(CALL_SECONDS)
+        return "ok"
+
+
+def run(keys, exhausted=()):
+    api = FakeApi(exhausted)
+    pool = KeyPool(keys, requests_per_minute=RATE_PER_KEY * 60, cooldown_seconds=5, call=api)
+    done, failed = [0], [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + DURATION
+
+    def worker():
+        while time.monotonic() < stop:
+            try:
+                pool.generate("fake-model", "prompt")
+                outcome = done
+            except ResourceExhausted:
+                outcome = failed
+            with lock:
+                outcome[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return done[0] / elapsed, failed[0], api.rejected
+
+
+def main():
+    print(f"{'keys':<24}{'calls/s':>10}{'failed':>8}{'429s':>7}")
+    for count in (1, 2, 4, 8):
+        rate, failed, rejected = run([f"key-{i}" for i in range(count)])
+        print(f"{count:<24}{rate:>10.1f}{failed:>8}{rejected:>7}")
+    rate, failed, rejected = run([f"key-{i}" for i in range(5)], exhausted={"key-4"})
+    print(f"{'4 + 1 exhausted':<24}{rate:>10.1f}{failed:>8}{rejected:>7}")
+    print(f"(per-key quota: {RATE_PER_KEY} calls/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: single-pass plan scanner vs. the legacy timeline regexes
+
+Run from the repository root:
+    python -m benchmarks.bench_plan_parser
+"""
+import re
+import time
+
+from plan_structure import parse_action_plan
+
+
+def legacy_extract_months(action_plan_text):
+    """The month/task regex extraction previously inlined in create_timeline_flowchart"""
+    months_data = []
+    month_pattern = r"(?:^|\n)(?:\#{1,3}\s*)?(?:Month|MONTH)\s*(\d{1,2})(?:\s*[-:])?\s*(.*?)(?=\n(?:\#{1,3}\s*)?(?:Month|MONTH)\s*\d{1,2}|\n\#{1,3}|\Z)"
+    for match in re.finditer(month_pattern, action_plan_text, re.DOTALL | re.MULTILINE):
+        month_num = int(match.group(1))
+        if month_num <= 12:
+            content = match.group(2).strip()
+            title_match = re.search(r'^([^\.•\n]+(?:\.[^\.•\n]+)?)', content)
+            title = title_match.group(1).strip() if title_match else f"Month {month_num} Milestones"
+            tasks = []
+            for task_match in re.finditer(r'(?:^|\n)(?:[-•*]\s*|\d+\.\s*)(.*?)(?=\n[-•*]|\n\d+\.|\Z)', content, re.DOTALL):
+                task = task_match.group(1).strip()
+                if task and len(task) > 3:
+                    tasks.append(task)
+            months_data.append({"month": month_num, "title": title, "tasks": tasks})
+    return months_data
+
+
+def make_plan(months: int = 12, tasks_per_month: int = 6, task_words: int = 12) -> str:
+    """Build a synthetic plan shaped like the adaptive planner's markdown output"""
+    lines = ["# 12-Month Career Roadmap", "", "## 1. Monthly Milestones", ""]
+    for month in range(1, months + 1):
+        lines.append(f"### Month {(month - 1) % 12 + 1}: Milestone {month}. Build depth in area {month}")
+        for task in range(tasks_per_month):
+            lines.append(f"- **Task {task}:** " + " ".join(f"word{w}" for w in range(task_words)))
+            lines.append("  continued detail for the task on a wrapped line")
+        lines.append("")
+    lines += ["## 2. Course/Certification Recommendations", "- Course A", "- Course B", ""]
+    return "\n".join(lines)
+
+
+def _time(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    print(f"{'plan':<28}{'bytes':>10}{'legacy ms':>12}{'scanner ms':>12}{'speedup':>10}")
+    for months, tasks, words in [(12, 4, 10), (12, 20, 30), (120, 20, 30), (600, 40, 40)]:
+        text = make_plan(months, tasks, words)
+        repeat = max(1, 200000 // len(text))
+        legacy = _time(legacy_extract_months, text, repeat)
+        scanner = _time(parse_action_plan, text, repeat)
+        label = f"{months} months x {tasks} tasks"
+        print(f"{label:<28}{len(text):>10}{legacy * 1000:>12.3f}{scanner * 1000:>12.3f}{legacy / scanner:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: interactive LLM-call latency while a batch flood saturates the call slots
+
+Simulated calls (sleep-based, no API key needed) go through PriorityScheduler. Compares a plain
+fair-share setup (equal weights, no interactive reserve, no batch preemption) with the default priority settings.
+
+Run from the repository root:
+    python -m benchmarks.bench_priority_scheduler
+"""
+import statistics
+import threading
+import time
+
+from llm_gateway import BATCH, INTERACTIVE, PriorityScheduler
+
+CONCURRENCY = 8
+CALL_SECONDS = 0.05
+BATCH_THREADS = 48
+INTERACTIVE_USERS = 6
+INTERACTIVE_CALLS = 30
+THINK_SECONDS = 0.08
+
+
+def _call(scheduler, priority):
+    start = time.perf_counter()
+    ticket = scheduler.acquire(priority)
+    try:
+        time.sleep(CALL_SECONDS)
+    finally:
+        scheduler.release(ticket)
+    return time.perf_counter() - start
+
+
+def run(scheduler, with_batch=True):
+    stop = threading.Event()
+    batch_done = [0]
+    latencies = []
+    lock = threading.Lock()
+
+    def batch_worker():
+        while not stop.is_set():
+            _call(scheduler, BATCH)
+            with lock:
+                batch_done[0] += 1
+
+    def interactive_user():
+        for _ in range(INTERACTIVE_CALLS):
+            latency = _call(scheduler, INTERACTIVE)
+            with lock:
+                latencies.append(latency)
+            time.sleep(THINK_SECONDS)
+
+    batch = [threading.Thread(target=batch_worker, daemon=True) for _ in range(BATCH_THREADS if with_batch else 0)]
+    users = [threading.Thread(target=interactive_user) for _ in range(INTERACTIVE_USERS)]
+    start = time.perf_counter()
+    for thread in batch + users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in batch:
+        thread.join()
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    return p50, p95, batch_done[0] / elapsed
+
+
+def main():
+    setups = [
+        ("no batch load", PriorityScheduler(CONCURRENCY), False),
+        ("fair share (no priority)", PriorityScheduler(CONCURRENCY, weights={INTERACTIVE: 1, BATCH: 1},
+                                                       interactive_reserve=0, spike_threshold=10 ** 9,
+                                                       interactive_window=0), True),
+        ("priority (defaults)", PriorityScheduler(CONCURRENCY), True),
+    ]
+    print(f"{'setup':<28}{'p50 ms':>9}{'p95 ms':>9}{'batch calls/s':>15}")
+    for name, scheduler, with_batch in setups:
+        p50, p95, batch_rate = run(scheduler, with_batch)
+        print(f"{name:<28}{p50:>9.1f}{p95:>9.1f}{batch_rate:>15.1f}")
+    print(f"(capacity: {CONCURRENCY / CALL_SECONDS:.0f} calls/s)")
+
+
+if __name__ == "__main__":
+    main()
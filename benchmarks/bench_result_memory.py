@@ -0,0 +1,108 @@
+"""
+Benchmark: per-result memory footprint and JSON round trip, nested dicts vs. slotted result types
+
+Run from the repository root:
+    python -m benchmarks.bench_result_memory
+"""
+import json
+import time
+import tracemalloc
+from dataclasses import asdict
+
+from career_results import CareerResults
+from plan_structure import PlanStructure, parse_action_plan
+
+RUNS = 10000
+
+
+def make_results(i: int) -> CareerResults:
+    """A run shaped like the graph's output; every string is distinct per run"""
+    plan_lines = [f"# 12-Month Career Roadmap {i}", "", "## 1. Monthly Milestones", ""]
+    for month in range(1, 13):
+        plan_lines.append(f"### Month {month}: Milestone {month} for run {i}")
+        for task in range(4):
+            plan_lines.append(f"- Task {task} for run {i}: practice topic {month}.{task} and ship a small project")
+        plan_lines.append("")
+    plan_lines += ["## 2. Course/Certification Recommendations", f"- Course A{i}", f"- Course B{i}", ""]
+    plan = "\n".join(plan_lines)
+    roles = [f"Data Scientist {i}", f"ML Engineer {i}", f"Analyst {i}", f"Researcher {i}", f"Consultant {i}"]
+    gaps = [f"Skill gap {g} ({i})" for g in range(6)]
+    return CareerResults.from_dict({
+        "role_fit": {
+            "recommended_roles": roles,
+            "personality_profile": {
+                "personality_traits": [f"Analytical {i}", "Curious", "Detail-oriented"],
+                "work_style": f"Independent {i}",
+                "preferred_environment": "Remote-friendly",
+            },
+            "profile_summary": f"Based on 3 skills and 2 interests with {i % 20} years of experience",
+        },
+        "career_path": {
+            "career_paths": [f"{role} → Senior {role}" for role in roles],
+            "vertical_paths": [f"{role} → Lead {role}" for role in roles[:3]],
+            "lateral_paths": [f"{role} → Product {role}" for role in roles[:2]],
+            "path_summary": "Generated 3 vertical and 2 lateral career paths",
+        },
+        "action_plan": {
+            "action_plan": plan,
+            "plan_structure": parse_action_plan(plan).to_dict(),
+            "skill_gaps": gaps,
+            "progress_tracker": {"total_skills_needed": 6, "skills_completed": 0, "completion_percentage": 0},
+            "plan_type": "adaptive",
+            "monetization_ready": True,
+            "plan_summary": "Generated adaptive plan with 6 skill gaps identified",
+        },
+    })
+
+
+def legacy_encode(results: dict) -> str:
+    # Previous path: nested dicts with a PlanStructure inside, converted through asdict on the way out
+    return json.dumps(results, default=lambda value: asdict(value) if isinstance(value, PlanStructure) else None)
+
+
+def _footprint(build) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / RUNS
+
+
+def main():
+    encoded = [make_results(i).to_json() for i in range(RUNS)]
+
+    dict_bytes = _footprint(lambda: [json.loads(text) for text in encoded])
+    typed_bytes = _footprint(lambda: [CareerResults.from_json(text) for text in encoded])
+    print(f"{RUNS} stored runs")
+    print(f"per-result memory, nested dicts : {dict_bytes / 1024:8.1f} KiB")
+    print(f"per-result memory, slotted types: {typed_bytes / 1024:8.1f} KiB ({1 - typed_bytes / dict_bytes:.0%} smaller)")
+
+    sample = encoded[:1000]
+    legacy_objects = []
+    for text in sample:
+        data = json.loads(text)
+        data["action_plan"]["plan_structure"] = PlanStructure.from_dict(data["action_plan"]["plan_structure"])
+        legacy_objects.append(data)
+    typed_objects = [CareerResults.from_json(text) for text in sample]
+
+    start = time.perf_counter()
+    for data in legacy_objects:
+        legacy_encode(data)
+    legacy_ms = (time.perf_counter() - start) / len(sample) * 1000
+    start = time.perf_counter()
+    for results in typed_objects:
+        results.to_json()
+    typed_ms = (time.perf_counter() - start) / len(sample) * 1000
+    start = time.perf_counter()
+    for text in sample:
+        CareerResults.from_json(text)
+    load_ms = (time.perf_counter() - start) / len(sample) * 1000
+    print(f"to JSON, dicts + asdict         : {legacy_ms:8.3f} ms/result")
+    print(f"to JSON, slotted to_json        : {typed_ms:8.3f} ms/result")
+    print(f"from JSON, slotted from_json    : {load_ms:8.3f} ms/result")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: skill taxonomy lookup throughput on a synthetic taxonomy of tens of thousands of skills
+
+Run from the repository root:
+    python -m benchmarks.bench_skill_taxonomy
+"""
+import random
+import time
+
+from skill_taxonomy import SkillTaxonomy, classify_skill, get_taxonomy
+
+
+def make_taxonomy(size: int = 30000, seed: int = 7):
+    """Bundled taxonomy padded with random synthetic skills, each with two aliases"""
+    rng = random.Random(seed)
+    categories = {"Technical": {}, "Tools": {}, "Soft": {}, "Domain": {}}
+    names = list(categories)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    while sum(len(skills) for skills in categories.values()) < size:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(5, 12)))
+        name = f"{word} {rng.choice(['analysis', 'engineering', 'design', 'ops', 'framework'])}"
+        categories[rng.choice(names)][name] = [word, name.replace(" ", "-") + "-x"]
+    return categories
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def _rate(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return len(items) / elapsed_ms
+
+
+def main(lookups: int = 100000):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    taxonomy = SkillTaxonomy(make_taxonomy())
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"index build: {len(taxonomy)} keys in {build_ms:.0f} ms")
+
+    keys = list(taxonomy._index)
+    exact = [rng.choice(keys) for _ in range(lookups)]
+    typos = [_typo(rng.choice(keys), rng) for _ in range(lookups // 10)]
+
+    start = time.perf_counter()
+    taxonomy.classify("warm up fuzzy index")
+    print(f"fuzzy index build: {(time.perf_counter() - start) * 1000:.0f} ms")
+    mixed_case = [key.title() for key in exact]
+    print(f"exact/alias : {_rate(taxonomy.classify, exact):8.0f} skills/ms")
+    print(f"mixed case  : {_rate(taxonomy.classify, mixed_case):8.0f} skills/ms")
+    print(f"one-typo    : {_rate(taxonomy.classify, typos):8.0f} skills/ms")
+    bundled = get_taxonomy()
+    print(f"bundled taxonomy: {len(bundled)} keys")
+    # Batch analytics repeat the same skills heavily; classify_skill memoizes per spelling
+    profiles = [rng.choice(list(bundled._index)) for _ in range(lookups)]
+    print(f"memoized    : {_rate(classify_skill, profiles):8.0f} skills/ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: per-tenant LLM-call latency while one tenant floods the gateway with a bulk run
+
+Simulated calls (sleep-based, no API key needed) go through PriorityScheduler. Compares a single shared
+FIFO (every call attributed to one tenant) with per-tenant deficit round robin, then adds a request quota
+on the flooding tenant.
+
+Run from the repository root:
+    python -m benchmarks.bench_tenant_fairness
+"""
+import statistics
+import threading
+import time
+
+from llm_gateway import INTERACTIVE, PriorityScheduler, TenantQuota
+
+CONCURRENCY = 8
+CALL_SECONDS = 0.05
+FLOOD_THREADS = 40
+SMALL_TENANTS = ("hr", "finance")
+USERS_PER_TENANT = 2
+CALLS_PER_USER = 25
+PROMPT_TOKENS = 1200
+
+
+def _call(scheduler, tenant):
+    start = time.perf_counter()
+    ticket = scheduler.acquire(INTERACTIVE, tenant, PROMPT_TOKENS)
+    try:
+        time.sleep(CALL_SECONDS)
+    finally:
+        scheduler.release(ticket)
+    return time.perf_counter() - start
+
+
+def run(scheduler, shared_queue=False):
+    stop = threading.Event()
+    flood_done = [0]
+    latencies = {tenant: [] for tenant in SMALL_TENANTS}
+    lock = threading.Lock()
+
+    def flood():
+        while not stop.is_set():
+            _call(scheduler, "default" if shared_queue else "bulk")
+            with lock:
+                flood_done[0] += 1
+
+    def user(tenant):
+        for _ in range(CALLS_PER_USER):
+            latency = _call(scheduler, "default" if shared_queue else tenant)
+            with lock:
+                latencies[tenant].append(latency)
+
+    flooders = [threading.Thread(target=flood, daemon=True) for _ in range(FLOOD_THREADS)]
+    users = [threading.Thread(target=user, args=(tenant,)) for tenant in SMALL_TENANTS for _ in range(USERS_PER_TENANT)]
+    start = time.perf_counter()
+    for thread in flooders:
+        thread.start()
+    time.sleep(0.2)
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in flooders:
+        thread.join()
+    rows = {}
+    for tenant, values in latencies.items():
+        values.sort()
+        rows[tenant] = (statistics.median(values) * 1000, values[int(len(values) * 0.95) - 1] * 1000)
+    return rows, flood_done[0] / elapsed
+
+
+def main():
+    setups = [
+        ("shared FIFO", PriorityScheduler(CONCURRENCY), True),
+        ("tenant DRR", PriorityScheduler(CONCURRENCY, tenant_quotas={}), False),
+        ("tenant DRR + bulk 60 rpm", PriorityScheduler(CONCURRENCY, tenant_quotas={"bulk": TenantQuota(requests_per_minute=60)}), False),
+    ]
+    print(f"{'setup':<28}{'tenant':<10}{'p50 ms':>9}{'p95 ms':>9}{'bulk calls/s':>14}")
+    for name, scheduler, shared_queue in setups:
+        rows, flood_rate = run(scheduler, shared_queue)
+        for tenant, (p50, p95) in rows.items():
+            print(f"{name:<28}{tenant:<10}{p50:>9.1f}{p95:>9.1f}{flood_rate:>14.1f}")
+    print(f"(capacity: {CONCURRENCY / CALL_SECONDS:.0f} calls/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: timeline figure payload and build time, per-task annotations vs. batched text traces
+
+Run from the repository root (requires plotly):
+    python -m benchmarks.bench_timeline_figure
+"""
+import time
+
+import plotly.graph_objects as go
+
+from benchmarks.bench_plan_parser import make_plan
+from charts import create_timeline_flowchart
+from plan_structure import parse_action_plan
+
+
+def legacy_timeline_flowchart(action_plan_text):
+    """The previous renderer: one add_annotation per month number, month title and task"""
+    months_data = [
+        {"month": m.month, "title": m.title, "tasks": [t if len(t) <= 70 else t[:67] + "..." for t in m.tasks][:3]}
+        for m in parse_action_plan(action_plan_text).milestones if m.month <= 12
+    ]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=list(range(1, len(months_data) + 1)), y=[0] * len(months_data), mode="lines+markers",
+        line=dict(color="#0A2463", width=3), marker=dict(size=20, color="#0A2463"), hoverinfo="none", showlegend=False
+    ))
+    for i, month_data in enumerate(months_data):
+        fig.add_annotation(x=i + 1, y=0, text=f"{month_data['month']}", font=dict(size=12, color="white"), showarrow=False)
+        fig.add_annotation(
+            x=i + 1, y=0.3, text=f"<b>{month_data['title']}</b>", font=dict(size=12, color="#1A365D"), showarrow=False,
+            align="center", bgcolor="rgba(255, 255, 255, 0.8)", bordercolor="#1A365D", borderwidth=1, borderpad=4, width=200
+        )
+        task_y = -0.3
+        for task in month_data["tasks"]:
+            fig.add_annotation(
+                x=i + 1, y=task_y, text=f"• {task}", font=dict(size=10), showarrow=False, align="left",
+                bgcolor="rgba(255, 255, 255, 0.8)", bordercolor="#D3D3D3", borderwidth=1, borderpad=3, width=180
+            )
+            task_y -= 0.2
+    fig.update_layout(height=500, xaxis=dict(range=[0, len(months_data) + 1]), yaxis=dict(range=[-1, 1]))
+    return fig
+
+
+def _measure(builder, plan_text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fig = builder(plan_text)
+    build_ms = (time.perf_counter() - start) / repeat * 1000
+    return build_ms, len(fig.to_json().encode())
+
+
+def main(repeat: int = 20):
+    plan_text = make_plan(12, 6, 12)
+    print(f"{'renderer':<22}{'build ms':>10}{'json bytes':>12}")
+    for name, builder in [("annotations (legacy)", legacy_timeline_flowchart), ("text traces", create_timeline_flowchart)]:
+        build_ms, size = _measure(builder, plan_text, repeat)
+        print(f"{name:<22}{build_ms:>10.2f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
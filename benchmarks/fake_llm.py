@@ -0,0 +1,104 @@
+"""
+Offline stand-in for the Gemini backend, for benchmarks and load tests
+
+Answers each of the pipeline's prompts with a canned response of realistic shape and size, streams it in
+chunks like generate_content(stream=True), and reports usage metadata. Optional latency makes it behave
+like a remote model; with the default of zero it measures only the pipeline's own overhead.
+"""
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.bench_plan_parser import make_plan
+from llm_gateway import LLMGateway, PriorityScheduler, get_gateway, set_gateway
+
+CHUNK_CHARS = 80
+
+PERSONALITY = ("{'personality_traits': ['Analytical', 'Curious', 'Methodical', 'Collaborative', 'Resilient'], "
+               "'dominant_behaviors': 'Breaks problems down and validates ideas with data', "
+               "'work_style': 'Deep focus blocks with regular async check-ins', 'preferred_environment': 'remote'}")
+ROLES = str([f"{title} Specialist" for title in ("Data", "Machine Learning", "Analytics", "MLOps", "AI Product", "Research")])
+VERTICAL_PATHS = str([f"{role} → Senior {role} → Lead {role} → Head of {role}" for role in ("Data Scientist", "ML Engineer", "Analyst")] * 2)
+LATERAL_PATHS = str([f"{role} → Product Analyst → Product Manager" for role in ("Data Scientist", "ML Engineer", "Analyst")] * 2)
+SKILL_GAPS = str(["MLOps", "Statistics", "Cloud Architecture", "Stakeholder Management", "System Design", "Experimentation"])
+PLAN = make_plan(12, 6, 12)
+PROGRESS = "{'updated_plan': '### Month 1: Updated focus\\n- Next-level goal', 'new_recommendations': ['Ship a project'], 'progress_percentage': 40}"
+
+# Prompt marker -> response; markers are phrases from each assistant's SYSTEM line
+RESPONSES = [
+    ("psychometric", PERSONALITY),
+    ("Senior AI Career Strategist", ROLES),
+    ("trajectory architect", VERTICAL_PATHS),
+    ("pathways engineer", LATERAL_PATHS),
+    ("career mentor", PLAN),
+    ("skill auditor", SKILL_GAPS),
+    ("roadmap optimizer", PROGRESS),
+]
+
+
+class FakeResponse:
+    """Quacks like a GenerateContentResponse: .text, iteration over chunks and usage_metadata"""
+
+    def __init__(self, text, prompt, chunk_delay=0.0):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4,
+                                              total_token_count=len(prompt) // 4 + len(text) // 4)
+        self._chunk_delay = chunk_delay
+
+    def __iter__(self):
+        for start in range(0, len(self.text), CHUNK_CHARS):
+            if self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield SimpleNamespace(text=self.text[start:start + CHUNK_CHARS])
+
+
+class FakeLLM:
+    """Backend callable for LLMGateway(backend=...).
+
+    latency is the seconds before the first chunk (or the whole non-streamed response); stream_seconds
+    is spread over the chunks of a streamed response. jitter scales both by a random factor in
+    [1 - jitter, 1 + jitter]. error_rate is the share of calls that fail after the latency, like a
+    provider error.
+    """
+
+    def __init__(self, latency: float = 0.0, stream_seconds: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.stream_seconds = stream_seconds
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        """(latency scale, whether this call fails)"""
+        with self._lock:
+            self.calls += 1
+            scale = 1 + self._random.uniform(-self.jitter, self.jitter) if self.jitter else 1.0
+            failed = bool(self.error_rate) and self._random.random() < self.error_rate
+            self.errors += failed
+            return scale, failed
+
+    def __call__(self, model_name, prompt, stream=False):
+        text = next((response for marker, response in RESPONSES if marker in prompt), "[]")
+        scale, failed = self._draw()
+        if self.latency:
+            time.sleep(self.latency * scale)
+        if failed:
+            raise RuntimeError("500 Internal error (injected by FakeLLM)")
+        chunks = max(1, -(-len(text) // CHUNK_CHARS))
+        if stream:
+            return FakeResponse(text, prompt, self.stream_seconds * scale / chunks)
+        if self.stream_seconds:
+            time.sleep(self.stream_seconds * scale)
+        return FakeResponse(text, prompt)
+
+
+def install_fake_llm(max_concurrency: int = 64, **kwargs) -> LLMGateway:
+    """Route every assistant call through a FakeLLM; returns the gateway it replaced"""
+    previous = get_gateway()
+    set_gateway(LLMGateway(PriorityScheduler(max_concurrency, tenant_quotas={}), backend=FakeLLM(**kwargs)))
+    return previous
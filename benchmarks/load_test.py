@@ -0,0 +1,299 @@
+"""
+Load test: N concurrent simulated users against one process, ramped step by step, for capacity planning
+
+Every model call goes to the latency-injected fake backend in benchmarks/fake_llm.py, so the numbers show
+how the pod's own limits (LLM gateway concurrency, job workers, API slots) behave as users pile up. Each
+user runs the full career pipeline --runs times, back to back. Per step it reports throughput, run
+latency percentiles, mean gateway queue wait, traced memory per user and the share of failed runs and
+failed model calls. The ramp stops early once p95 latency or the error rate breaks the given limits.
+
+Targets:
+    graph  CareerGraph.run on one thread per user
+    api    POST /v1/guidance against api_server running in-process (needs aiohttp)
+    app    enhanced_app.py through Streamlit's AppTest harness: submit the form, poll until the job is done
+           (needs streamlit; runs go through the shared job runner, so VISHCRAFT_JOB_WORKERS applies)
+
+Run from the repository root:
+    python -m benchmarks.load_test graph --users 1,2,4,8,16,32
+    python -m benchmarks.load_test api --users 4,16,64 --latency 0.5 --stream-seconds 1.0 --error-rate 0.02
+    python -m benchmarks.load_test app --users 1,2,4 --max-p95 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+
+from benchmarks.fake_llm import install_fake_llm
+from llm_gateway import DEFAULT_MAX_CONCURRENCY, get_gateway
+from tracing import LLM, Tracer, get_tracer, set_tracer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_INPUT = {"skills": ["Python", "Machine Learning", "SQL", "Communication"], "interests": ["AI", "Healthcare"], "experience": 3}
+DEFAULT_USERS = "1,2,4,8,16,32"
+# Seconds an app-mode user waits for its job before the run counts as failed
+APP_RUN_TIMEOUT = 300
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float("nan")
+
+
+class GraphTarget:
+    """Calls the pipeline directly, as a worker thread would"""
+
+    name = "graph"
+
+    def start(self):
+        from career_graph import build_career_graph
+        self._build = build_career_graph
+
+    def session(self):
+        return None
+
+    def run(self, session):
+        self._build().run(USER_INPUT)
+
+    def stop(self):
+        pass
+
+
+class ApiTarget:
+    """Serves api_server on a loopback port from a background event loop; users post with urllib"""
+
+    name = "api"
+
+    def __init__(self, concurrency: int = None):
+        self.concurrency = concurrency
+        self.url = None
+
+    def start(self):
+        from aiohttp import web
+        from api_server import DEFAULT_CONCURRENCY, create_app
+
+        app = create_app(max_concurrency=self.concurrency or DEFAULT_CONCURRENCY)
+        self._loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(app)
+        ready = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            self._loop.run_until_complete(site.start())
+            host, port = self._runner.addresses[0][:2]
+            self.url = f"http://{host}:{port}/v1/guidance"
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="load-test-api", daemon=True)
+        self._thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("API server did not start")
+
+    def session(self):
+        return None
+
+    def run(self, session):
+        body = json.dumps(USER_INPUT).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=APP_RUN_TIMEOUT) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"HTTP {e.code}") from e
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+
+
+class AppTarget:
+    """Drives enhanced_app.py with one AppTest session per user, like a browser tab"""
+
+    name = "app"
+
+    def __init__(self, poll_seconds: float = 0.25):
+        self.poll_seconds = poll_seconds
+
+    def start(self):
+        from streamlit.testing.v1 import AppTest
+        self._app_test = AppTest
+
+    def session(self):
+        at = self._app_test.from_file(os.path.join(REPO_ROOT, "enhanced_app.py"), default_timeout=60)
+        at.run()
+        return at
+
+    def run(self, at):
+        at.text_area[0].input(", ".join(USER_INPUT["skills"]))
+        at.text_area[1].input(", ".join(USER_INPUT["interests"]))
+        at.slider[0].set_value(USER_INPUT["experience"])
+        submit = next(button for button in at.button if "Generate Career Guidance" in button.label)
+        submit.click().run()
+        deadline = time.monotonic() + APP_RUN_TIMEOUT
+        # The status fragment's timer does not tick under AppTest; each rerun polls the job once
+        while "job_id" in at.session_state:
+            if time.monotonic() > deadline:
+                raise TimeoutError("Job did not finish")
+            time.sleep(self.poll_seconds)
+            at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if at.error:
+            raise RuntimeError(at.error[0].value)
+
+    def stop(self):
+        pass
+
+
+TARGETS = {"graph": GraphTarget, "api": ApiTarget, "app": AppTarget}
+
+
+def run_step(target, users: int, runs: int, track_memory: bool = True) -> dict:
+    """users threads each open a session and run the pipeline `runs` times; returns the step's figures"""
+    latencies, failures = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(users + 1)
+    get_tracer().aggregator.reset()
+
+    def user():
+        try:
+            session = target.session()
+        except Exception as e:
+            with lock:
+                failures.extend([f"session: {type(e).__name__}: {str(e)}"] * runs)
+            barrier.wait()
+            return
+        barrier.wait()
+        for _ in range(runs):
+            start = time.perf_counter()
+            try:
+                target.run(session)
+            except Exception as e:
+                with lock:
+                    failures.append(f"{type(e).__name__}: {str(e)}")
+            else:
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=user, name=f"load-user-{i}", daemon=True) for i in range(users)]
+    if track_memory:
+        tracemalloc.reset_peak()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+    for thread in threads:
+        thread.start()
+    # Sessions are opened before the clock starts, so app-mode script start-up is not counted as load
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes if track_memory else None
+
+    llm = get_tracer().aggregator.summary().get(f"{LLM}:generate_content", {})
+    total = len(latencies) + len(failures)
+    return {
+        "users": users,
+        "runs": total,
+        "runs_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_s": _percentile(latencies, 0.50),
+        "p95_s": _percentile(latencies, 0.95),
+        "p99_s": _percentile(latencies, 0.99),
+        "queue_wait_ms": llm.get("mean_queue_wait_ms", 0.0),
+        "error_rate": len(failures) / total if total else 0.0,
+        "llm_calls": llm.get("count", 0),
+        "llm_error_rate": llm["errors"] / llm["count"] if llm.get("count") else 0.0,
+        "kb_per_user": peak_bytes / users / 1024 if peak_bytes is not None else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "failures": sorted(set(failures))[:3]
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def print_step(step: dict):
+    memory = f"{step['kb_per_user']:>10.0f}" if step["kb_per_user"] is not None else f"{'-':>10}"
+    print(f"{step['users']:>6}{step['runs']:>6}{step['runs_per_s']:>9.2f}{step['p50_s']:>8.2f}{step['p95_s']:>8.2f}"
+          f"{step['p99_s']:>8.2f}{step['queue_wait_ms']:>10.0f}{step['error_rate']:>8.1%}{step['llm_error_rate']:>8.1%}"
+          f"{memory}{step['peak_rss_mb']:>9.0f}")
+    for failure in step["failures"]:
+        print(f"{'':>6}  ! {failure}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp concurrent simulated users against the career pipeline")
+    parser.add_argument("target", choices=sorted(TARGETS), help="graph, api or app")
+    parser.add_argument("--users", default=DEFAULT_USERS, help="Comma-separated concurrency steps")
+    parser.add_argument("--runs", type=int, default=3, help="Pipeline runs per user per step")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model seconds to first token")
+    parser.add_argument("--stream-seconds", type=float, default=0.3, help="Fake model seconds spent streaming each response")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Random +/- share applied to both latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake model calls that fail")
+    parser.add_argument("--llm-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Gateway slots (VISHCRAFT_LLM_CONCURRENCY)")
+    parser.add_argument("--api-concurrency", type=int, default=None, help="api target: pipeline calls in flight (VISHCRAFT_API_CONCURRENCY)")
+    parser.add_argument("--max-p95", type=float, default=None, help="Stop the ramp once p95 run latency exceeds this many seconds")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Stop the ramp once the failed-run share exceeds this")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows CPU-bound steps)")
+    parser.add_argument("--json", default=None, help="Also write the steps to this file")
+    args = parser.parse_args(argv)
+    steps = [int(users) for users in args.users.split(",") if users.strip()]
+
+    target = TARGETS[args.target](args.api_concurrency) if args.target == "api" else TARGETS[args.target]()
+    try:
+        target.start()
+    except ImportError as e:
+        print(f"Skipping the {args.target} target: missing dependency {e.name or str(e)}")
+        return 2
+
+    install_fake_llm(max_concurrency=args.llm_concurrency, latency=args.latency, stream_seconds=args.stream_seconds,
+                     jitter=args.jitter, error_rate=args.error_rate)
+    # In-process rollup only; a load test should not fill the real trace file
+    set_tracer(Tracer(exporters=[]))
+    if not args.no_memory:
+        tracemalloc.start()
+
+    print(f"target={args.target} runs/user={args.runs} latency={args.latency}s+{args.stream_seconds}s "
+          f"jitter={args.jitter:.0%} error_rate={args.error_rate:.0%} llm_concurrency={args.llm_concurrency}")
+    print(f"{'users':>6}{'runs':>6}{'runs/s':>9}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'queue ms':>10}"
+          f"{'failed':>8}{'llm err':>8}{'KB/user':>10}{'RSS MB':>9}")
+    results, capacity = [], None
+    try:
+        for users in steps:
+            step = run_step(target, users, args.runs, track_memory=not args.no_memory)
+            results.append(step)
+            print_step(step)
+            over_latency = args.max_p95 is not None and not step["p95_s"] <= args.max_p95
+            over_errors = args.max_error_rate is not None and step["error_rate"] > args.max_error_rate
+            if over_latency or over_errors:
+                print(f"Stopping: {'p95 latency' if over_latency else 'error rate'} limit exceeded at {users} users")
+                break
+            capacity = users
+    finally:
+        target.stop()
+
+    if args.max_p95 is not None or args.max_error_rate is not None:
+        print(f"Highest step within limits: {capacity if capacity is not None else 'none'} users")
+    print(f"Gateway usage: {get_gateway().usage()}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "steps": results, "capacity": capacity}, f, indent=2, default=str)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
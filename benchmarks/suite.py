@@ -0,0 +1,271 @@
+"""
+Benchmark suite: pipeline overhead, response parsers, timeline figure, report exports and import time,
+with saved baselines and a regression check
+
+Every model call goes to the offline fake backend in benchmarks/fake_llm.py, so no API key is needed.
+Groups whose dependencies are missing (e.g. plotly for the timeline) are reported as skipped.
+
+Run from the repository root:
+    python -m benchmarks.suite run                        # print results
+    python -m benchmarks.suite run --save mybranch        # also write benchmarks/baselines/mybranch.json
+    python -m benchmarks.suite compare baseline           # rerun and compare against a saved baseline
+    python -m benchmarks.suite compare baseline mybranch  # compare two saved result files
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.fake_llm import CHUNK_CHARS, LATERAL_PATHS, PERSONALITY, PLAN, ROLES, SKILL_GAPS, install_fake_llm
+from plan_structure import parse_action_plan
+from stream_parser import stream_list_items
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Relative change beyond which compare reports a regression
+DEFAULT_THRESHOLD = 0.15
+
+USER_INPUT = {"skills": ["Python", "Machine Learning", "SQL", "Communication"], "interests": ["AI", "Healthcare"], "experience": 3}
+STARTUP_MODULES = ("career_graph", "export_utils", "charts", "api_server")
+
+
+def measure(fn, min_batch_seconds: float = 0.05, batches: int = 7) -> float:
+    """Median seconds per call of fn over several batches, each long enough to time reliably"""
+    fn()
+    start = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - start, 1e-7)
+    loops = max(1, int(min_batch_seconds / once))
+    samples = []
+    for _ in range(batches):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return statistics.median(samples)
+
+
+def _metric(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+def _chunks(text: str):
+    return [text[i:i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)]
+
+
+def _graph_results():
+    from career_graph import build_career_graph
+    return build_career_graph().run(USER_INPUT)
+
+
+def bench_graph() -> dict:
+    """End-to-end CareerGraph.run with a zero-latency model: the pipeline's own overhead per run"""
+    from career_graph import build_career_graph
+    graph = build_career_graph()
+    return {"graph_run": _metric(measure(lambda: graph.run(USER_INPUT)) * 1000, "ms", "lower")}
+
+
+def bench_parsers() -> dict:
+    """Responses parsed per second for each response type, the way the assistants parse them"""
+    metrics = {}
+    for name, text in (("roles", ROLES), ("paths", LATERAL_PATHS), ("skill_gaps", SKILL_GAPS)):
+        chunks = _chunks(text)
+        metrics[f"parse_{name}"] = _metric(1 / measure(lambda: stream_list_items(chunks)), "responses/s", "higher")
+    metrics["parse_personality"] = _metric(1 / measure(lambda: ast.literal_eval(PERSONALITY)), "responses/s", "higher")
+    metrics["parse_plan"] = _metric(1 / measure(lambda: parse_action_plan(PLAN)), "responses/s", "higher")
+    return metrics
+
+
+def bench_timeline() -> dict:
+    """Uncached create_timeline_flowchart build for a 12-month plan"""
+    from charts import create_timeline_flowchart
+    structure = parse_action_plan(PLAN)
+    return {"timeline_build": _metric(measure(lambda: create_timeline_flowchart(PLAN, structure)) * 1000, "ms", "lower")}
+
+
+def bench_export() -> dict:
+    """Markdown and JSON reports rendered per second for one full run's results"""
+    from export_utils import export_results_as_json, format_results_as_markdown
+    results = _graph_results()
+    return {
+        "export_markdown": _metric(1 / measure(lambda: format_results_as_markdown(results, USER_INPUT)), "reports/s", "higher"),
+        "export_json": _metric(1 / measure(lambda: export_results_as_json(results, USER_INPUT)), "reports/s", "higher")
+    }
+
+
+def bench_startup(runs: int = 5) -> dict:
+    """Cold import time of the main modules, each in a fresh interpreter; None for modules that fail to import"""
+    metrics = {}
+    for module in STARTUP_MODULES:
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        samples = []
+        for _ in range(runs):
+            completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+            if completed.returncode != 0:
+                break
+            samples.append(float(completed.stdout.strip().splitlines()[-1]))
+        metrics[f"import_{module}"] = _metric(statistics.median(samples) * 1000, "ms", "lower") if samples else None
+    return metrics
+
+
+GROUPS = {
+    "graph": bench_graph,
+    "parsers": bench_parsers,
+    "timeline": bench_timeline,
+    "export": bench_export,
+    "startup": bench_startup,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_suite(groups=None) -> dict:
+    """Run the selected groups (default: all) and return a result document ready to save"""
+    from tracing import JsonlExporter, Tracer, set_tracer
+    install_fake_llm()
+    # Keep tracing on, as in production, but away from the real trace file
+    trace_file = tempfile.NamedTemporaryFile(prefix="bench-traces-", suffix=".jsonl", delete=False)
+    trace_file.close()
+    exporter = JsonlExporter(trace_file.name)
+    set_tracer(Tracer([exporter]))
+
+    metrics, skipped = {}, {}
+    try:
+        for name in groups or GROUPS:
+            try:
+                for metric, value in GROUPS[name]().items():
+                    if value is None:
+                        skipped[metric] = "import failed"
+                    else:
+                        metrics[metric] = dict(value, group=name)
+            except ImportError as e:
+                # The group's metric names are unknown when it cannot run, so the skip is keyed by group
+                skipped[name] = f"missing dependency: {e.name or str(e)}"
+    finally:
+        exporter.close()
+        os.unlink(trace_file.name)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": metrics,
+        "skipped": skipped
+    }
+
+
+def _baseline_path(name: str) -> str:
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_results(name: str) -> dict:
+    with open(_baseline_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: dict, name: str) -> str:
+    path = _baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD, groups=None) -> list:
+    """Rows of (metric, baseline, current, change, status); status is 'regression', 'improvement', 'ok' or 'missing'.
+
+    With groups, only baseline metrics from those groups are compared.
+    """
+    rows = []
+    for name, base in baseline["metrics"].items():
+        if groups and base.get("group") not in groups:
+            continue
+        now = current["metrics"].get(name)
+        if now is None:
+            rows.append((name, base, None, None, "missing"))
+            continue
+        if not base["value"]:
+            continue
+        change = (now["value"] - base["value"]) / base["value"]
+        # Normalize so that a positive change is always worse
+        worse = change if base["better"] == "lower" else -change
+        status = "regression" if worse > threshold else "improvement" if worse < -threshold else "ok"
+        rows.append((name, base, now, change, status))
+    return rows
+
+
+def skip_reason(results: dict, name: str, metric: dict) -> str:
+    """Why a metric is absent from results: skipped by name, skipped with its whole group, or not run"""
+    skipped = results.get("skipped", {})
+    return skipped.get(name) or skipped.get(metric.get("group")) or "not run"
+
+
+def print_results(results: dict):
+    print(f"{'metric':<24}{'value':>14}  unit")
+    for name, metric in results["metrics"].items():
+        print(f"{name:<24}{metric['value']:>14,.3f}  {metric['unit']}")
+    for name, reason in results["skipped"].items():
+        print(f"{name:<24}{'skipped':>14}  {reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VishCraft benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and print the results")
+    run.add_argument("--only", default=None, help="Comma-separated groups: " + ", ".join(GROUPS))
+    run.add_argument("--save", default=None, help="Save results as benchmarks/baselines/<name>.json (or a .json path)")
+
+    check = commands.add_parser("compare", help="Compare results against a saved baseline")
+    check.add_argument("baseline")
+    check.add_argument("current", nargs="?", default=None, help="Saved results to compare (default: run the suite now)")
+    check.add_argument("--only", default=None, help="Comma-separated groups to rerun and compare")
+    check.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    groups = [group.strip() for group in args.only.split(",")] if args.only else None
+    if groups and any(group not in GROUPS for group in groups):
+        parser.error(f"unknown group; choose from {', '.join(GROUPS)}")
+
+    if args.command == "run":
+        results = run_suite(groups)
+        print_results(results)
+        if args.save:
+            print(f"Saved to {save_results(results, args.save)}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current) if args.current else run_suite(groups)
+    rows = compare(baseline, current, args.threshold, groups)
+    print(f"baseline {baseline.get('commit') or '?'} ({baseline['created']}) vs current {current.get('commit') or '?'} ({current['created']})")
+    print(f"{'metric':<24}{'baseline':>14}{'current':>14}{'change':>10}  status")
+    for name, base, now, change, status in rows:
+        if now is None:
+            print(f"{name:<24}{base['value']:>14,.3f}{'-':>14}{'':>10}  {status} ({skip_reason(current, name, base)})")
+        else:
+            print(f"{name:<24}{base['value']:>14,.3f}{now['value']:>14,.3f}{change:>+10.1%}  {status}")
+    regressions = [row[0] for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from export_utils import REPORT_FORMATS
+from history_store import HistoryStore, decode_results
+
+DEFAULT_FORMATS = ("markdown",)
+
+# Runs per worker task: large enough to amortize pickling, small enough to keep every core busy
+DEFAULT_CHUNK_SIZE = 16
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+def _slug(text: str) -> str:
+    return _SLUG_RE.sub('-', text.lower()).strip('-')[:40] or 'report'
+
+
+def _render_chunk(tasks: List[Tuple], formats: Tuple[str, ...]) -> Tuple[List[Tuple[str, bytes]], List[str]]:
+    """Worker: render every format for a chunk of runs; returns (zip entries, errors)"""
+    entries, errors = [], []
+    for name, kind, payload, user_input in tasks:
+        try:
+            if kind == "stored":
+                results = decode_results(payload)
+            else:
+                record = json.loads(payload)
+                if not isinstance(record.get("results"), dict):
+                    raise ValueError("line has no results object")
+                results = record["results"]
+                user_input = record.get("user_input", {})
+            for fmt in formats:
+                render, extension = REPORT_FORMATS[fmt]
+                entries.append((f"{fmt}/{name}.{extension}", "".join(render(results, user_input)).encode("utf-8")))
+        except Exception as e:
+            errors.append(f"{name}: {str(e)}")
+    return entries, errors
+
+
+def stored_run_tasks(store: HistoryStore, user_id: str = None, since: float = None) -> Iterator[Tuple]:
+    """Render tasks for runs in the history store; results stay compressed until a worker decodes them"""
+    for summary, encoded in store.iter_run_results(user_id=user_id, since=since):
+        name = f"run_{summary['id']:06d}_{_slug('-'.join(summary['skills'][:2]))}"
+        user_input = {key: summary[key] for key in ("skills", "interests", "experience")}
+        yield name, "stored", encoded, user_input
+
+
+def jsonl_tasks(path: str) -> Iterator[Tuple]:
+    """Render tasks for a batch-run JSONL file: one {"user_input": ..., "results": ...} object per line"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield f"report_{line_number:06d}", "jsonl", line, None
+
+
+def _chunks(tasks: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    chunk = []
+    for task in tasks:
+        chunk.append(task)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_export(tasks: Iterable[Tuple], out_path: str, formats: Iterable[str] = DEFAULT_FORMATS,
+                max_workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """Render reports for every task across a process pool and stream them into a zip archive.
+
+    At most a few chunks per worker are in flight, so memory stays bounded by the window rather than by
+    the number of runs. Entries are written to the archive as chunks finish.
+    """
+    formats = tuple(formats)
+    unknown = [fmt for fmt in formats if fmt not in REPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(unknown)}")
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_workers * 2
+
+    stats = {"runs": 0, "reports": 0, "bytes": 0, "errors": []}
+    chunk_runs = {}
+    start = time.perf_counter()
+
+    def collect(done):
+        for future in done:
+            stats["runs"] += chunk_runs.pop(future)
+            entries, errors = future.result()
+            for arcname, data in entries:
+                archive.writestr(arcname, data)
+                stats["reports"] += 1
+                stats["bytes"] += len(data)
+            stats["errors"].extend(errors)
+
+    with zipfile.ZipFile(out_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for chunk in _chunks(tasks, chunk_size):
+                future = executor.submit(_render_chunk, chunk, formats)
+                chunk_runs[future] = len(chunk)
+                pending.add(future)
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            collect(wait(pending)[0])
+
+    stats["seconds"] = time.perf_counter() - start
+    # Throughput is per run: one run yields a file per format, so a files/s figure would scale with --formats
+    stats["runs_per_second"] = stats["runs"] / max(stats["seconds"], 1e-9)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render stored or batch-run career reports into a zip archive")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="History database to export (default: VISHCRAFT_HISTORY_DB)")
+    source.add_argument("--jsonl", help="Batch-run JSONL file with user_input/results objects")
+    parser.add_argument("--user", help="Only export runs for this user id (history database only)")
+    parser.add_argument("--out", default="career_reports.zip", help="Output zip path")
+    parser.add_argument("--formats", default="markdown", help="Comma-separated formats: " + ", ".join(REPORT_FORMATS))
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Runs per worker task")
+    args = parser.parse_args(argv)
+
+    if args.jsonl:
+        tasks = jsonl_tasks(args.jsonl)
+    else:
+        tasks = stored_run_tasks(HistoryStore(args.db) if args.db else HistoryStore(), user_id=args.user)
+
+    stats = bulk_export(tasks, args.out, formats=[fmt.strip() for fmt in args.formats.split(",") if fmt.strip()],
+                        max_workers=args.workers, chunk_size=args.chunk_size)
+    print(f"Wrote {stats['reports']} files for {stats['runs']} runs ({stats['bytes'] / 1024 / 1024:.1f} MiB) to {args.out} "
+          f"in {stats['seconds']:.2f}s: {stats['runs_per_second']:.1f} runs/s")
+    for error in stats["errors"][:20]:
+        print(f"  error: {error}")
+    if len(stats["errors"]) > 20:
+        print(f"  ... {len(stats['errors']) - 20} more errors")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,9 @@ from dotenv import load_dotenv
 from role_fit_assistant import RoleFitAssistant
 from career_path_assistant import CareerPathAssistant
 from action_plan_assistant import ActionPlanAssistant
+from career_results import ActionPlanResult, CareerPathResult, CareerResults, EnhancedFeatures, RoleFitResult
+from llm_gateway import current_tenant, llm_tenant
+from tracing import RUN, STAGE, trace_span
 
 load_dotenv()
 
@@ -17,16 +20,26 @@ action_plan = ActionPlanAssistant(api_key=GEMINI_API_KEY)
 
 
 def build_career_graph():
-    def run(user_input):
+    def run(user_input, on_item=None, on_stage=None, tenant=None):
+        # on_item(stage, item) receives each list element (role, path, skill gap) as soon as it streams in;
+        # on_stage(stage, data) receives each completed stage (personality, roles, paths, plan chunks, plan, gaps);
+        # tenant attributes every LLM call of the run for quotas and usage (default: the caller's tenant)
+        tenant = tenant or current_tenant()
+        with llm_tenant(tenant), trace_span("career_graph.run", RUN, tenant=tenant):
+            return _run_stages(user_input, on_item, on_stage)
+
+    def _run_stages(user_input, on_item, on_stage):
         # Stage 1: Enhanced role fitting with personality inference
-        role_result = role_fit.run(user_input)
+        with trace_span("role_fit", STAGE):
+            role_result = role_fit.run(user_input, on_item=on_item, on_stage=on_stage)
        
         # Stage 2: Enhanced career path generation (vertical + lateral)
         path_input = {
             "recommended_roles": role_result["recommended_roles"],
             "personality_profile": role_result.get("personality_profile", {})
         }
-        path_result = career_path.run(path_input)
+        with trace_span("career_path", STAGE):
+            path_result = career_path.run(path_input, on_item=on_item, on_stage=on_stage)
       
         # Stage 3: Adaptive action plan generation
         action_input = {
@@ -34,19 +47,20 @@ def build_career_graph():
             "current_skills": user_input.get("skills", []),
             "personality_profile": role_result.get("personality_profile", {})
         }
-        action_result = action_plan.run(action_input)
+        with trace_span("action_plan", STAGE):
+            action_result = action_plan.run(action_input, on_item=on_item, on_stage=on_stage)
     
-        return {
-            "role_fit": role_result,
-            "career_path": path_result,
-            "action_plan": action_result,
-            "enhanced_features": {
-                "personality_inference": True,
-                "lateral_paths": True,
-                "adaptive_planning": True,
-                "monetization_ready": action_result.get("monetization_ready", False)
-            }
-        }
+        return CareerResults(
+            role_fit=RoleFitResult.from_dict(role_result),
+            career_path=CareerPathResult.from_dict(path_result),
+            action_plan=ActionPlanResult.from_dict(action_result),
+            enhanced_features=EnhancedFeatures(
+                personality_inference=True,
+                lateral_paths=True,
+                adaptive_planning=True,
+                monetization_ready=action_result.get("monetization_ready", False)
+            )
+        )
     return type("CareerGraph", (), {"run": staticmethod(run)})
 
 if __name__ == "__main__":
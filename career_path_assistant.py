@@ -1,20 +1,25 @@
 
-import google.generativeai as genai
 import re
-from typing import List, Dict
+from typing import Callable, List, Dict
 import os
 from dotenv import load_dotenv
 import ast
 
+from key_pool import register_api_key
+from llm_gateway import generate
+from tracing import trace_span
+from stream_parser import iter_response_text, stream_list_items
+
 
 class CareerPathAssistant:
     def __init__(self, api_key: str = None, model: str = 'gemini-2.0-flash'):
         load_dotenv()
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.model = model
-        genai.configure(api_key=self.api_key)
+        # Keys live in the shared pool, each with its own client; genai.configure is process-global
+        register_api_key(self.api_key)
 
-    def _generate_vertical_paths(self, roles: List[str]) -> List[str]:
+    def _generate_vertical_paths(self, roles: List[str], on_item: Callable[[str], None] = None) -> List[str]:
         """Generate vertical (upward) career progression paths"""
         prompt = (
             f"SYSTEM: You are a career trajectory architect specializing in vertical growth maps across industries.\n\n"
@@ -28,23 +33,31 @@ class CareerPathAssistant:
             f"OUTPUT: Return a Python list of progression strings. Each string should represent a complete career path."
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
-        
-        try:
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+        with trace_span("vertical_paths", parse_outcome="stream") as span:
+            response = generate(self.model, prompt, stream=True)
+            vertical_paths, raw_text = stream_list_items(iter_response_text(response), on_item)
+            if vertical_paths is not None:
+                span.set(items=len(vertical_paths))
+                return vertical_paths
             
-            vertical_paths = ast.literal_eval(text)
-            if not isinstance(vertical_paths, list):
-                vertical_paths = [str(response.text)]
-        except Exception:
-            vertical_paths = [f"Junior {role} → Senior {role} → Lead {role}" for role in roles[:3]]
+            try:
+                text = raw_text.strip()
+                if text.startswith('```'):
+                    text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                
+                vertical_paths = ast.literal_eval(text)
+                span.set(parse_outcome="literal")
+                if not isinstance(vertical_paths, list):
+                    span.set(parse_outcome="fallback")
+                    vertical_paths = [str(raw_text)]
+            except Exception:
+                span.set(parse_outcome="fallback")
+                vertical_paths = [f"Junior {role} → Senior {role} → Lead {role}" for role in roles[:3]]
+            span.set(items=len(vertical_paths))
         
         return vertical_paths
 
-    def _generate_lateral_paths(self, roles: List[str]) -> List[str]:
+    def _generate_lateral_paths(self, roles: List[str], on_item: Callable[[str], None] = None) -> List[str]:
         """Generate lateral (sideways) career transition paths"""
         prompt = (
             f"SYSTEM: You are an occupational pathways engineer trained in cognitive skill portability.\n\n"
@@ -58,29 +71,49 @@ class CareerPathAssistant:
             f"OUTPUT: Return a Python list of transition strings. Each string should represent a complete lateral path."
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
-        
-        try:
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+        with trace_span("lateral_paths", parse_outcome="stream") as span:
+            response = generate(self.model, prompt, stream=True)
+            lateral_paths, raw_text = stream_list_items(iter_response_text(response), on_item)
+            if lateral_paths is not None:
+                span.set(items=len(lateral_paths))
+                return lateral_paths
             
-            lateral_paths = ast.literal_eval(text)
-            if not isinstance(lateral_paths, list):
-                lateral_paths = [str(response.text)]
-        except Exception:
-            lateral_paths = [f"{role} → Product Manager → Consultant" for role in roles[:3]]
+            try:
+                text = raw_text.strip()
+                if text.startswith('```'):
+                    text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                
+                lateral_paths = ast.literal_eval(text)
+                span.set(parse_outcome="literal")
+                if not isinstance(lateral_paths, list):
+                    span.set(parse_outcome="fallback")
+                    lateral_paths = [str(raw_text)]
+            except Exception:
+                span.set(parse_outcome="fallback")
+                lateral_paths = [f"{role} → Product Manager → Consultant" for role in roles[:3]]
+            span.set(items=len(lateral_paths))
         
         return lateral_paths
 
-    def run(self, input: Dict) -> Dict:
+    def run(self, input: Dict, on_item: Callable[[str, str], None] = None, on_stage: Callable[[str, object], None] = None) -> Dict:
         roles = input.get('recommended_roles', [])
         personality_profile = input.get('personality_profile', {})
         
+        def _emitter(key):
+            if not on_item:
+                return None
+            def _emit(path):
+                if path and str(path).lower() != 'undefined':
+                    on_item(key, path)
+            return _emit
+
         # Generate both vertical and lateral paths
-        vertical_paths = self._generate_vertical_paths(roles)
-        lateral_paths = self._generate_lateral_paths(roles)
+        vertical_paths = self._generate_vertical_paths(roles, _emitter("vertical_paths"))
+        if on_stage:
+            on_stage("vertical_paths", vertical_paths)
+        lateral_paths = self._generate_lateral_paths(roles, _emitter("lateral_paths"))
+        if on_stage:
+            on_stage("lateral_paths", lateral_paths)
         
         # Combine and clean paths
         all_paths = vertical_paths + lateral_paths
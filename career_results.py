@@ -0,0 +1,159 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from plan_structure import PlanStructure, as_plan_structure
+
+
+# Slotted dataclasses: no per-instance __dict__, so a stored run costs only its field values.
+# to_dict/from_dict are written out by hand instead of dataclasses.asdict, which deep-copies recursively.
+
+@dataclass(slots=True)
+class RoleFitResult:
+    """Output of RoleFitAssistant"""
+    recommended_roles: List[str] = field(default_factory=list)
+    personality_profile: Dict = field(default_factory=dict)
+    profile_summary: str = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "recommended_roles": self.recommended_roles,
+            "personality_profile": self.personality_profile,
+            "profile_summary": self.profile_summary
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RoleFitResult':
+        return cls(
+            recommended_roles=list(data.get("recommended_roles", [])),
+            personality_profile=dict(data.get("personality_profile") or {}),
+            profile_summary=data.get("profile_summary", "")
+        )
+
+
+@dataclass(slots=True)
+class CareerPathResult:
+    """Output of CareerPathAssistant"""
+    career_paths: List[str] = field(default_factory=list)
+    vertical_paths: List[str] = field(default_factory=list)
+    lateral_paths: List[str] = field(default_factory=list)
+    path_summary: str = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "career_paths": self.career_paths,
+            "vertical_paths": self.vertical_paths,
+            "lateral_paths": self.lateral_paths,
+            "path_summary": self.path_summary
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CareerPathResult':
+        return cls(
+            career_paths=list(data.get("career_paths", [])),
+            vertical_paths=list(data.get("vertical_paths", [])),
+            lateral_paths=list(data.get("lateral_paths", [])),
+            path_summary=data.get("path_summary", "")
+        )
+
+
+@dataclass(slots=True)
+class ActionPlanResult:
+    """Output of ActionPlanAssistant"""
+    action_plan: str = ""
+    plan_structure: Optional[PlanStructure] = None
+    skill_gaps: List[str] = field(default_factory=list)
+    progress_tracker: Dict = field(default_factory=dict)
+    plan_type: str = "adaptive"
+    monetization_ready: bool = False
+    plan_summary: str = ""
+
+    def to_dict(self) -> Dict:
+        return {
+            "action_plan": self.action_plan,
+            "plan_structure": self.plan_structure.to_dict() if self.plan_structure is not None else None,
+            "skill_gaps": self.skill_gaps,
+            "progress_tracker": self.progress_tracker,
+            "plan_type": self.plan_type,
+            "monetization_ready": self.monetization_ready,
+            "plan_summary": self.plan_summary
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ActionPlanResult':
+        return cls(
+            action_plan=data.get("action_plan", ""),
+            plan_structure=as_plan_structure(data.get("plan_structure")),
+            skill_gaps=list(data.get("skill_gaps", [])),
+            progress_tracker=dict(data.get("progress_tracker") or {}),
+            plan_type=data.get("plan_type", "adaptive"),
+            monetization_ready=bool(data.get("monetization_ready", False)),
+            plan_summary=data.get("plan_summary", "")
+        )
+
+
+@dataclass(slots=True)
+class EnhancedFeatures:
+    """Feature flags reported alongside a run"""
+    personality_inference: bool = True
+    lateral_paths: bool = True
+    adaptive_planning: bool = True
+    monetization_ready: bool = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "personality_inference": self.personality_inference,
+            "lateral_paths": self.lateral_paths,
+            "adaptive_planning": self.adaptive_planning,
+            "monetization_ready": self.monetization_ready
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EnhancedFeatures':
+        return cls(
+            personality_inference=bool(data.get("personality_inference", True)),
+            lateral_paths=bool(data.get("lateral_paths", True)),
+            adaptive_planning=bool(data.get("adaptive_planning", True)),
+            monetization_ready=bool(data.get("monetization_ready", False))
+        )
+
+
+@dataclass(slots=True)
+class CareerResults:
+    """Full output of one career-graph run"""
+    role_fit: RoleFitResult = field(default_factory=RoleFitResult)
+    career_path: CareerPathResult = field(default_factory=CareerPathResult)
+    action_plan: ActionPlanResult = field(default_factory=ActionPlanResult)
+    enhanced_features: EnhancedFeatures = field(default_factory=EnhancedFeatures)
+
+    def to_dict(self) -> Dict:
+        # When a run was saved lives in the history store (runs.created_at), not in the results
+        return {
+            "role_fit": self.role_fit.to_dict(),
+            "career_path": self.career_path.to_dict(),
+            "action_plan": self.action_plan.to_dict(),
+            "enhanced_features": self.enhanced_features.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CareerResults':
+        return cls(
+            role_fit=RoleFitResult.from_dict(data.get("role_fit") or {}),
+            career_path=CareerPathResult.from_dict(data.get("career_path") or {}),
+            action_plan=ActionPlanResult.from_dict(data.get("action_plan") or {}),
+            enhanced_features=EnhancedFeatures.from_dict(data.get("enhanced_features") or {})
+        )
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_json(cls, text) -> 'CareerResults':
+        return cls.from_dict(json.loads(text))
+
+
+def as_career_results(value) -> Optional[CareerResults]:
+    """Accept CareerResults or its dict form (older history entries, API payloads)"""
+    if value is None or isinstance(value, CareerResults):
+        return value
+    return CareerResults.from_dict(value)
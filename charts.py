@@ -0,0 +1,312 @@
+import hashlib
+import textwrap
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from plan_structure import as_plan_structure, parse_action_plan
+from skill_taxonomy import classify_skills
+
+
+def generate_skill_categories(skills):
+    # Categorize skills with the local taxonomy; the level reflects how confidently each skill was recognized
+    skill_data = [
+        {"Skill": match.skill, "Category": match.category, "Level": match.score}
+        for match in classify_skills(tuple(skills))
+    ]
+    
+    return pd.DataFrame(skill_data, columns=["Skill", "Category", "Level"])
+
+
+def create_skill_radar_chart(skill_df):
+    if skill_df.empty:
+        return None
+        
+    # Group by category and calculate average
+    category_avg = skill_df.groupby('Category')['Level'].mean().reset_index()
+    
+    # Create radar chart
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatterpolar(
+        r=category_avg['Level'].tolist() + [category_avg['Level'].tolist()[0]],
+        theta=category_avg['Category'].tolist() + [category_avg['Category'].tolist()[0]],
+        fill='toself',
+        fillcolor='rgba(58, 113, 202, 0.2)',
+        line=dict(color='#3a71ca', width=2),
+        name='Your Skills'
+    ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )),
+        showlegend=False,
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    return fig
+
+
+def create_progress_chart(total, completed):
+    if total == 0:
+        return None
+        
+    percentage = (completed / total) * 100
+    
+    fig = go.Figure()
+    
+    # Add progress bar
+    fig.add_trace(go.Indicator(
+        mode="gauge+number",
+        value=percentage,
+        title={"text": "Skill Progress"},
+        gauge={
+            'axis': {'range': [0, 100], 'tickwidth': 1},
+            'bar': {'color': "#3a71ca"},
+            'bgcolor': "white",
+            'steps': [
+                {'range': [0, 33], 'color': "#f1f5fd"},
+                {'range': [33, 66], 'color': "#e7effd"},
+                {'range': [66, 100], 'color': "#d4e4fc"}
+            ],
+        },
+        number={'suffix': "%"}
+    ))
+    
+    fig.update_layout(
+        height=250,
+        margin=dict(l=20, r=20, t=30, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    return fig
+
+
+# Caps on the timeline's label payload; labels are drawn as a few text traces, not one annotation each
+TIMELINE_MAX_TASKS = 3
+TIMELINE_TITLE_CHARS = 60
+TIMELINE_TASK_CHARS = 70
+TIMELINE_TITLE_WIDTH = 24
+TIMELINE_TASK_WIDTH = 26
+
+
+def _truncate(text, limit):
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _wrap_label(text, width):
+    # Scatter text does not wrap on its own, so break long labels into lines
+    return "<br>".join(textwrap.wrap(text, width)) or text
+
+
+def create_timeline_flowchart(action_plan_text, plan_structure=None):
+    """
+    Create a professional timeline flowchart from the action plan text
+    Uses the plan structure computed by ActionPlanAssistant, scanning the markdown only for older results
+    """
+    if not action_plan_text:
+        return None
+    
+    plan_structure = as_plan_structure(plan_structure) or parse_action_plan(action_plan_text)
+    months_data = []
+    for milestone in plan_structure.milestones:
+        if milestone.month > 12:  # Ensure we only get months 1-12
+            continue
+        title = _truncate(milestone.title, TIMELINE_TITLE_CHARS)
+        # Truncate long tasks
+        tasks = [_truncate(task, TIMELINE_TASK_CHARS) for task in milestone.tasks]
+        
+        # If no tasks were found, promote the title to the single task
+        if not tasks and title != f"Month {milestone.month} Milestones":
+            tasks.append(title)
+            title = f"Month {milestone.month}"
+        
+        # Limit to the most important tasks
+        months_data.append({
+            "month": milestone.month,
+            "title": title,
+            "tasks": tasks[:TIMELINE_MAX_TASKS]
+        })
+    
+    # If we couldn't parse any months, return None
+    if not months_data:
+        return None
+    
+    # Create a professional timeline flowchart
+    fig = go.Figure()
+    
+    # Define a professional color palette
+    colors = [
+        "#1A365D",  # Dark blue
+        "#2A6BAE",  # Medium blue
+        "#3C8DBC",  # Light blue
+        "#0E4D92",  # Royal blue
+        "#4B86B4",  # Steel blue
+        "#2E5984",  # Navy blue
+        "#3E6990",  # Blue gray
+        "#254E70",  # Dark slate blue
+        "#1F3F66",  # Dark navy
+        "#2C4770",  # Indigo blue
+        "#2B5D7D",  # Teal blue
+        "#346888"   # Slate blue
+    ]
+    positions = list(range(1, len(months_data) + 1))
+    month_colors = [colors[i % len(colors)] for i in range(len(months_data))]
+    
+    # Main timeline axis with the month numbers drawn inside the markers
+    fig.add_trace(go.Scatter(
+        x=positions,
+        y=[0] * len(months_data),
+        mode="lines+markers+text",
+        line=dict(color="#0A2463", width=3),
+        marker=dict(size=20, color="#0A2463", symbol="circle"),
+        text=[str(month_data["month"]) for month_data in months_data],
+        textposition="middle center",
+        textfont=dict(size=12, color="white"),
+        hoverinfo="none",
+        showlegend=False
+    ))
+    
+    # All month titles above the timeline in one text trace
+    fig.add_trace(go.Scatter(
+        x=positions,
+        y=[0.3] * len(months_data),
+        mode="text",
+        text=[f"<b>{_wrap_label(month_data['title'], TIMELINE_TITLE_WIDTH)}</b>" for month_data in months_data],
+        textposition="middle center",
+        textfont=dict(size=12, color=month_colors),
+        hoverinfo="skip",
+        showlegend=False
+    ))
+    
+    # All tasks below the timeline in one text trace
+    task_x, task_y, task_text = [], [], []
+    for position, month_data in zip(positions, months_data):
+        for row, task in enumerate(month_data["tasks"]):
+            task_x.append(position)
+            task_y.append(-0.3 - 0.2 * row)
+            task_text.append(_wrap_label(f"• {task}", TIMELINE_TASK_WIDTH))
+    if task_text:
+        fig.add_trace(go.Scatter(
+            x=task_x,
+            y=task_y,
+            mode="text",
+            text=task_text,
+            textposition="middle center",
+            textfont=dict(size=10, color="#333333"),
+            hoverinfo="skip",
+            showlegend=False
+        ))
+    
+    # Layout configuration
+    fig.update_layout(
+        title=dict(
+            text="<b>12-Month Career Development Timeline</b>",
+            font=dict(size=18, color="#0A2463"),
+            x=0.5
+        ),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        height=500,
+        xaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False,
+            range=[0, len(months_data) + 1]
+        ),
+        yaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False,
+            range=[-1, 1]
+        ),
+        margin=dict(l=20, r=20, t=60, b=20),
+        shapes=[
+            # Horizontal line for timeline
+            dict(
+                type="line",
+                xref="x",
+                yref="y",
+                x0=0.5,
+                y0=0,
+                x1=len(months_data) + 0.5,
+                y1=0,
+                line=dict(color="#0A2463", width=3)
+            )
+        ]
+    )
+    
+    return fig
+
+
+class FigureCache:
+    """Bounded LRU cache of built figures keyed on a hash of the inputs they were built from.
+
+    Figures are shared between reruns and sessions, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name, *parts):
+        digest = hashlib.sha256(name.encode())
+        for part in parts:
+            digest.update(b"\0" + repr(part).encode())
+        return digest.hexdigest()
+
+    def get_or_build(self, name, parts, builder):
+        key = self.key(name, *parts)
+        with self._lock:
+            if key in self._figures:
+                self.hits += 1
+                self._figures.move_to_end(key)
+                return self._figures[key]
+            self.misses += 1
+        figure = builder()
+        with self._lock:
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+figure_cache = FigureCache()
+
+
+def cached_skill_radar_chart(skills):
+    """Radar chart for the skill list, built once per distinct list"""
+    return figure_cache.get_or_build(
+        "skill_radar", (tuple(skills),),
+        lambda: create_skill_radar_chart(generate_skill_categories(skills))
+    )
+
+
+def cached_progress_chart(total, completed):
+    """Progress gauge, built once per (total, completed) pair"""
+    return figure_cache.get_or_build("progress", (total, completed), lambda: create_progress_chart(total, completed))
+
+
+def cached_timeline_flowchart(action_plan_text, plan_structure=None):
+    """Timeline flowchart keyed on the plan text; the structure is derived from it so it is not part of the key"""
+    return figure_cache.get_or_build(
+        "timeline", (action_plan_text,),
+        lambda: create_timeline_flowchart(action_plan_text, plan_structure)
+    )
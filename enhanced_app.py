@@ -1,15 +1,16 @@
 import streamlit as st
-from career_graph import build_career_graph
+from job_runner import get_job_runner, submit_career_run
 import json
-import time
 from datetime import datetime
+import hmac
 import os
-from export_utils import export_results_as_json, format_results_as_markdown
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import random
-import re
+import uuid
+from export_utils import export_report
+from key_pool import load_api_keys
+from progress_engine import ProgressEngine
+from history_store import get_history_store
+from result_store import get_result_store
+from charts import cached_progress_chart, cached_skill_radar_chart, cached_timeline_flowchart
 
 # Page configuration
 st.set_page_config(
@@ -32,8 +33,8 @@ local_css("assets/enhanced_style.css")
 
 # Check API key configuration
 def check_api_key():
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key or api_key == 'YOUR_GEMINI_API_KEY_HERE':
+    # Either a single GEMINI_API_KEY or a comma-separated GEMINI_API_KEYS pool is enough
+    if not load_api_keys():
         st.error("🔑 **API Key Not Configured!**")
         st.markdown("""
         **To use this application, you need a valid Gemini API key:**
@@ -49,258 +50,72 @@ def check_api_key():
 
 check_api_key()
 
-# Helper functions
-def generate_skill_categories(skills):
-    # Mock skill categories for visualization
-    categories = ["Technical", "Soft", "Domain", "Tools"]
-    skill_data = []
-    
-    for skill in skills:
-        category = random.choice(categories)
-        level = random.randint(50, 100)
-        skill_data.append({"Skill": skill, "Category": category, "Level": level})
-    
-    return pd.DataFrame(skill_data)
+# Persistent per-browser user id (kept in the URL) so run history survives refreshes
+if 'user_id' not in st.session_state:
+    st.session_state.user_id = st.query_params.get("uid") or uuid.uuid4().hex
+    st.query_params["uid"] = st.session_state.user_id
 
-def create_skill_radar_chart(skill_df):
-    if skill_df.empty:
-        return None
-        
-    # Group by category and calculate average
-    category_avg = skill_df.groupby('Category')['Level'].mean().reset_index()
-    
-    # Create radar chart
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatterpolar(
-        r=category_avg['Level'].tolist() + [category_avg['Level'].tolist()[0]],
-        theta=category_avg['Category'].tolist() + [category_avg['Category'].tolist()[0]],
-        fill='toself',
-        fillcolor='rgba(58, 113, 202, 0.2)',
-        line=dict(color='#3a71ca', width=2),
-        name='Your Skills'
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100]
-            )),
-        showlegend=False,
-        height=300,
-        margin=dict(l=20, r=20, t=30, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-    )
-    
-    return fig
+HISTORY_PAGE_SIZE = 5
 
-def create_progress_chart(total, completed):
-    if total == 0:
-        return None
-        
-    percentage = (completed / total) * 100
-    
-    fig = go.Figure()
-    
-    # Add progress bar
-    fig.add_trace(go.Indicator(
-        mode="gauge+number",
-        value=percentage,
-        title={"text": "Skill Progress"},
-        gauge={
-            'axis': {'range': [0, 100], 'tickwidth': 1},
-            'bar': {'color': "#3a71ca"},
-            'bgcolor': "white",
-            'steps': [
-                {'range': [0, 33], 'color': "#f1f5fd"},
-                {'range': [33, 66], 'color': "#e7effd"},
-                {'range': [66, 100], 'color': "#d4e4fc"}
-            ],
-        },
-        number={'suffix': "%"}
-    ))
-    
-    fig.update_layout(
-        height=250,
-        margin=dict(l=20, r=20, t=30, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-    )
-    
-    return fig
+# Reattach to a background job after a browser refresh or reconnect
+if 'job_id' not in st.session_state and st.query_params.get("job"):
+    st.session_state.job_id = st.query_params["job"]
 
-def create_timeline_flowchart(action_plan_text):
-    """
-    Create a professional timeline flowchart from the action plan text
-    Parse the markdown text to extract monthly milestones and create a visual representation
-    """
-    if not action_plan_text:
-        return None
-    
-    # Extract monthly milestones using regex
-    months_data = []
-    month_pattern = r"(?:^|\n)(?:\#{1,3}\s*)?(?:Month|MONTH)\s*(\d{1,2})(?:\s*[-:])?\s*(.*?)(?=\n(?:\#{1,3}\s*)?(?:Month|MONTH)\s*\d{1,2}|\n\#{1,3}|\Z)"
-    month_matches = re.finditer(month_pattern, action_plan_text, re.DOTALL | re.MULTILINE)
-    
-    for match in month_matches:
-        month_num = int(match.group(1))
-        if month_num <= 12:  # Ensure we only get months 1-12
-            content = match.group(2).strip()
-            # Extract the first sentence or bullet point as the title
-            title_match = re.search(r'^([^\.•\n]+(?:\.[^\.•\n]+)?)', content)
-            title = title_match.group(1).strip() if title_match else f"Month {month_num} Milestones"
-            
-            # Extract key tasks using bullet points
-            tasks = []
-            task_matches = re.finditer(r'(?:^|\n)(?:[-•*]\s*|\d+\.\s*)(.*?)(?=\n[-•*]|\n\d+\.|\Z)', content, re.DOTALL)
-            for task_match in task_matches:
-                task = task_match.group(1).strip()
-                if task and len(task) > 3:  # Filter out very short tasks
-                    # Truncate long tasks
-                    if len(task) > 70:
-                        task = task[:67] + "..."
-                    tasks.append(task)
-            
-            # If no tasks were found, create a generic one
-            if not tasks and title != f"Month {month_num} Milestones":
-                tasks.append(title)
-                title = f"Month {month_num}"
-            
-            # Limit to 3 most important tasks
-            tasks = tasks[:3]
-            
-            months_data.append({
-                "month": month_num,
-                "title": title,
-                "tasks": tasks
-            })
-    
-    # If we couldn't parse any months, return None
-    if not months_data:
-        return None
-    
-    # Sort by month number
-    months_data.sort(key=lambda x: x["month"])
-    
-    # Create a professional timeline flowchart
-    fig = go.Figure()
-    
-    # Define a professional color palette
-    colors = [
-        "#1A365D",  # Dark blue
-        "#2A6BAE",  # Medium blue
-        "#3C8DBC",  # Light blue
-        "#0E4D92",  # Royal blue
-        "#4B86B4",  # Steel blue
-        "#2E5984",  # Navy blue
-        "#3E6990",  # Blue gray
-        "#254E70",  # Dark slate blue
-        "#1F3F66",  # Dark navy
-        "#2C4770",  # Indigo blue
-        "#2B5D7D",  # Teal blue
-        "#346888"   # Slate blue
-    ]
-    
-    # Main timeline axis
-    fig.add_trace(go.Scatter(
-        x=list(range(1, len(months_data) + 1)),
-        y=[0] * len(months_data),
-        mode="lines+markers",
-        line=dict(color="#0A2463", width=3),
-        marker=dict(size=20, color="#0A2463", symbol="circle"),
-        hoverinfo="none",
-        showlegend=False
-    ))
-    
-    # Add month points and annotations
-    for i, month_data in enumerate(months_data):
-        month_num = month_data["month"]
-        title = month_data["title"]
-        tasks = month_data["tasks"]
-        
-        # Month number labels
-        fig.add_annotation(
-            x=i+1,
-            y=0,
-            text=f"{month_num}",
-            font=dict(size=12, color="white"),
-            showarrow=False
-        )
-        
-        # Month title above the timeline
-        fig.add_annotation(
-            x=i+1,
-            y=0.3,
-            text=f"<b>{title}</b>",
-            font=dict(size=12, color=colors[i % len(colors)]),
-            showarrow=False,
-            align="center",
-            bgcolor="rgba(255, 255, 255, 0.8)",
-            bordercolor=colors[i % len(colors)],
-            borderwidth=1,
-            borderpad=4,
-            width=200
-        )
-        
-        # Tasks below the timeline
-        task_y = -0.3
-        for task in tasks:
-            fig.add_annotation(
-                x=i+1,
-                y=task_y,
-                text=f"• {task}",
-                font=dict(size=10),
-                showarrow=False,
-                align="left",
-                bgcolor="rgba(255, 255, 255, 0.8)",
-                bordercolor="#D3D3D3",
-                borderwidth=1,
-                borderpad=3,
-                width=180
-            )
-            task_y -= 0.2
-    
-    # Layout configuration
-    fig.update_layout(
-        title=dict(
-            text="<b>12-Month Career Development Timeline</b>",
-            font=dict(size=18, color="#0A2463"),
-            x=0.5
-        ),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        height=500,
-        xaxis=dict(
-            showgrid=False,
-            zeroline=False,
-            showticklabels=False,
-            range=[0, len(months_data) + 1]
-        ),
-        yaxis=dict(
-            showgrid=False,
-            zeroline=False,
-            showticklabels=False,
-            range=[-1, 1]
-        ),
-        margin=dict(l=20, r=20, t=60, b=20),
-        shapes=[
-            # Horizontal line for timeline
-            dict(
-                type="line",
-                xref="x",
-                yref="y",
-                x0=0.5,
-                y0=0,
-                x1=len(months_data) + 0.5,
-                y1=0,
-                line=dict(color="#0A2463", width=3)
-            )
-        ]
-    )
+def current_results():
+    """The session's results, decoded from the shared result store (sessions only keep the key)"""
+    key = st.session_state.get("result_key")
+    return get_result_store().get(key) if key else None
+
+def store_results(results):
+    """Put results in the shared result store and point the session (and its saved run, if any) at their key"""
+    # A superseded version is left to age out of the LRU: other sessions (e.g. a second tab) may still hold its
+    # key, and the store spills only results a saved run still references
+    st.session_state.result_key = get_result_store().put(results)
+    if st.session_state.get("run_id") is not None:
+        # Progress-driven plan edits update the run in place rather than adding a second history row
+        get_history_store().update_run_results(st.session_state.run_id, results)
+    return st.session_state.result_key
+
+def get_progress_engine(skill_gaps):
+    """Return the session's progress engine, starting a fresh one when a new guidance run changes the skill gaps"""
+    if st.session_state.get("progress_engine_gaps") != skill_gaps:
+        engine = ProgressEngine(skill_gaps)
+        engine.update(st.session_state.get("completed_skills", []))
+        engine.mark_refreshed(now=0.0)
+        st.session_state.progress_engine = engine
+        st.session_state.progress_engine_gaps = list(skill_gaps)
+        st.session_state.pop("plan_update", None)
+    return st.session_state.progress_engine
+
+def refresh_action_plan(results, engine):
+    """Patch the stored action plan for every change batched since the last refresh"""
+    tracker_state = engine.state()
+    current_plan = results.action_plan.action_plan
+    update_input = {
+        "completed_skills": tracker_state["completed_skills"],
+        "previous_completed_skills": engine.synced,
+        "remaining_skills": tracker_state["remaining_skills"],
+        "current_plan": current_plan,
+        "plan_structure": results.action_plan.plan_structure,
+        "career_paths": results.career_path.career_paths
+    }
     
-    return fig
+    from action_plan_assistant import ActionPlanAssistant
+    update_result = ActionPlanAssistant().update_progress(update_input)
+    
+    # Persist only a real update: patched months, or a full revision that still has month milestones.
+    # Anything else would overwrite the saved plan with a fallback, so the current plan is kept.
+    new_structure = update_result.get("plan_structure")
+    if not update_result.get("updated_sections") and not getattr(new_structure, "milestones", None):
+        raise RuntimeError("The model's reply could not be used, so your current plan was kept. Please try again later.")
+    
+    # Keep the patched plan so the next refresh only touches newly affected months
+    results.action_plan.action_plan = update_result.get("updated_plan", current_plan)
+    results.action_plan.plan_structure = new_structure
+    store_results(results)
+    engine.mark_refreshed()
+    st.session_state.plan_update = update_result
+    return update_result
 
 # Sidebar
 with st.sidebar:
@@ -336,27 +151,54 @@ with st.sidebar:
     # History feature in sidebar
     st.markdown("### 📋 Previous Searches")
     
-    # Load history from session state
-    if 'history' not in st.session_state:
-        st.session_state.history = []
+    # Runs are listed a page at a time from the persistent history store; results load by key
+    history_store = get_history_store()
+    total_runs = history_store.count_runs(st.session_state.user_id)
+    page_count = max(1, -(-total_runs // HISTORY_PAGE_SIZE))
+    page = min(st.session_state.get("history_page", 0), page_count - 1)
     
     # Display history
-    if not st.session_state.history:
+    if not total_runs:
         st.info("Your search history will appear here")
     else:
-        for idx, item in enumerate(st.session_state.history):
+        runs = history_store.list_runs(st.session_state.user_id, limit=HISTORY_PAGE_SIZE, offset=page * HISTORY_PAGE_SIZE)
+        for idx, item in enumerate(runs):
+            timestamp = datetime.fromtimestamp(item['created_at']).strftime("%m/%d/%Y, %H:%M")
             st.markdown(
                 f"""<div class="history-item" onclick="alert('Click the button below to load this search')">
                     <b>{', '.join(item['skills'][:2])}{'' if len(item['skills']) <= 2 else '...'}</b>
                     <p style="font-size: 0.8rem; margin: 0;">
-                        {len(item['roles'])} roles • {item['timestamp']}
+                        {item['roles_count']} roles • {timestamp}
                     </p>
                 </div>""", 
                 unsafe_allow_html=True
             )
-            if st.button(f"Load Search #{idx+1}", key=f"hist_{idx}", help="Reload this previous search"):
+            if st.button(f"Load Search #{page * HISTORY_PAGE_SIZE + idx + 1}", key=f"hist_{item['id']}", help="Reload this previous search"):
+                # The result store loads the results from the history database on first access
+                if history_store.get_result_data(item['result_key']) is not None:
+                    st.session_state.result_key = item['result_key']
+                    st.session_state.run_id = item['id']
+                    st.session_state.skills = item['skills']
+                    st.session_state.run_input = {
+                        "skills": item['skills'],
+                        "interests": item['interests'],
+                        "experience": item['experience']
+                    }
                 st.session_state.load_item = item
                 st.rerun()
+        
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 1, 1])
+            with prev_col:
+                if st.button("◀", key="history_prev", disabled=page == 0):
+                    st.session_state.history_page = page - 1
+                    st.rerun()
+            with page_col:
+                st.markdown(f"<p style='text-align: center;'>{page + 1}/{page_count}</p>", unsafe_allow_html=True)
+            with next_col:
+                if st.button("▶", key="history_next", disabled=page >= page_count - 1):
+                    st.session_state.history_page = page + 1
+                    st.rerun()
 
     # Add a version info at the bottom
     st.markdown("<div class='footer'>Version 2.0 • July 2025</div>", unsafe_allow_html=True)
@@ -365,8 +207,16 @@ with st.sidebar:
 st.markdown("<h1 class='main-header'>VishCraft AI Career Guidance</h1>", unsafe_allow_html=True)
 st.markdown("<p class='sub-header'>Discover your ideal career path with AI-powered personality analysis and adaptive planning</p>", unsafe_allow_html=True)
 
+def is_admin():
+    # Operators open the app with ?admin=<VISHCRAFT_ADMIN_TOKEN>; without a configured token nobody is admin
+    token = os.getenv('VISHCRAFT_ADMIN_TOKEN', '')
+    return bool(token) and hmac.compare_digest(st.query_params.get("admin", ""), token)
+
 # Create tabs with enhanced styling
-tab1, tab2, tab3, tab4 = st.tabs(["🔍 Career Finder", "📊 Results", "📈 Progress Tracker", "❓ Help"])
+tab_names = ["🔍 Career Finder", "📊 Results", "📈 Progress Tracker", "❓ Help"]
+if is_admin():
+    tab_names.append("⚙️ Performance")
+tab1, tab2, tab3, tab4, *admin_tabs = st.tabs(tab_names)
 
 with tab1:
     st.markdown("<div class='section-title'>🎯 Tell us about yourself</div>", unsafe_allow_html=True)
@@ -465,8 +315,11 @@ with tab1:
     
     st.markdown("</div>", unsafe_allow_html=True)
 
-with tab2:
-    if 'results' not in st.session_state:
+# The Results and Progress tabs are fragments: widgets inside them rerun only their own tab
+@st.fragment
+def render_results_tab():
+    results = current_results()
+    if results is None:
         st.markdown("""
         <div class="info-card" style="text-align: center;">
             <img src="https://img.icons8.com/fluency/96/000000/search.png" width="80" style="margin-bottom: 1rem;">
@@ -475,7 +328,6 @@ with tab2:
         </div>
         """, unsafe_allow_html=True)
     else:
-        results = st.session_state.results
         
         # Success header with enhanced styling
         st.markdown("""
@@ -487,23 +339,23 @@ with tab2:
         """, unsafe_allow_html=True)
         
         # Display enhanced features with badge styling
-        enhanced_features = results.get("enhanced_features", {})
+        enhanced_features = results.enhanced_features
         if enhanced_features:
             st.markdown("<div style='display: flex; flex-wrap: wrap; gap: 0.5rem; margin-bottom: 1rem;'>", unsafe_allow_html=True)
             
-            if enhanced_features.get("personality_inference"):
+            if enhanced_features.personality_inference:
                 st.markdown("<span class='feature-badge' style='background-color: #8559da;'>✨ Personality-Based Matching</span>", unsafe_allow_html=True)
-            if enhanced_features.get("lateral_paths"):
+            if enhanced_features.lateral_paths:
                 st.markdown("<span class='feature-badge' style='background-color: #3a71ca;'>🔄 Vertical & Lateral Paths</span>", unsafe_allow_html=True)
-            if enhanced_features.get("adaptive_planning"):
+            if enhanced_features.adaptive_planning:
                 st.markdown("<span class='feature-badge' style='background-color: #22bb33;'>📝 Adaptive Action Plan</span>", unsafe_allow_html=True)
-            if enhanced_features.get("monetization_ready"):
+            if enhanced_features.monetization_ready:
                 st.markdown("<span class='feature-badge' style='background-color: #ff7043;'>🔒 Premium Format</span>", unsafe_allow_html=True)
             
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Display personality profile with enhanced styling
-        personality_profile = results.get("role_fit", {}).get("personality_profile", {})
+        personality_profile = results.role_fit.personality_profile
         if personality_profile:
             st.markdown("""
             <div style="background-color: rgba(58, 113, 202, 0.1); padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
@@ -527,7 +379,7 @@ with tab2:
             # Recommended Roles section
             st.markdown("<div class='card'>", unsafe_allow_html=True)
             st.markdown("<div class='section-title'>💼 Recommended Roles</div>", unsafe_allow_html=True)
-            roles = results.get("role_fit", {}).get("recommended_roles", [])
+            roles = results.role_fit.recommended_roles
             if roles:
                 for role in roles:
                     st.markdown(f"<div class='list-item'>👉 {role}</div>", unsafe_allow_html=True)
@@ -540,8 +392,8 @@ with tab2:
             st.markdown("<div class='section-title'>🛣️ Career Paths</div>", unsafe_allow_html=True)
             
             # Display vertical and lateral paths separately with different styling
-            vertical_paths = results.get("career_path", {}).get("vertical_paths", [])
-            lateral_paths = results.get("career_path", {}).get("lateral_paths", [])
+            vertical_paths = results.career_path.vertical_paths
+            lateral_paths = results.career_path.lateral_paths
             
             if vertical_paths or lateral_paths:
                 if vertical_paths:
@@ -555,7 +407,7 @@ with tab2:
                         st.markdown(f"<div class='lateral-path-item'>↔️ {path}</div>", unsafe_allow_html=True)
             else:
                 # Fallback to combined paths
-                paths = results.get("career_path", {}).get("career_paths", [])
+                paths = results.career_path.career_paths
                 if paths:
                     for path in paths:
                         st.markdown(f"<div class='list-item'>🛣️ {path}</div>", unsafe_allow_html=True)
@@ -568,7 +420,7 @@ with tab2:
             # Skill Gaps section with enhanced styling
             st.markdown("<div class='card'>", unsafe_allow_html=True)
             st.markdown("<div class='section-title'>🔍 Skill Gaps to Address</div>", unsafe_allow_html=True)
-            skill_gaps = results.get("action_plan", {}).get("skill_gaps", [])
+            skill_gaps = results.action_plan.skill_gaps
             if skill_gaps and any(gap.strip() for gap in skill_gaps):
                 for gap in skill_gaps:
                     if gap and gap.strip().lower() not in ["none", "undefined"]:
@@ -578,7 +430,7 @@ with tab2:
             st.markdown("</div>", unsafe_allow_html=True)
             
             # Progress Tracking Section with enhanced visualization
-            progress_tracker = results.get("action_plan", {}).get("progress_tracker", {})
+            progress_tracker = results.action_plan.progress_tracker
             if progress_tracker:
                 st.markdown("<div class='card'>", unsafe_allow_html=True)
                 st.markdown("<div class='section-title'>📊 Progress Tracking</div>", unsafe_allow_html=True)
@@ -587,7 +439,7 @@ with tab2:
                 completed_skills = progress_tracker.get("skills_completed", 0)
                 
                 # Create a visual progress chart
-                progress_chart = create_progress_chart(total_skills, completed_skills)
+                progress_chart = cached_progress_chart(total_skills, completed_skills)
                 if progress_chart:
                     st.plotly_chart(progress_chart, use_container_width=True)
                 else:
@@ -606,8 +458,7 @@ with tab2:
                 skills_list = st.session_state.get('skills', [])
                 if skills_list:
                     # Create skill visualization
-                    skill_df = generate_skill_categories(skills_list)
-                    skill_chart = create_skill_radar_chart(skill_df)
+                    skill_chart = cached_skill_radar_chart(skills_list)
                     
                     if skill_chart:
                         st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -618,10 +469,10 @@ with tab2:
         # Action plan (full width) with enhanced styling
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("<div class='section-title'>📝 Your Personalized Action Plan</div>", unsafe_allow_html=True)
-        action_plan = results.get("action_plan", {}).get("action_plan", "")
+        action_plan = results.action_plan.action_plan
         if action_plan and action_plan.strip() and action_plan.strip().lower() not in ["no action plan generated.", "none", "undefined"]:
             # Generate the timeline flowchart
-            timeline_chart = create_timeline_flowchart(action_plan)
+            timeline_chart = cached_timeline_flowchart(action_plan, results.action_plan.plan_structure)
             if timeline_chart:
                 st.markdown("<div class='timeline-wrapper'>", unsafe_allow_html=True)
                 st.plotly_chart(timeline_chart, use_container_width=True)
@@ -641,24 +492,17 @@ with tab2:
         st.markdown("<br>", unsafe_allow_html=True)
         export_col1, export_col2, export_col3 = st.columns([1, 1, 1])
         
-        # Get user input from session state or history
-        if 'history' in st.session_state and st.session_state.history:
-            latest_input = st.session_state.history[0]
-            input_for_export = {
-                "skills": latest_input.get("skills", []),
-                "interests": latest_input.get("interests", []),
-                "experience": latest_input.get("experience", 0)
-            }
-        else:
-            input_for_export = {
-                "skills": [],
-                "interests": [],
-                "experience": 0
-            }
+        # Get the input these results were generated from
+        input_for_export = st.session_state.get("run_input", {
+            "skills": [],
+            "interests": [],
+            "experience": 0
+        })
             
         with export_col1:
+            # Reports are rendered only on request and cached per result key, so reruns never rebuild them
             if st.button("📝 Export as Markdown", help="Download your results as a Markdown file"):
-                markdown_content = format_results_as_markdown(results, input_for_export)
+                markdown_content = export_report(results, input_for_export, "markdown", result_key=st.session_state.result_key)
                 st.download_button(
                     label="Download Markdown",
                     data=markdown_content,
@@ -667,7 +511,7 @@ with tab2:
                 )
         with export_col2:
             if st.button("🔄 Export as JSON", help="Download your results as a JSON file"):
-                json_content = export_results_as_json(results, input_for_export)
+                json_content = export_report(results, input_for_export, "json", result_key=st.session_state.result_key)
                 st.download_button(
                     label="Download JSON",
                     data=json_content,
@@ -675,16 +519,14 @@ with tab2:
                     mime="application/json"
                 )
         with export_col3:
-            if st.button("💾 Save to History", help="Save this result to your search history"):
-                st.success("Results saved to your history!")
-                # Add timestamp for when this was run
-                timestamp = datetime.now().strftime("%m/%d/%Y, %H:%M")
-                st.session_state.results["timestamp"] = timestamp
-                # Add to history
-                st.balloons()
+            # Every finished run is saved when its job completes, and progress updates rewrite that same entry
+            if st.session_state.get("run_id") is not None:
+                st.caption("💾 Saved to your history, including progress updates")
 
-with tab3:
-    if 'results' not in st.session_state:
+@st.fragment
+def render_progress_tab():
+    results = current_results()
+    if results is None:
         st.markdown("""
         <div class="info-card" style="text-align: center;">
             <img src="https://img.icons8.com/fluency/96/000000/combo-chart.png" width="80" style="margin-bottom: 1rem;">
@@ -693,8 +535,7 @@ with tab3:
         </div>
         """, unsafe_allow_html=True)
     else:
-        results = st.session_state.results
-        skill_gaps = results.get("action_plan", {}).get("skill_gaps", [])
+        skill_gaps = results.action_plan.skill_gaps
         
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("<div class='section-title'>📈 Progress Tracking Dashboard</div>", unsafe_allow_html=True)
@@ -705,6 +546,7 @@ with tab3:
             st.session_state.completed_skills = []
         
         if skill_gaps and any(gap.strip() for gap in skill_gaps):
+            engine = get_progress_engine(skill_gaps)
             st.markdown("### Skills to Develop")
             
             # Create a form for tracking skill progress
@@ -731,25 +573,40 @@ with tab3:
                 update_submitted = st.form_submit_button("📊 Update Progress")
                 
                 if update_submitted:
-                    # Update completed skills in session state
-                    st.session_state.completed_skills = [skill for skill, completed in progress_data if completed]
+                    # Recompute the tracker locally; no model call is needed for percentages or remaining skills
+                    tracker_state = engine.update([skill for skill, completed in progress_data if completed])
+                    st.session_state.completed_skills = tracker_state["completed_skills"]
                     
                     # Update progress tracker in results
-                    progress_tracker = results.get("action_plan", {}).get("progress_tracker", {})
+                    progress_tracker = results.action_plan.progress_tracker
                     if progress_tracker:
-                        progress_tracker["skills_completed"] = len(st.session_state.completed_skills)
-                        progress_tracker["completion_percentage"] = (len(st.session_state.completed_skills) / max(len(skill_gaps), 1)) * 100
-                        progress_tracker["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        
-                        # Update the results
-                        st.session_state.results["action_plan"]["progress_tracker"] = progress_tracker
-                        
+                        for key in ("total_skills_needed", "skills_completed", "completion_percentage", "last_updated"):
+                            progress_tracker[key] = tracker_state[key]
+                        store_results(results)
+                    
+                    # Refresh the plan only once enough changes have batched up and the debounce window has passed
+                    refreshed = False
+                    refresh_failed = False
+                    if engine.should_refresh():
+                        with st.spinner("Updating your action plan based on progress..."):
+                            try:
+                                refresh_action_plan(results, engine)
+                                refreshed = True
+                            except Exception as e:
+                                refresh_failed = True
+                                # Keep the batch pending, but do not retry until the debounce window passes again
+                                engine.mark_failed()
+                                st.error(f"Error updating action plan: {str(e)}")
+                    
+                    if not refresh_failed:
                         st.success("Progress updated successfully!")
-                        st.experimental_rerun()
+                        # Only a changed plan needs the Results tab redrawn; otherwise rerun just this fragment
+                        st.rerun(scope="app" if refreshed else "fragment")
             
             # Display visual progress
-            total = len(skill_gaps)
-            completed = len(st.session_state.completed_skills)
+            tracker_state = engine.state()
+            total = tracker_state["total_skills_needed"]
+            completed = tracker_state["skills_completed"]
             
             if total > 0:
                 percentage = (completed / total) * 100
@@ -771,7 +628,7 @@ with tab3:
                     st.markdown(f"**{percentage:.1f}%** completed")
                 
                 # Create a visual progress chart
-                progress_chart = create_progress_chart(total, completed)
+                progress_chart = cached_progress_chart(total, completed)
                 if progress_chart:
                     st.plotly_chart(progress_chart, use_container_width=True)
                 
@@ -810,54 +667,116 @@ with tab3:
             st.markdown("### Update Action Plan")
             st.markdown("As you complete skills, you can get an updated action plan that reflects your progress")
             
+            pending = tracker_state["pending_changes"]
+            if pending and engine.should_refresh():
+                # A batch held back by the debounce window is applied on the first render after the window passes
+                with st.spinner("Updating your action plan based on progress..."):
+                    try:
+                        refresh_action_plan(results, engine)
+                    except Exception as e:
+                        # Without this every rerun of the tab would repeat the failing model call
+                        engine.mark_failed()
+                        st.error(f"Error updating action plan: {str(e)}")
+                    else:
+                        st.rerun()
+            elif pending:
+                st.caption(f"{pending} skill(s) completed since the last plan refresh. The plan refreshes automatically once "
+                           f"{engine.refresh_threshold()} have batched up and {engine.debounce_seconds:.0f}s have "
+                           f"passed since the last refresh, the next time this tab updates.")
+            
             if st.button("🔄 Generate Updated Action Plan"):
                 with st.spinner("Updating your action plan based on progress..."):
                     try:
-                        # Prepare input for update_progress
-                        remaining_skills = [gap for gap in skill_gaps if gap not in st.session_state.completed_skills]
-                        current_plan = results.get("action_plan", {}).get("action_plan", "")
-                        career_paths = results.get("career_path", {}).get("career_paths", [])
-                        
-                        update_input = {
-                            "completed_skills": st.session_state.completed_skills,
-                            "remaining_skills": remaining_skills,
-                            "current_plan": current_plan,
-                            "career_paths": career_paths
-                        }
-                        
-                        # Get a new instance of ActionPlanAssistant
-                        from action_plan_assistant import ActionPlanAssistant
-                        action_plan_assistant = ActionPlanAssistant()
-                        
-                        # Call update_progress
-                        update_result = action_plan_assistant.update_progress(update_input)
-                        
-                        # Display the updated plan
-                        st.markdown("<div class='success-card'>", unsafe_allow_html=True)
-                        st.markdown("<div class='section-title'>📝 Your Updated Action Plan</div>", unsafe_allow_html=True)
-                        st.markdown(update_result.get("updated_plan", "No updated plan generated."))
-                        st.markdown("</div>", unsafe_allow_html=True)
-                        
-                        # Display new recommendations
-                        new_recommendations = update_result.get("new_recommendations", [])
-                        if new_recommendations:
-                            st.markdown("<div class='card'>", unsafe_allow_html=True)
-                            st.markdown("<div class='section-title'>✨ New Recommendations</div>", unsafe_allow_html=True)
-                            for rec in new_recommendations:
-                                st.markdown(f"<div class='list-item'>👉 {rec}</div>", unsafe_allow_html=True)
-                            st.markdown("</div>", unsafe_allow_html=True)
-                        
-                        # Display motivational message
-                        if "motivation_message" in update_result:
-                            st.info(update_result["motivation_message"])
-                        
+                        refresh_action_plan(results, engine)
                     except Exception as e:
                         st.error(f"Error updating action plan: {str(e)}")
+                    else:
+                        # Redraw the Results tab with the patched plan
+                        st.rerun()
+            
+            update_result = st.session_state.get("plan_update")
+            if update_result:
+                # Display the updated plan
+                st.markdown("<div class='success-card'>", unsafe_allow_html=True)
+                st.markdown("<div class='section-title'>📝 Your Updated Action Plan</div>", unsafe_allow_html=True)
+                updated_sections = update_result.get("updated_sections")
+                if updated_sections:
+                    st.caption("Updated months: " + ", ".join(str(month) for month in updated_sections))
+                elif updated_sections is not None:
+                    st.caption("No months needed changes for the newly completed skills.")
+                st.markdown(update_result.get("updated_plan", "No updated plan generated."))
+                st.markdown("</div>", unsafe_allow_html=True)
+                
+                # Display new recommendations
+                new_recommendations = update_result.get("new_recommendations", [])
+                if new_recommendations:
+                    st.markdown("<div class='card'>", unsafe_allow_html=True)
+                    st.markdown("<div class='section-title'>✨ New Recommendations</div>", unsafe_allow_html=True)
+                    for rec in new_recommendations:
+                        st.markdown(f"<div class='list-item'>👉 {rec}</div>", unsafe_allow_html=True)
+                    st.markdown("</div>", unsafe_allow_html=True)
+                
+                # Display motivational message
+                if "motivation_message" in update_result:
+                    st.info(update_result["motivation_message"])
         else:
             st.info("No skill gaps identified to track. Generate a career guidance first with specific skills and interests.")
         
         st.markdown("</div>", unsafe_allow_html=True)
 
+@st.fragment
+def render_performance_tab():
+    # Imported here so regular sessions never load pandas aggregation code they cannot see
+    from perf_report import PARSE_FAILURES, performance_summary
+    
+    st.markdown("<div class='section-title'>⚙️ Pipeline Performance</div>", unsafe_allow_html=True)
+    window_col, bucket_col = st.columns(2)
+    with window_col:
+        window = st.selectbox("Window", ["Last hour", "Last 24 hours", "Last 7 days", "All"], index=1, key="perf_window")
+    with bucket_col:
+        freq = st.selectbox("Throughput bucket", ["1min", "5min", "1h"], index=1, key="perf_freq")
+    window_hours = {"Last hour": 1, "Last 24 hours": 24, "Last 7 days": 24 * 7, "All": None}[window]
+    summary = performance_summary(window_hours=window_hours, freq=freq)
+    
+    if summary["spans"] == 0:
+        st.info("No trace data in this window yet. Spans are written to VISHCRAFT_TRACE_FILE as career analyses run.")
+        return
+    
+    runs = summary["runs"]
+    run_col, latency_col, calls_col, tokens_col = st.columns(4)
+    run_col.metric("Runs", len(runs))
+    if len(runs):
+        latency_col.metric("Run p95", f"{runs['wall_ms'].quantile(0.95) / 1000:.1f}s")
+        calls_col.metric("Calls per run", f"{runs['calls'].mean():.1f}")
+        tokens_col.metric("Tokens per run", f"{runs['tokens'].mean():,.0f}")
+    
+    st.markdown("#### Latency by stage")
+    st.dataframe(summary["latency"], hide_index=True, use_container_width=True)
+    
+    parse_col, cache_col = st.columns(2)
+    with parse_col:
+        st.markdown("#### Parse failures")
+        st.caption(f"Share of calls with outcome {', '.join(PARSE_FAILURES)}")
+        st.dataframe(summary["parse"], hide_index=True, use_container_width=True)
+    with cache_col:
+        st.markdown("#### Cache hit rates")
+        st.dataframe(summary["cache"], hide_index=True, use_container_width=True)
+    
+    st.markdown("#### Throughput over time")
+    throughput = summary["throughput"]
+    st.line_chart(throughput[["runs", "llm_calls"]])
+    st.line_chart(throughput[["run_p95_ms"]])
+
+with tab2:
+    render_results_tab()
+
+with tab3:
+    render_progress_tab()
+
+for admin_tab in admin_tabs:
+    with admin_tab:
+        render_performance_tab()
+
 with tab4:
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("<div class='section-title'>❓ Frequently Asked Questions</div>", unsafe_allow_html=True)
@@ -954,114 +873,97 @@ if submitted:
         # Switch to results tab
         st.session_state.active_tab = "Results"
         
-        # Create progress bar with enhanced styling
-        progress_placeholder = st.empty()
-        status_text = st.empty()
+        # Run the pipeline on the shared worker pool; the job id in the URL survives a browser refresh
+        job_id = submit_career_run(user_input)
+        st.session_state.job_id = job_id
+        st.query_params["job"] = job_id
+        st.rerun()
+
+# Poll the background job until its results are ready. The poller is a fragment on a timer, so waiting
+# reruns only the status panel; the full app reruns once when the job finishes.
+@st.fragment(run_every=1)
+def poll_career_job():
+    job = get_job_runner().get(st.session_state.job_id)
+    
+    if job is None:
+        # Unknown or expired job (e.g. the server restarted)
+        del st.session_state.job_id
+        st.query_params.pop("job", None)
+        st.session_state.job_message = ("warning", "Your previous career analysis is no longer available. Please submit the form again.")
+        st.rerun()
+    elif job["status"] in ("queued", "running"):
+        # Show real stage progress from the items streamed so far
+        stages = [
+            ("recommended_roles", 30, "🔍 Analyzing your skills and personality..."),
+            ("vertical_paths", 55, "🛣️ Mapping potential career paths..."),
+            ("lateral_paths", 70, "🔀 Exploring lateral career moves..."),
+            ("skill_gaps", 90, "🔍 Identifying your skill gaps...")
+        ]
+        progress, message = 10, "🤖 Running AI career analysis..." if job["status"] == "running" else "⏳ Waiting for a free worker..."
+        for stage, stage_progress, stage_message in stages:
+            if job["items"].get(stage):
+                progress, message = stage_progress, stage_message
+        
+        st.progress(progress)
+        st.markdown(f"""
+        <div style="text-align: center; padding: 1rem; background-color: var(--primary-light); border-radius: 8px;">
+            <h3 style="margin: 0;">{message}</h3>
+        </div>
+        """, unsafe_allow_html=True)
         
-        with progress_placeholder.container():
-            progress_bar = st.progress(0)
+        # Render roles the moment they stream in, before the remaining stages finish
+        streamed_roles = job["items"].get("recommended_roles", [])
+        if streamed_roles:
+            st.markdown("".join(f"<div class='list-item'>👉 {role}</div>" for role in streamed_roles), unsafe_allow_html=True)
+    else:
+        get_job_runner().discard(job["id"])
+        del st.session_state.job_id
+        st.query_params.pop("job", None)
         
-        try:
-            # Stage 1: Role fitting
-            status_text.markdown("""
-            <div style="text-align: center; padding: 1rem; background-color: var(--primary-light); border-radius: 8px;">
-                <h3 style="margin: 0;">🔍 Analyzing your skills and personality...</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            progress_bar.progress(10)
-            time.sleep(0.5)
-            
-            graph = build_career_graph()
-            
-            # Stage 2: Running the AI pipeline
-            status_text.markdown("""
-            <div style="text-align: center; padding: 1rem; background-color: var(--primary-light); border-radius: 8px;">
-                <h3 style="margin: 0;">🤖 Running AI career analysis...</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            progress_bar.progress(30)
-            time.sleep(0.5)
-            
-            results = graph.run(user_input)
-            
-            # Stage 3: Generating career paths
-            status_text.markdown("""
-            <div style="text-align: center; padding: 1rem; background-color: var(--primary-light); border-radius: 8px;">
-                <h3 style="margin: 0;">🛣️ Mapping potential career paths...</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            progress_bar.progress(60)
-            time.sleep(0.5)
-            
-            # Stage 4: Creating action plan
-            status_text.markdown("""
-            <div style="text-align: center; padding: 1rem; background-color: var(--primary-light); border-radius: 8px;">
-                <h3 style="margin: 0;">📝 Creating your personalized action plan...</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            progress_bar.progress(90)
-            time.sleep(0.5)
-            
-            # Complete
-            progress_bar.progress(100)
-            status_text.markdown("""
-            <div style="text-align: center; padding: 1rem; background-color: #f1f8e9; border-radius: 8px;">
-                <h3 style="margin: 0; color: #22bb33;">✅ Your career guidance is ready!</h3>
-            </div>
-            """, unsafe_allow_html=True)
-            time.sleep(1)
-            
-            # Clear progress indicators
-            status_text.empty()
-            progress_placeholder.empty()
-            
-            # Store results in session state
-            st.session_state.results = results
-            
-            # Store in history (simplified version)
-            history_item = {
-                "skills": user_input["skills"],
-                "interests": user_input["interests"],
-                "experience": user_input["experience"],
-                "roles": results.get("role_fit", {}).get("recommended_roles", []),
-                "paths": results.get("career_path", {}).get("career_paths", []),
-                "timestamp": datetime.now().strftime("%m/%d/%Y, %H:%M")
-            }
-            
-            # Add to history if not already there
-            if 'history' not in st.session_state:
-                st.session_state.history = []
-            st.session_state.history.insert(0, history_item)
-            
-            # Limit history size
-            if len(st.session_state.history) > 5:
-                st.session_state.history = st.session_state.history[:5]
+        if job["status"] == "error":
+            st.session_state.job_message = ("error", job["error"])
+        else:
+            results = job["result"]
+            user_input = job["meta"]["user_input"]
+            st.session_state.skills = user_input["skills"]
             
-            # Switch to results tab
-            st.rerun()
+            # Keep only the key in session state; the results live once in the shared result store
+            st.session_state.pop("run_id", None)
+            store_results(results)
             
-        except Exception as e:
-            error_message = str(e)
-            # Clear progress indicators
-            status_text.empty()
-            progress_placeholder.empty()
+            st.session_state.run_input = user_input
             
-            if "API_KEY_INVALID" in error_message or "API key not valid" in error_message:
-                st.error("🔑 **Invalid API Key!**")
-                st.markdown("""
-                **To fix this issue:**
-                1. Go to [Google AI Studio](https://aistudio.google.com/app/apikey)
-                2. Sign in with your Google account
-                3. Create a new API key
-                4. Copy the new API key
-                5. Edit the `.env` file in your project folder
-                6. Replace `YOUR_GEMINI_API_KEY_HERE` with your new API key
-                7. Save the file and refresh this page
-                """)
-                st.info("💡 **Tip:** Make sure your API key has access to the Gemini API and hasn't expired.")
-            else:
-                st.error(f"❌ **An error occurred:** {error_message}")
-                st.info("Please check your internet connection and try again. If the problem persists, contact support.")
+            # Persist the run; the sidebar lists it from the history store, and later progress updates rewrite it
+            st.session_state.run_id = get_history_store().save_run(st.session_state.user_id, user_input, results)["id"]
+            st.session_state.history_page = 0
+        
+        # Full rerun to show the results tab (or the error) and stop polling
+        st.rerun()
+
+if 'job_id' in st.session_state:
+    poll_career_job()
+
+# Messages from a finished job are shown once, after the full rerun that ended polling
+if 'job_message' in st.session_state:
+    level, error_message = st.session_state.pop("job_message")
+    if level == "warning":
+        st.warning(error_message)
+    elif "API_KEY_INVALID" in error_message or "API key not valid" in error_message:
+        st.error("🔑 **Invalid API Key!**")
+        st.markdown("""
+        **To fix this issue:**
+        1. Go to [Google AI Studio](https://aistudio.google.com/app/apikey)
+        2. Sign in with your Google account
+        3. Create a new API key
+        4. Copy the new API key
+        5. Edit the `.env` file in your project folder
+        6. Replace `YOUR_GEMINI_API_KEY_HERE` with your new API key
+        7. Save the file and refresh this page
+        """)
+        st.info("💡 **Tip:** Make sure your API key has access to the Gemini API and hasn't expired.")
+    else:
+        st.error(f"❌ **An error occurred:** {error_message}")
+        st.info("Please check your internet connection and try again. If the problem persists, contact support.")
 
 # Footer with enhanced styling
 st.markdown("""
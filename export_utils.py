@@ -1,34 +1,62 @@
+import hashlib
+import html
 import json
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-import streamlit as st
 
-def export_results_as_json(results, user_input):
+from career_results import as_career_results
+from tracing import trace_span
+
+# Rendered reports are cached per (result fingerprint, profile, format); reports are small, so a short LRU is enough
+EXPORT_CACHE_SIZE = 32
+
+# Cached reports carry this token where the timestamp goes; export_report fills in the time of each download
+_TIMESTAMP_TOKEN = f"@@generated-at-{uuid.uuid4().hex}@@"
+
+_EMPTY_PLAN_MARKERS = ["no action plan generated.", "none", "undefined"]
+_EMPTY_PLAN_MAX_LENGTH = max(len(marker) for marker in _EMPTY_PLAN_MARKERS)
+
+
+def _timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def iter_results_json(results, user_input, generated_at=None):
     """
-    Export the results and user input as a JSON string
+    Stream the results and user input as indented JSON, chunk by chunk
     """
     export_data = {
         "user_input": user_input,
-        "results": results,
-        "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "results": as_career_results(results).to_dict(),
+        "exported_at": generated_at or _timestamp()
     }
-    return json.dumps(export_data, indent=2)
+    return json.JSONEncoder(indent=2).iterencode(export_data)
 
-def format_results_as_markdown(results, user_input):
+def export_results_as_json(results, user_input):
     """
-    Format the enhanced results as markdown for export or display
+    Export the results and user input as a JSON string
     """
-    roles = results.get("role_fit", {}).get("recommended_roles", [])
-    personality_profile = results.get("role_fit", {}).get("personality_profile", {})
-    vertical_paths = results.get("career_path", {}).get("vertical_paths", [])
-    lateral_paths = results.get("career_path", {}).get("lateral_paths", [])
-    all_paths = results.get("career_path", {}).get("career_paths", [])
-    skill_gaps = results.get("action_plan", {}).get("skill_gaps", [])
-    action_plan = results.get("action_plan", {}).get("action_plan", "")
-    progress_tracker = results.get("action_plan", {}).get("progress_tracker", {})
-    enhanced_features = results.get("enhanced_features", {})
-    
-    md = f"""# Enhanced Career Guidance Report
-Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    return "".join(iter_results_json(results, user_input))
+
+def iter_results_markdown(results, user_input, generated_at=None):
+    """
+    Stream the enhanced results as markdown, section by section
+    """
+    results = as_career_results(results)
+    roles = results.role_fit.recommended_roles
+    personality_profile = results.role_fit.personality_profile
+    vertical_paths = results.career_path.vertical_paths
+    lateral_paths = results.career_path.lateral_paths
+    all_paths = results.career_path.career_paths
+    skill_gaps = results.action_plan.skill_gaps
+    action_plan = results.action_plan.action_plan
+    progress_tracker = results.action_plan.progress_tracker
+    plan_structure = results.action_plan.plan_structure
+    enhanced_features = results.enhanced_features
+
+    yield f"""# Enhanced Career Guidance Report
+Generated on {generated_at or _timestamp()}
 
 ## Your Profile
 - **Skills**: {', '.join(user_input.get('skills', []))}
@@ -37,83 +65,193 @@ Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
 ## Personality Analysis
 """
-    
+
     if personality_profile:
-        md += f"- **Personality Traits**: {', '.join(personality_profile.get('personality_traits', []))}\n"
-        md += f"- **Work Style**: {personality_profile.get('work_style', 'N/A')}\n"
-        md += f"- **Preferred Environment**: {personality_profile.get('preferred_environment', 'N/A')}\n"
+        yield f"- **Personality Traits**: {', '.join(personality_profile.get('personality_traits', []))}\n"
+        yield f"- **Work Style**: {personality_profile.get('work_style', 'N/A')}\n"
+        yield f"- **Preferred Environment**: {personality_profile.get('preferred_environment', 'N/A')}\n"
     else:
-        md += "No personality analysis available.\n"
-    
-    md += "\n## Enhanced Features\n"
+        yield "No personality analysis available.\n"
+
+    yield "\n## Enhanced Features\n"
     if enhanced_features:
-        if enhanced_features.get("personality_inference"):
-            md += "✅ Personality-Based Role Matching\n"
-        if enhanced_features.get("lateral_paths"):
-            md += "✅ Vertical & Lateral Career Paths\n"
-        if enhanced_features.get("adaptive_planning"):
-            md += "✅ Adaptive Action Planning\n"
-        if enhanced_features.get("monetization_ready"):
-            md += "✅ Professional Report Ready\n"
-    
-    md += "\n## Recommended Roles\n"
-    
+        if enhanced_features.personality_inference:
+            yield "✅ Personality-Based Role Matching\n"
+        if enhanced_features.lateral_paths:
+            yield "✅ Vertical & Lateral Career Paths\n"
+        if enhanced_features.adaptive_planning:
+            yield "✅ Adaptive Action Planning\n"
+        if enhanced_features.monetization_ready:
+            yield "✅ Professional Report Ready\n"
+
+    yield "\n## Recommended Roles\n"
+
     if roles:
-        for role in roles:
-            md += f"- {role}\n"
+        yield "".join(f"- {role}\n" for role in roles)
     else:
-        md += "No roles found.\n"
-    
-    md += "\n## Career Paths\n"
-    
+        yield "No roles found.\n"
+
+    yield "\n## Career Paths\n"
+
     if vertical_paths:
-        md += "\n### 📈 Vertical Growth Paths\n"
-        for path in vertical_paths:
-            md += f"- {path}\n"
-    
+        yield "\n### 📈 Vertical Growth Paths\n"
+        yield "".join(f"- {path}\n" for path in vertical_paths)
+
     if lateral_paths:
-        md += "\n### ↔️ Lateral Transition Paths\n"
-        for path in lateral_paths:
-            md += f"- {path}\n"
-    
+        yield "\n### ↔️ Lateral Transition Paths\n"
+        yield "".join(f"- {path}\n" for path in lateral_paths)
+
     if not vertical_paths and not lateral_paths and all_paths:
-        md += "\n### All Career Paths\n"
-        for path in all_paths:
-            md += f"- {path}\n"
-    
+        yield "\n### All Career Paths\n"
+        yield "".join(f"- {path}\n" for path in all_paths)
+
     if not vertical_paths and not lateral_paths and not all_paths:
-        md += "No career paths found.\n"
-    
-    md += "\n## Skill Gaps Analysis\n"
-    
+        yield "No career paths found.\n"
+
+    yield "\n## Skill Gaps Analysis\n"
+
     if skill_gaps and any(gap.strip() for gap in skill_gaps):
-        for gap in skill_gaps:
-            if gap and gap.strip().lower() not in ["none", "undefined"]:
-                md += f"- {gap}\n"
+        yield "".join(f"- {gap}\n" for gap in skill_gaps if gap and gap.strip().lower() not in ["none", "undefined"])
     else:
-        md += "No significant skill gaps identified.\n"
-    
-    md += "\n## Progress Tracking\n"
-    
+        yield "No significant skill gaps identified.\n"
+
+    yield "\n## Progress Tracking\n"
+
     if progress_tracker:
         total_skills = progress_tracker.get("total_skills_needed", 0)
         completed_skills = progress_tracker.get("skills_completed", 0)
-        
+
         if total_skills > 0:
             progress_percentage = (completed_skills / total_skills) * 100
-            md += f"- **Progress**: {completed_skills}/{total_skills} skills ({progress_percentage:.1f}%)\n"
+            yield f"- **Progress**: {completed_skills}/{total_skills} skills ({progress_percentage:.1f}%)\n"
         else:
-            md += "- **Status**: Ready to begin your career journey\n"
-        
-        md += f"- **Last Updated**: {progress_tracker.get('last_updated', 'N/A')}\n"
-    
-    md += "\n## Adaptive Action Plan\n"
-    
-    if action_plan and action_plan.strip() and action_plan.strip().lower() not in ["no action plan generated.", "none", "undefined"]:
-        md += action_plan
+            yield "- **Status**: Ready to begin your career journey\n"
+
+        yield f"- **Last Updated**: {progress_tracker.get('last_updated', 'N/A')}\n"
+
+    if plan_structure and plan_structure.milestones:
+        yield "\n## Milestone Overview\n"
+        yield "".join(f"- **Month {milestone.month}**: {milestone.title}\n" for milestone in plan_structure.milestones)
+
+    yield "\n## Adaptive Action Plan\n"
+
+    # Only short plans can be a placeholder; lowercasing a full plan just to compare it is wasted work
+    stripped_plan = action_plan.strip() if action_plan else ""
+    if stripped_plan and (len(stripped_plan) > _EMPTY_PLAN_MAX_LENGTH or stripped_plan.lower() not in _EMPTY_PLAN_MARKERS):
+        yield action_plan
     else:
-        md += "No action plan was generated.\n"
-    
-    md += "\n\n---\nGenerated by VishCraft Enhanced Career Guidance System"
-    
-    return md
+        yield "No action plan was generated.\n"
+
+    yield "\n\n---\nGenerated by VishCraft Enhanced Career Guidance System"
+
+def format_results_as_markdown(results, user_input):
+    """
+    Format the enhanced results as markdown for export or display
+    """
+    return "".join(iter_results_markdown(results, user_input))
+
+def _markdown_lines_to_html(lines):
+    # Just enough markdown for the report: headings, bullet/numbered lists, bold and paragraphs
+    in_list = False
+    for line in lines:
+        stripped = line.strip()
+        is_item = stripped.startswith(("- ", "* ", "• ")) or (stripped[:1].isdigit() and ". " in stripped[:4])
+        if in_list and not is_item:
+            yield "</ul>\n"
+            in_list = False
+        if not stripped:
+            continue
+        if stripped == "---":
+            yield "<hr>\n"
+        elif stripped.startswith("#"):
+            level = min(len(stripped) - len(stripped.lstrip("#")), 6)
+            yield f"<h{level}>{_inline_html(stripped[level:].strip())}</h{level}>\n"
+        elif is_item:
+            if not in_list:
+                yield "<ul>\n"
+                in_list = True
+            text = stripped[2:] if not stripped[:1].isdigit() else stripped.split(". ", 1)[1]
+            yield f"<li>{_inline_html(text)}</li>\n"
+        else:
+            yield f"<p>{_inline_html(stripped)}</p>\n"
+    if in_list:
+        yield "</ul>\n"
+
+def _iter_lines(chunks):
+    # Re-split streamed chunks into whole lines so lists spanning chunks stay in one <ul>
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+def _inline_html(text):
+    parts = html.escape(text).split("**")
+    # Odd-indexed parts were between ** markers
+    return "".join(f"<strong>{part}</strong>" if i % 2 else part for i, part in enumerate(parts))
+
+def iter_results_html(results, user_input, generated_at=None):
+    """
+    Stream the enhanced results as a standalone HTML page
+    """
+    yield """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Enhanced Career Guidance Report</title>
+<style>body{font-family:sans-serif;max-width:860px;margin:2rem auto;line-height:1.5;color:#263238}h1,h2{color:#3a71ca}</style>
+</head><body>
+"""
+    yield from _markdown_lines_to_html(_iter_lines(iter_results_markdown(results, user_input, generated_at)))
+    yield "</body></html>\n"
+
+def format_results_as_html(results, user_input):
+    """
+    Format the enhanced results as a standalone HTML page
+    """
+    return "".join(iter_results_html(results, user_input))
+
+REPORT_FORMATS = {
+    "markdown": (iter_results_markdown, "md"),
+    "json": (iter_results_json, "json"),
+    "html": (iter_results_html, "html")
+}
+
+def write_report(results, user_input, out, fmt="markdown"):
+    """
+    Write a report to a text stream without building the whole string first
+    """
+    for chunk in REPORT_FORMATS[fmt][0](results, user_input):
+        out.write(chunk)
+
+
+_export_cache = OrderedDict()
+_export_cache_lock = threading.Lock()
+
+def _export_key(results, user_input, fmt, result_key=None):
+    if result_key is None:
+        # Callers holding a result-store key pass it in; otherwise fingerprint the result content
+        result_key = hashlib.sha256(json.dumps(as_career_results(results).to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+    profile = json.dumps(user_input, sort_keys=True, default=str)
+    return (result_key, profile, fmt)
+
+def export_report(results, user_input, fmt="markdown", result_key=None):
+    """
+    Render a markdown, JSON or HTML report as UTF-8 bytes, cached per result fingerprint; the
+    generation timestamp is filled in per call, so cached reports never show a stale time
+    """
+    with trace_span("export_report", format=fmt) as span:
+        key = _export_key(results, user_input, fmt, result_key)
+        with _export_cache_lock:
+            data = _export_cache.get(key)
+            if data is not None:
+                _export_cache.move_to_end(key)
+        span.set(cache_hit=data is not None)
+        if data is None:
+            data = "".join(REPORT_FORMATS[fmt][0](results, user_input, _TIMESTAMP_TOKEN)).encode("utf-8")
+            with _export_cache_lock:
+                _export_cache[key] = data
+                while len(_export_cache) > EXPORT_CACHE_SIZE:
+                    _export_cache.popitem(last=False)
+        data = data.replace(_TIMESTAMP_TOKEN.encode("utf-8"), _timestamp().encode("utf-8"))
+        span.set(bytes=len(data))
+        return data
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from career_results import CareerResults, as_career_results
+
+DEFAULT_DB_PATH = os.getenv('VISHCRAFT_HISTORY_DB', 'vishcraft_history.db')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    profile_fingerprint TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    interests TEXT NOT NULL,
+    experience INTEGER NOT NULL,
+    roles_count INTEGER NOT NULL,
+    result_key TEXT NOT NULL REFERENCES results(key),
+    job_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_user_created ON runs(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_fingerprint ON runs(profile_fingerprint);
+"""
+
+
+def encode_results(results) -> bytes:
+    """Serialize CareerResults (or their dict form) to compact, zlib-compressed JSON"""
+    data = as_career_results(results).to_dict()
+    return zlib.compress(json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+
+
+def decode_results(data: bytes) -> CareerResults:
+    return CareerResults.from_dict(json.loads(zlib.decompress(data).decode('utf-8')))
+
+
+def result_key(encoded: bytes) -> str:
+    """Content address of an encoded result: identical results share one key"""
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def profile_fingerprint(user_input: Dict) -> str:
+    """Stable hash of a profile, independent of skill/interest order and case"""
+    profile = {
+        "skills": sorted(s.strip().lower() for s in user_input.get("skills", [])),
+        "interests": sorted(i.strip().lower() for i in user_input.get("interests", [])),
+        "experience": int(user_input.get("experience", 0))
+    }
+    return hashlib.sha256(json.dumps(profile, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class HistoryStore:
+    """Persistent run history in SQLite.
+
+    Run summaries are indexed by user, time and profile fingerprint for paginated listing; full results
+    are stored once, compressed, under their content key, and loaded by key when a past run is opened.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Databases created before runs were keyed on their queue job gain the column in place
+            if "job_id" not in {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}:
+                conn.execute("ALTER TABLE runs ADD COLUMN job_id TEXT")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_job ON runs(job_id) WHERE job_id IS NOT NULL")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save_run(self, user_id: str, user_input: Dict, results, job_id: str = None) -> Dict:
+        """Record a run and store its results by content key; returns the run summary.
+
+        With a job_id, at most one run is recorded per job: a retried job (e.g. after its worker lost the
+        lease between saving and completing) gets the run that was already saved.
+        """
+        results = as_career_results(results)
+        encoded = encode_results(results)
+        key = result_key(encoded)
+        summary = {
+            "user_id": user_id,
+            "created_at": time.time(),
+            "profile_fingerprint": profile_fingerprint(user_input),
+            "skills": list(user_input.get("skills", [])),
+            "interests": list(user_input.get("interests", [])),
+            "experience": int(user_input.get("experience", 0)),
+            "roles_count": len(results.role_fit.recommended_roles),
+            "result_key": key
+        }
+        if job_id is not None:
+            existing = self.run_for_job(job_id)
+            if existing is not None:
+                return existing
+        try:
+            with self._connect() as conn:
+                self._put_result(conn, key, encoded)
+                cursor = conn.execute(
+                    "INSERT INTO runs (user_id, created_at, profile_fingerprint, skills, interests, experience, roles_count, result_key, job_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, summary["created_at"], summary["profile_fingerprint"], json.dumps(summary["skills"]),
+                     json.dumps(summary["interests"]), summary["experience"], summary["roles_count"], key, job_id)
+                )
+                summary["id"] = cursor.lastrowid
+        except sqlite3.IntegrityError:
+            # Another worker saved the same job between the check and the insert
+            existing = self.run_for_job(job_id) if job_id is not None else None
+            if existing is None:
+                raise
+            return existing
+        return summary
+
+    def run_for_job(self, job_id: str) -> Optional[Dict]:
+        """Summary of the run saved for a queue job, if any"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, user_id, created_at, profile_fingerprint, skills, interests, experience, roles_count, result_key "
+                "FROM runs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._summary(row) if row else None
+
+    def update_run_results(self, run_id: int, results) -> Optional[str]:
+        """Point an existing run at new results (e.g. a progress-driven plan update); returns the new key, or None if the run is gone"""
+        results = as_career_results(results)
+        encoded = encode_results(results)
+        key = result_key(encoded)
+        with self._connect() as conn:
+            row = conn.execute("SELECT result_key FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            if row["result_key"] != key:
+                self._put_result(conn, key, encoded)
+                conn.execute("UPDATE runs SET result_key = ?, roles_count = ? WHERE id = ?",
+                             (key, len(results.role_fit.recommended_roles), run_id))
+                self._delete_unreferenced(conn, row["result_key"])
+        return key
+
+    def _summary(self, row: sqlite3.Row) -> Dict:
+        summary = dict(row)
+        summary["skills"] = json.loads(summary["skills"])
+        summary["interests"] = json.loads(summary["interests"])
+        return summary
+
+    def list_runs(self, user_id: str, limit: int = 5, offset: int = 0) -> List[Dict]:
+        """Newest-first page of run summaries for a user (results are not loaded)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, user_id, created_at, profile_fingerprint, skills, interests, experience, roles_count, result_key "
+                "FROM runs WHERE user_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (user_id, limit, offset)
+            ).fetchall()
+        return [self._summary(row) for row in rows]
+
+    def count_runs(self, user_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM runs WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def latest_for_profile(self, user_input: Dict, user_id: str = None) -> Optional[Dict]:
+        """Most recent run for the same profile, optionally limited to one user"""
+        query = ("SELECT id, user_id, created_at, profile_fingerprint, skills, interests, experience, roles_count, result_key "
+                 "FROM runs WHERE profile_fingerprint = ?")
+        params = [profile_fingerprint(user_input)]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        return self._summary(row) if row else None
+
+    def iter_run_results(self, user_id: str = None, since: float = None) -> Iterator[Tuple[Dict, bytes]]:
+        """Stream (summary, encoded results) for every stored run, oldest first, one row at a time"""
+        query = ("SELECT runs.id, runs.user_id, runs.created_at, runs.profile_fingerprint, runs.skills, runs.interests, "
+                 "runs.experience, runs.roles_count, runs.result_key, results.data "
+                 "FROM runs JOIN results ON results.key = runs.result_key WHERE 1 = 1")
+        params = []
+        if user_id is not None:
+            query += " AND runs.user_id = ?"
+            params.append(user_id)
+        if since is not None:
+            query += " AND runs.created_at >= ?"
+            params.append(since)
+        with self._connect() as conn:
+            for row in conn.execute(query + " ORDER BY runs.created_at", params):
+                summary = self._summary(row)
+                yield summary, bytes(summary.pop("data"))
+
+    def _put_result(self, conn: sqlite3.Connection, key: str, encoded: bytes):
+        conn.execute("INSERT OR IGNORE INTO results (key, data) VALUES (?, ?)", (key, encoded))
+
+    def _delete_unreferenced(self, conn: sqlite3.Connection, key: str):
+        conn.execute("DELETE FROM results WHERE key = ? AND NOT EXISTS (SELECT 1 FROM runs WHERE result_key = ?)", (key, key))
+
+    def put_result_data(self, key: str, encoded: bytes):
+        """Store already-encoded results under their content key"""
+        with self._connect() as conn:
+            self._put_result(conn, key, encoded)
+
+    def put_referenced_result_data(self, key: str, encoded: bytes):
+        """Store encoded results only if a run points at them, so superseded session results never persist"""
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO results (key, data) SELECT ?, ? WHERE EXISTS (SELECT 1 FROM runs WHERE result_key = ?)",
+                         (key, encoded, key))
+
+    def get_result_data(self, key: str) -> Optional[bytes]:
+        """Encoded results for a content key, without decoding"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+        return bytes(row["data"]) if row else None
+
+    def load_result(self, key: str) -> Optional[CareerResults]:
+        """Load stored results by content key"""
+        data = self.get_result_data(key)
+        return decode_results(data) if data is not None else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Process-wide history store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
@@ -0,0 +1,298 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from history_store import HistoryStore
+from llm_gateway import BATCH, DEFAULT_MAX_CONCURRENCY, llm_priority, llm_tenant
+
+DEFAULT_QUEUE_PATH = os.getenv('VISHCRAFT_QUEUE_DB', 'vishcraft_queue.db')
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Failed attempts are retried after RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+RETRY_BASE_SECONDS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result_key TEXT,
+    run_id INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires);
+"""
+
+_JOB_COLUMNS = ("id, user_id, payload, status, attempts, max_attempts, created_at, updated_at, available_at, "
+                "lease_owner, lease_expires, result_key, run_id, error")
+
+
+class JobQueue:
+    """Durable graph-run queue in SQLite (WAL), shared by any number of worker processes.
+
+    A worker claims a job by taking a time-limited lease inside an IMMEDIATE transaction, so two workers
+    never hold the same job. Jobs whose lease expires (e.g. the worker died) become claimable again.
+    Failures are retried with exponential backoff up to max_attempts. Results go to the history store
+    and the job keeps their content key.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            # IMMEDIATE takes the write lock up front, so claim's read-then-update cannot race another worker
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _job(self, row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def enqueue(self, user_input: Dict, user_id: str = "batch", max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> str:
+        """Queue a graph run for user_input and return its job id"""
+        return self.enqueue_many([user_input], user_id=user_id, max_attempts=max_attempts)[0]
+
+    def enqueue_many(self, user_inputs: List[Dict], user_id: str = "batch", max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[str]:
+        now = time.time()
+        rows = [(uuid.uuid4().hex, user_id, json.dumps(user_input), "queued", max_attempts, now, now, now)
+                for user_input in user_inputs]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (id, user_id, payload, status, max_attempts, created_at, updated_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return [row[0] for row in rows]
+
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict]:
+        """Lease the oldest ready job (or one whose lease expired) to worker_id"""
+        now = time.time()
+        with self._transaction() as conn:
+            # A lease that expired on the final attempt means the job keeps killing its worker; stop retrying it
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Lease expired on final attempt', lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?) "
+                "ORDER BY available_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+        job = self._job(row)
+        job.update(status="running", attempts=job["attempts"] + 1, lease_owner=worker_id, lease_expires=now + lease_seconds)
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a held lease; False means the lease was lost and the result will not be accepted"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result_key: str, run_id: int = None) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result_key = ?, run_id = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (result_key, run_id, time.time(), job_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Record a failed attempt: requeue with backoff, or mark failed once attempts are used up"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] >= row["max_attempts"]:
+                status, available_at = "failed", now
+            else:
+                status, available_at = "queued", now + RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1)
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (status, available_at, error, now, job_id)
+            )
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+def _run_graph(user_input: Dict):
+    from career_graph import build_career_graph
+    return build_career_graph().run(user_input)
+
+
+def run_worker(queue_path: str = DEFAULT_QUEUE_PATH, history_path: str = None, worker_id: str = None,
+               run_fn: Callable[[Dict], object] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+               poll_interval: float = 1.0, max_jobs: int = None, exit_when_idle: bool = False) -> int:
+    """Claim and run jobs until stopped; returns the number of jobs completed"""
+    queue = JobQueue(queue_path)
+    history = HistoryStore(history_path) if history_path else HistoryStore()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    run_fn = run_fn or _run_graph
+    completed = 0
+
+    while max_jobs is None or completed < max_jobs:
+        job = queue.claim(worker_id, lease_seconds)
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        # Keep the lease alive while the (slow) graph run is in flight
+        stop = threading.Event()
+
+        def _heartbeat(job_id=job["id"]):
+            while not stop.wait(lease_seconds / 3):
+                if not queue.heartbeat(job_id, worker_id, lease_seconds):
+                    break
+
+        heartbeat = threading.Thread(target=_heartbeat, daemon=True)
+        heartbeat.start()
+        try:
+            # Queue work yields LLM capacity to interactive users; the job's user id is its tenant
+            with llm_priority(BATCH), llm_tenant(job["user_id"]):
+                results = run_fn(job["payload"])
+            summary = history.save_run(job["user_id"], job["payload"], results, job_id=job["id"])
+        except Exception as e:
+            queue.fail(job["id"], worker_id, str(e))
+            print(f"[{worker_id}] job {job['id']} failed (attempt {job['attempts']}/{job['max_attempts']}): {str(e)}")
+            continue
+        finally:
+            stop.set()
+            heartbeat.join()
+        if queue.complete(job["id"], worker_id, summary["result_key"], summary["id"]):
+            completed += 1
+    return completed
+
+
+def split_llm_limits(processes: int):
+    """Give this process 1/processes of the configured LLM limits.
+
+    Each worker process has its own gateway and key pool, so without this N workers would send up to N times
+    VISHCRAFT_LLM_CONCURRENCY, each tenant's quota and each key's VISHCRAFT_KEY_RPM. Every process keeps at least
+    one gateway slot, so use no more processes than slots to stay within the limit. The split is static: an
+    idle worker does not lend its share to busy ones.
+    """
+    from key_pool import DEFAULT_KEY_RPM, KeyPool, set_key_pool
+    from llm_gateway import DEFAULT_MAX_CONCURRENCY, LLMGateway, PriorityScheduler, TenantQuota, load_tenant_quotas, set_gateway
+
+    def share(limit):
+        return limit / processes if limit is not None else None
+
+    quotas = {tenant: TenantQuota(share(quota.requests_per_minute), share(quota.tokens_per_minute), quota.weight)
+              for tenant, quota in load_tenant_quotas().items()}
+    set_gateway(LLMGateway(PriorityScheduler(max(1, DEFAULT_MAX_CONCURRENCY // processes), tenant_quotas=quotas)))
+    set_key_pool(KeyPool(requests_per_minute=DEFAULT_KEY_RPM / processes))
+
+
+def run_workers(processes: int, **kwargs) -> int:
+    """Run a worker in each of `processes` processes, each with its share of the LLM limits; returns jobs completed"""
+    if processes <= 1:
+        return run_worker(**kwargs)
+    with multiprocessing.Pool(processes, initializer=split_llm_limits, initargs=(processes,)) as pool:
+        results = [pool.apply_async(run_worker, kwds=dict(kwargs, worker_id=f"{socket.gethostname()}-w{i}"))
+                   for i in range(processes)]
+        return sum(result.get() for result in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Durable career-graph job queue")
+    parser.add_argument("--db", default=DEFAULT_QUEUE_PATH, help="Queue database (default: VISHCRAFT_QUEUE_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue one job per line of a JSONL file of user inputs")
+    enqueue.add_argument("jsonl")
+    enqueue.add_argument("--user", default="batch")
+    enqueue.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    worker = commands.add_parser("worker", help="Run worker processes")
+    # More processes than gateway slots would exceed VISHCRAFT_LLM_CONCURRENCY (each process keeps one slot)
+    worker.add_argument("--processes", type=int, default=min(os.cpu_count() or 1, DEFAULT_MAX_CONCURRENCY))
+    worker.add_argument("--history-db", default=None, help="History database for results (default: VISHCRAFT_HISTORY_DB)")
+    worker.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="Lease length in seconds")
+    worker.add_argument("--exit-when-idle", action="store_true", help="Stop once the queue is drained")
+
+    commands.add_parser("status", help="Show job counts by status")
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        with open(args.jsonl, encoding="utf-8") as f:
+            user_inputs = [json.loads(line) for line in f if line.strip()]
+        job_ids = JobQueue(args.db).enqueue_many(user_inputs, user_id=args.user, max_attempts=args.max_attempts)
+        print(f"Queued {len(job_ids)} jobs")
+    elif args.command == "worker":
+        start = time.perf_counter()
+        completed = run_workers(args.processes, queue_path=args.db, history_path=args.history_db,
+                                lease_seconds=args.lease, exit_when_idle=args.exit_when_idle)
+        elapsed = time.perf_counter() - start
+        print(f"Completed {completed} jobs in {elapsed:.1f}s ({completed / max(elapsed, 1e-9):.2f} jobs/s)")
+    else:
+        print(json.dumps(JobQueue(args.db).counts(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
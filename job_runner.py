@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class JobRunner:
+    """Run career-graph jobs on a bounded worker pool so Streamlit script threads return immediately.
+
+    Jobs live in process memory, keyed by id, so any session (including one reconnecting after a browser
+    refresh) can poll a job by id until its result is collected or it expires.
+    """
+
+    def __init__(self, max_workers: int = None, ttl_seconds: float = 3600):
+        self.max_workers = max_workers or int(os.getenv('VISHCRAFT_JOB_WORKERS', '4'))
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='career-job')
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Queue fn(*args, on_item=..., **kwargs) and return its job id"""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "created": time.time(),
+                "finished": None,
+                "items": {},
+                "result": None,
+                "error": None,
+                "meta": kwargs.pop("meta", {})
+            }
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable, args, kwargs):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+
+        def on_item(stage, item):
+            # Streamed list items let pollers show partial output while the job runs
+            with self._lock:
+                job["items"].setdefault(stage, []).append(item)
+
+        try:
+            result = fn(*args, on_item=on_item, **kwargs)
+            with self._lock:
+                job["result"] = result
+                job["status"] = "done"
+        except Exception as e:
+            with self._lock:
+                job["error"] = str(e)
+                job["status"] = "error"
+        finally:
+            with self._lock:
+                job["finished"] = time.time()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a snapshot of the job, or None if it is unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot["items"] = {stage: list(items) for stage, items in job["items"].items()}
+            return snapshot
+
+    def discard(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job["finished"] and job["finished"] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide job runner shared by every Streamlit session"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
+
+
+def submit_career_run(user_input: Dict, tenant: str = None) -> str:
+    """Queue a full career-graph run for user_input on the shared runner, attributed to tenant"""
+    from career_graph import build_career_graph
+    graph = build_career_graph()
+    # Worker threads do not inherit the caller's context, so the tenant travels with the job
+    tenant = tenant or os.getenv('VISHCRAFT_TENANT', 'default')
+    return get_job_runner().submit(graph.run, user_input, tenant=tenant, meta={"user_input": user_input, "tenant": tenant})
@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Per-key request limit; 0 leaves keys unthrottled until the API itself reports a quota error
+DEFAULT_KEY_RPM = float(os.getenv('VISHCRAFT_KEY_RPM', '0'))
+# First cooldown after a quota error; doubles for each consecutive error on the same key
+DEFAULT_COOLDOWN_SECONDS = float(os.getenv('VISHCRAFT_KEY_COOLDOWN', '30'))
+MAX_COOLDOWN_SECONDS = 600
+# A key's request bucket holds this many seconds of its rate, so calls are paced rather than sent in a burst
+KEY_BURST_SECONDS = 1.0
+
+_PLACEHOLDER_KEYS = ("YOUR_GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE", "your_api_key_here")
+
+
+def load_api_keys() -> List[str]:
+    """Keys from GEMINI_API_KEYS (comma-separated), falling back to GEMINI_API_KEY"""
+    raw = os.getenv('GEMINI_API_KEYS') or os.getenv('GEMINI_API_KEY') or ""
+    keys = []
+    for key in raw.split(","):
+        key = key.strip()
+        if key and key not in _PLACEHOLDER_KEYS and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def is_quota_error(error: Exception) -> bool:
+    """True for 429 / resource-exhausted errors, without importing the SDK's exception types"""
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "resource exhausted" in message or "rate limit" in message
+
+
+class ApiKey:
+    """One API key with its own client, request bucket, cooldown and counters"""
+
+    def __init__(self, key: str, requests_per_minute: float = None):
+        self.key = key
+        self.label = f"...{key[-4:]}"
+        self.requests_per_minute = requests_per_minute or None
+        self.burst = max(1.0, self.requests_per_minute * KEY_BURST_SECONDS / 60) if self.requests_per_minute else None
+        self.bucket = self.burst
+        self.refilled = time.monotonic()
+        self.inflight = 0
+        self.cooldown_until = 0.0
+        self.consecutive_errors = 0
+        self.models: Dict[str, object] = {}
+        self.stats = {"calls": 0, "errors": 0, "quota_errors": 0}
+
+    def refill(self, now: float):
+        if self.requests_per_minute is not None:
+            self.bucket = min(self.burst, self.bucket + (now - self.refilled) * self.requests_per_minute / 60)
+        self.refilled = now
+
+    def available_at(self, now: float) -> float:
+        """Earliest time this key can take another call"""
+        ready = max(now, self.cooldown_until)
+        if self.requests_per_minute is not None and self.bucket < 1:
+            ready = max(ready, now + (1 - self.bucket) * 60 / self.requests_per_minute)
+        return ready
+
+    def capacity(self) -> float:
+        # Calls the key can still take right now, less the ones already running on it
+        if self.requests_per_minute is None:
+            return -self.inflight
+        return self.bucket - self.inflight
+
+
+def _keyed_model(model_name: str, key: str):
+    """GenerativeModel bound to its own client for key.
+
+    google-generativeai has no public per-model API key: genai.configure sets one process-wide client. This
+    relies on GenerativeModel using self._client when it is set and only falling back to the default client
+    when it is None, which holds for google-generativeai 0.3 through 0.8 (pinned in requirements.txt). If an
+    SDK upgrade drops _client, this is the only place to change.
+    """
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+    model = genai.GenerativeModel(model_name)
+    model._client = glm.GenerativeServiceClient(client_options={"api_key": key})
+    return model
+
+
+def gemini_call(api_key: ApiKey, model_name: str, prompt: str, stream: bool = False):
+    """Call Gemini through a client bound to this key, leaving the SDK's global configuration untouched"""
+    model = api_key.models.get(model_name)
+    if model is None:
+        model = api_key.models[model_name] = _keyed_model(model_name, api_key.key)
+    return model.generate_content(prompt, stream=stream)
+
+
+class ReleasingStream:
+    """Streamed response that holds a resource (a scheduler slot, a key) until it is consumed, fails or is dropped.
+
+    release(error) is called exactly once, with the exception that ended the stream or None.
+    """
+
+    def __init__(self, response, release: Callable[[Optional[Exception]], None]):
+        self._response = response
+        self._release = release
+        self._released = False
+
+    def _done(self, error: Exception = None):
+        if not self._released:
+            self._released = True
+            self._release(error)
+
+    def __iter__(self):
+        try:
+            yield from self._response
+        except Exception as e:
+            self._done(e)
+            raise
+        finally:
+            self._done()
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def __del__(self):
+        self._done()
+
+
+class KeyPool:
+    """Spreads LLM calls over several API keys.
+
+    Each call goes to the key with the most remaining capacity (request bucket minus calls in flight).
+    A key that returns a quota error cools down, with the cooldown doubling on consecutive errors, and
+    the call is retried once on each other key. When no key is ready, callers wait for the first one to
+    free up, so aggregate throughput grows with the number of keys.
+    """
+
+    def __init__(self, keys: List[str] = None, requests_per_minute: float = DEFAULT_KEY_RPM,
+                 cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS, call: Callable = None):
+        self.requests_per_minute = requests_per_minute
+        self.cooldown_seconds = cooldown_seconds
+        self.call = call or gemini_call
+        self._keys: List[ApiKey] = []
+        self._ready = threading.Condition()
+        for key in (load_api_keys() if keys is None else keys):
+            self.add_key(key)
+
+    def __len__(self):
+        with self._ready:
+            return len(self._keys)
+
+    def add_key(self, key: Optional[str]):
+        """Add a key to the pool; placeholders, blanks and duplicates are ignored"""
+        key = (key or "").strip()
+        if not key or key in _PLACEHOLDER_KEYS:
+            return
+        with self._ready:
+            if all(existing.key != key for existing in self._keys):
+                self._keys.append(ApiKey(key, self.requests_per_minute))
+                self._ready.notify_all()
+
+    def acquire(self, exclude=()) -> ApiKey:
+        """Block until a key outside exclude is ready, then take one call's worth of its capacity"""
+        with self._ready:
+            while True:
+                now = time.monotonic()
+                candidates = [k for k in self._keys if k not in exclude]
+                if not candidates:
+                    raise RuntimeError("No Gemini API key configured (set GEMINI_API_KEYS or GEMINI_API_KEY)")
+                for api_key in candidates:
+                    api_key.refill(now)
+                ready = [k for k in candidates if k.available_at(now) <= now]
+                if ready:
+                    # Ties go to the key that has served the fewest calls, so idle keys take turns
+                    api_key = max(ready, key=lambda k: (k.capacity(), -k.stats["calls"]))
+                    if api_key.requests_per_minute is not None:
+                        api_key.bucket -= 1
+                    api_key.inflight += 1
+                    api_key.stats["calls"] += 1
+                    return api_key
+                self._ready.wait(min(k.available_at(now) for k in candidates) - now)
+
+    def release(self, api_key: ApiKey, error: Exception = None):
+        with self._ready:
+            api_key.inflight -= 1
+            if error is None:
+                api_key.consecutive_errors = 0
+            elif is_quota_error(error):
+                api_key.stats["quota_errors"] += 1
+                api_key.cooldown_until = time.monotonic() + min(
+                    MAX_COOLDOWN_SECONDS, self.cooldown_seconds * 2 ** api_key.consecutive_errors)
+                api_key.consecutive_errors += 1
+            else:
+                api_key.stats["errors"] += 1
+            self._ready.notify_all()
+
+    def generate(self, model_name: str, prompt: str, stream: bool = False):
+        """Run one call on the best available key, moving to another key on quota errors"""
+        tried = []
+        while True:
+            api_key = self.acquire(exclude=tried)
+            try:
+                response = self.call(api_key, model_name, prompt, stream=stream)
+            except Exception as e:
+                self.release(api_key, e)
+                tried.append(api_key)
+                if is_quota_error(e) and len(tried) < len(self):
+                    continue
+                raise
+            if stream:
+                # Nothing has been read yet; the key stays busy (and is charged for errors) until the stream ends
+                return ReleasingStream(response, lambda error, api_key=api_key: self.release(api_key, error))
+            self.release(api_key)
+            return response
+
+    def stats(self) -> List[Dict]:
+        with self._ready:
+            now = time.monotonic()
+            return [
+                dict(api_key.stats, key=api_key.label, inflight=api_key.inflight,
+                     cooldown_seconds=round(max(0.0, api_key.cooldown_until - now), 1))
+                for api_key in self._keys
+            ]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> KeyPool:
+    """Process-wide key pool, loaded from the environment on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = KeyPool()
+        return _pool
+
+
+def set_key_pool(pool: KeyPool):
+    """Replace the process-wide key pool (e.g. with a smaller per-key rate in one of several worker processes)"""
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+def register_api_key(key: Optional[str]):
+    """Make a key passed to an assistant available to the shared pool"""
+    get_key_pool().add_key(key)
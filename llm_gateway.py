@@ -0,0 +1,425 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from key_pool import ReleasingStream
+from tracing import LLM, current_span, start_span
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+DEFAULT_TENANT = "default"
+
+# Relative share of admissions when both classes are waiting
+DEFAULT_WEIGHTS = {INTERACTIVE: 8, BATCH: 1}
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('VISHCRAFT_LLM_CONCURRENCY', '8'))
+# Slots batch traffic leaves free while interactive users are active
+DEFAULT_INTERACTIVE_RESERVE = float(os.getenv('VISHCRAFT_LLM_INTERACTIVE_RESERVE', '0.25'))
+# Interactive waiters at which new batch admissions stop entirely
+DEFAULT_SPIKE_THRESHOLD = 2
+# How long the interactive reserve (and its recent demand peak) is kept after interactive activity
+DEFAULT_INTERACTIVE_WINDOW = 10.0
+
+# Deficit round robin credit a tenant receives per turn, in estimated tokens
+DEFAULT_QUANTUM_TOKENS = 2000
+# Response size assumed when a call's cost is estimated before it runs
+ESTIMATED_OUTPUT_TOKENS = 800
+# Waiters re-check admission this often, so a tenant held back by its quota resumes once its buckets refill
+_QUOTA_POLL_SECONDS = 0.05
+
+_priority = contextvars.ContextVar('llm_priority', default=INTERACTIVE)
+_tenant = contextvars.ContextVar('llm_tenant', default=DEFAULT_TENANT)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def current_tenant() -> str:
+    return _tenant.get()
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed LLM calls in the given scheduling class ('interactive' or 'batch')"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def llm_tenant(tenant: Optional[str]):
+    """Attribute the enclosed LLM calls to a tenant for quotas, fair queuing and usage counters"""
+    token = _tenant.set(tenant or DEFAULT_TENANT)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Pre-call cost estimate: about four characters per prompt token plus a typical response"""
+    return len(prompt) // 4 + ESTIMATED_OUTPUT_TOKENS
+
+
+@dataclass
+class TenantQuota:
+    """Per-minute limits for one tenant (None means unlimited) and its share under contention"""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    weight: float = 1.0
+
+    def __post_init__(self):
+        # A zero weight would never earn DRR credit, and the scheduler would spin on that tenant forever
+        if not self.weight > 0:
+            raise ValueError(f"weight must be positive, got {self.weight!r}")
+
+
+def load_tenant_quotas(raw: str = None) -> Dict[str, TenantQuota]:
+    """Parse VISHCRAFT_TENANT_QUOTAS, e.g. {"hr": {"requests_per_minute": 60}, "*": {"tokens_per_minute": 200000}}"""
+    raw = os.getenv('VISHCRAFT_TENANT_QUOTAS', '') if raw is None else raw
+    if not raw.strip():
+        return {}
+    try:
+        entries = json.loads(raw).items()
+    except Exception as e:
+        print(f"Ignoring invalid VISHCRAFT_TENANT_QUOTAS: {str(e)}")
+        return {}
+    quotas = {}
+    for tenant, limits in entries:
+        try:
+            quotas[tenant] = TenantQuota(**limits)
+        except Exception as e:
+            print(f"Ignoring invalid VISHCRAFT_TENANT_QUOTAS entry for {tenant!r}: {str(e)}")
+    return quotas
+
+
+class _TenantState:
+    """Request/token buckets, DRR deficit and usage counters for one tenant"""
+
+    def __init__(self, quota: TenantQuota, now: float):
+        self.quota = quota
+        self.requests = quota.requests_per_minute
+        self.tokens = quota.tokens_per_minute
+        self.refilled = now
+        self.deficit = 0.0
+        self.usage = {"requests": 0, "tokens": 0, "estimated_tokens": 0, "queued_seconds": 0.0, "throttled": 0, "errors": 0}
+
+    def refill(self, now: float):
+        elapsed = now - self.refilled
+        self.refilled = now
+        if self.requests is not None:
+            self.requests = min(self.quota.requests_per_minute, self.requests + elapsed * self.quota.requests_per_minute / 60)
+        if self.tokens is not None:
+            self.tokens = min(self.quota.tokens_per_minute, self.tokens + elapsed * self.quota.tokens_per_minute / 60)
+
+    def within_quota(self) -> bool:
+        # The token bucket may go negative when a call used more than estimated; that debt delays the next call
+        return (self.requests is None or self.requests >= 1) and (self.tokens is None or self.tokens > 0)
+
+    def charge(self, tokens: float):
+        if self.requests is not None:
+            self.requests -= 1
+        if self.tokens is not None:
+            self.tokens -= tokens
+
+
+class _Waiter:
+    __slots__ = ("priority", "tenant", "cost", "event", "enqueued", "admitted", "throttled")
+
+    def __init__(self, priority: str, tenant: str, cost: int):
+        self.priority = priority
+        self.tenant = tenant
+        self.cost = cost
+        self.event = threading.Event()
+        self.enqueued = time.monotonic()
+        self.admitted = None
+        self.throttled = False
+
+
+class _TenantQueues:
+    """Waiters of one scheduling class, one FIFO per tenant, served by deficit round robin"""
+
+    def __init__(self):
+        self.queues: Dict[str, deque] = {}
+        self.ring = deque()
+        self.size = 0
+        # Whether the tenant at the head of the ring has had its quantum for the current turn
+        self.credited = False
+
+    def __len__(self):
+        return self.size
+
+    def push(self, waiter: _Waiter):
+        queue = self.queues.get(waiter.tenant)
+        if queue is None:
+            queue = self.queues[waiter.tenant] = deque()
+            self.ring.append(waiter.tenant)
+        queue.append(waiter)
+        self.size += 1
+
+    def has_eligible(self, tenants: Dict[str, _TenantState]) -> bool:
+        return any(tenants[tenant].within_quota() for tenant in self.ring)
+
+    def pop(self, tenants: Dict[str, _TenantState], quantum: float) -> _Waiter:
+        # Only called when has_eligible() holds, so the loop ends at an in-quota tenant with enough credit
+        while True:
+            tenant = self.ring[0]
+            state = tenants[tenant]
+            queue = self.queues[tenant]
+            if state.within_quota():
+                if not self.credited:
+                    state.deficit += quantum * state.quota.weight
+                    self.credited = True
+                if state.deficit >= queue[0].cost:
+                    waiter = queue.popleft()
+                    state.deficit -= waiter.cost
+                    self.size -= 1
+                    if not queue:
+                        # A tenant that goes idle forfeits its leftover credit
+                        del self.queues[tenant]
+                        self.ring.popleft()
+                        state.deficit = 0.0
+                        self.credited = False
+                    return waiter
+            self.ring.rotate(-1)
+            self.credited = False
+
+
+class PriorityScheduler:
+    """Admission control for LLM calls across scheduling classes and tenants.
+
+    At most max_concurrency calls run at once. When a slot frees up and several classes are waiting, the
+    next admission goes to the class with the lowest virtual pass (stride scheduling), so classes share
+    admissions in proportion to their weights. Batch is additionally held back for interactive traffic:
+    while interactive calls are recent it may only use the slots outside the interactive reserve, which
+    grows to the peak interactive demand seen in the window, and once spike_threshold interactive calls
+    are queued, no new batch call is admitted until they drain. In-flight calls are never interrupted.
+
+    Within a class, tenants take turns by deficit round robin over estimated tokens, so one tenant's bulk
+    run cannot crowd out the others. A tenant whose request or token bucket is empty is skipped until it
+    refills; actual token usage reported by the backend is settled against the estimate after each call.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, weights: Dict[str, float] = None,
+                 interactive_reserve: float = DEFAULT_INTERACTIVE_RESERVE, spike_threshold: int = DEFAULT_SPIKE_THRESHOLD,
+                 interactive_window: float = DEFAULT_INTERACTIVE_WINDOW, tenant_quotas: Dict[str, TenantQuota] = None,
+                 quantum_tokens: float = DEFAULT_QUANTUM_TOKENS):
+        self.max_concurrency = max_concurrency
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        invalid = [priority for priority, weight in self.weights.items() if not weight > 0]
+        if invalid:
+            raise ValueError(f"Priority weights must be positive: {', '.join(invalid)}")
+        self.reserved = min(max_concurrency - 1, int(round(max_concurrency * interactive_reserve)))
+        self.spike_threshold = spike_threshold
+        self.interactive_window = interactive_window
+        # "*" applies to tenants without an entry of their own
+        self.tenant_quotas = load_tenant_quotas() if tenant_quotas is None else dict(tenant_quotas)
+        self.quantum_tokens = quantum_tokens
+        self._lock = threading.Lock()
+        self._waiting: Dict[str, _TenantQueues] = {}
+        self._inflight: Dict[str, int] = {}
+        self._pass: Dict[str, float] = {}
+        self._admitted: Dict[str, int] = {}
+        self._tenants: Dict[str, _TenantState] = {}
+        self._last_interactive = float('-inf')
+        self._interactive_peak = 0
+        self._peak_started = float('-inf')
+
+    def _queue(self, priority: str) -> _TenantQueues:
+        if priority not in self._waiting:
+            self._waiting[priority] = _TenantQueues()
+            self._inflight[priority] = 0
+            self._pass[priority] = 0.0
+            self._admitted[priority] = 0
+            self.weights.setdefault(priority, 1)
+        return self._waiting[priority]
+
+    def _tenant(self, tenant: str, now: float) -> _TenantState:
+        if tenant not in self._tenants:
+            quota = self.tenant_quotas.get(tenant) or self.tenant_quotas.get("*") or TenantQuota()
+            self._tenants[tenant] = _TenantState(quota, now)
+        return self._tenants[tenant]
+
+    def _record_interactive_demand(self, now: float):
+        demand = self._inflight.get(INTERACTIVE, 0) + len(self._waiting.get(INTERACTIVE, ()))
+        if now - self._peak_started > self.interactive_window:
+            self._interactive_peak, self._peak_started = demand, now
+        else:
+            self._interactive_peak = max(self._interactive_peak, demand)
+
+    def _batch_limit(self, now: float) -> int:
+        if len(self._waiting.get(INTERACTIVE, ())) >= self.spike_threshold:
+            return 0
+        if now - self._last_interactive < self.interactive_window:
+            reserve = max(self.reserved, self._interactive_peak)
+            return max(0, self.max_concurrency - reserve)
+        return self.max_concurrency
+
+    def _dispatch(self):
+        # Called with the lock held: hand free slots to waiters until none are free or none may be admitted
+        now = time.monotonic()
+        for state in self._tenants.values():
+            state.refill(now)
+        while sum(self._inflight.values()) < self.max_concurrency:
+            candidates = [p for p, queue in self._waiting.items() if queue and queue.has_eligible(self._tenants)]
+            if BATCH in candidates and self._inflight[BATCH] >= self._batch_limit(now):
+                candidates.remove(BATCH)
+            if not candidates:
+                return
+            priority = min(candidates, key=lambda p: self._pass[p])
+            waiter = self._waiting[priority].pop(self._tenants, self.quantum_tokens)
+            self._pass[priority] += 1.0 / self.weights[priority]
+            self._inflight[priority] += 1
+            self._admitted[priority] += 1
+            state = self._tenants[waiter.tenant]
+            state.charge(waiter.cost)
+            state.usage["requests"] += 1
+            state.usage["estimated_tokens"] += waiter.cost
+            state.usage["queued_seconds"] += now - waiter.enqueued
+            state.usage["throttled"] += waiter.throttled
+            waiter.admitted = now
+            waiter.event.set()
+
+    def acquire(self, priority: str, tenant: str = DEFAULT_TENANT, cost: int = ESTIMATED_OUTPUT_TOKENS) -> _Waiter:
+        """Block until a slot is granted; the returned ticket is handed back to release()"""
+        waiter = _Waiter(priority, tenant, cost)
+        with self._lock:
+            queue = self._queue(priority)
+            self._tenant(tenant, waiter.enqueued)
+            if not queue:
+                # A class returning from idle starts level with the busiest active class instead of
+                # cashing in credit for the time it was not competing
+                active = [self._pass[p] for p, q in self._waiting.items() if q]
+                if active:
+                    self._pass[priority] = max(self._pass[priority], min(active))
+            queue.push(waiter)
+            if priority == INTERACTIVE:
+                self._last_interactive = waiter.enqueued
+                self._record_interactive_demand(waiter.enqueued)
+            self._dispatch()
+        while not waiter.event.wait(_QUOTA_POLL_SECONDS):
+            with self._lock:
+                if not self._tenants[tenant].within_quota():
+                    waiter.throttled = True
+                self._dispatch()
+        return waiter
+
+    def release(self, ticket: _Waiter, tokens: Optional[int] = None, error: bool = False):
+        """Free the ticket's slot; tokens is the call's actual usage when the backend reported it"""
+        with self._lock:
+            self._inflight[ticket.priority] -= 1
+            state = self._tenants[ticket.tenant]
+            if tokens is None:
+                tokens = ticket.cost
+            elif state.tokens is not None:
+                state.tokens -= tokens - ticket.cost
+            state.usage["tokens"] += tokens
+            state.usage["errors"] += error
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                p: {"waiting": len(q), "inflight": self._inflight[p], "admitted": self._admitted[p], "weight": self.weights[p]}
+                for p, q in self._waiting.items()
+            }
+
+    def usage(self) -> Dict[str, Dict]:
+        """Per-tenant counters: admitted requests, actual and estimated tokens, time queued, quota throttles, errors"""
+        with self._lock:
+            return {tenant: dict(state.usage) for tenant, state in self._tenants.items()}
+
+
+def response_tokens(response) -> Optional[int]:
+    """Total tokens the backend reported for a (fully consumed) response, if any"""
+    try:
+        return int(response.usage_metadata.total_token_count)
+    except Exception:
+        return None
+
+
+def usage_counts(response) -> Dict[str, int]:
+    """Prompt/response token counts from the response's usage metadata, for tracing"""
+    counts = {}
+    for name, field in (("prompt_tokens", "prompt_token_count"), ("response_tokens", "candidates_token_count")):
+        try:
+            counts[name] = int(getattr(response.usage_metadata, field))
+        except Exception:
+            pass
+    return counts
+
+
+def gemini_backend(model_name: str, prompt: str, stream: bool = False):
+    from key_pool import get_key_pool
+    return get_key_pool().generate(model_name, prompt, stream=stream)
+
+
+class LLMGateway:
+    """Single path for every assistant LLM call: schedules the call, then hands it to the backend"""
+
+    def __init__(self, scheduler: PriorityScheduler = None, backend: Callable = None):
+        self.scheduler = scheduler or PriorityScheduler()
+        self.backend = backend or gemini_backend
+
+    def generate(self, model_name: str, prompt: str, stream: bool = False, priority: Optional[str] = None,
+                 tenant: Optional[str] = None):
+        priority, tenant = priority or current_priority(), tenant or current_tenant()
+        # Spans the whole request, including time queued for a slot and, for streams, until consumption
+        # call names the assistant step that issued the request (roles, plan, ...); there is no response cache yet
+        span = start_span("generate_content", LLM, model=model_name, stream=stream, priority=priority, tenant=tenant,
+                          call=getattr(current_span(), "name", None), cache_hit=False)
+        ticket = self.scheduler.acquire(priority, tenant, estimate_tokens(prompt))
+        span.set(queue_wait_ms=round((ticket.admitted - ticket.enqueued) * 1000, 3))
+        try:
+            response = self.backend(model_name, prompt, stream=stream)
+        except Exception as e:
+            self.scheduler.release(ticket, error=True)
+            span.end(e)
+            raise
+        if stream:
+            def _finish(error):
+                # The scheduler slot is held until the stream is consumed or dropped
+                self.scheduler.release(ticket, response_tokens(response), error is not None)
+                span.set(**usage_counts(response))
+                span.end(error)
+            return ReleasingStream(response, _finish)
+        self.scheduler.release(ticket, response_tokens(response))
+        span.set(**usage_counts(response))
+        span.end()
+        return response
+
+    def usage(self) -> Dict[str, Dict]:
+        return self.scheduler.usage()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Process-wide gateway shared by all assistants"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+
+def set_gateway(gateway: LLMGateway):
+    """Replace the process-wide gateway (e.g. to tune limits or swap the backend)"""
+    global _gateway
+    with _gateway_lock:
+        _gateway = gateway
+
+
+def generate(model_name: str, prompt: str, stream: bool = False, priority: Optional[str] = None, tenant: Optional[str] = None):
+    return get_gateway().generate(model_name, prompt, stream=stream, priority=priority, tenant=tenant)
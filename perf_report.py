@@ -0,0 +1,139 @@
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+from tracing import CALL, DEFAULT_TRACE_PATH, LLM, RUN, STAGE
+
+# Parse outcomes that mean the response could not be used as returned
+PARSE_FAILURES = ("fallback", "unstructured", "text")
+
+_SPAN_COLUMNS = ["trace_id", "span_id", "parent_id", "name", "kind", "start", "wall_ms", "status",
+                 "queue_wait_ms", "prompt_tokens", "response_tokens", "cache_hit", "parse_outcome", "model", "tenant"]
+
+_frame_cache: Dict = {}
+_frame_cache_lock = threading.Lock()
+
+
+def _parse_lines(text: str) -> pd.DataFrame:
+    try:
+        return pd.read_json(io.StringIO(text), lines=True, dtype=False, convert_dates=False)
+    except ValueError:
+        # A malformed line (e.g. a crashed writer) fails the bulk parser; keep every line that parses
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return pd.DataFrame.from_records(records)
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.reindex(columns=list(dict.fromkeys(_SPAN_COLUMNS + list(frame.columns))))
+    frame["start"] = pd.to_numeric(frame["start"], errors="coerce")
+    frame["wall_ms"] = pd.to_numeric(frame["wall_ms"], errors="coerce")
+    return frame
+
+
+def load_spans(path: str = DEFAULT_TRACE_PATH, since: float = None) -> pd.DataFrame:
+    """Exported spans as a DataFrame; only lines appended since the last call are read and parsed"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=_SPAN_COLUMNS)
+    with _frame_cache_lock:
+        cached = _frame_cache.get(path)
+        # A new inode or a shorter file means the trace file was rotated or truncated: start over
+        if cached is None or cached["inode"] != stat.st_ino or stat.st_size < cached["offset"]:
+            cached = {"inode": stat.st_ino, "offset": 0, "frame": None}
+        if stat.st_size > cached["offset"]:
+            with open(path, "rb") as f:
+                f.seek(cached["offset"])
+                data = f.read()
+            # The last line may still be half-written by another process; it is read on the next call
+            end = data.rfind(b"\n") + 1
+            if end:
+                new = _normalize(_parse_lines(data[:end].decode("utf-8", errors="replace")))
+                frame = new if cached["frame"] is None else pd.concat([cached["frame"], new], ignore_index=True)
+                cached = {"inode": stat.st_ino, "offset": cached["offset"] + end, "frame": frame}
+        _frame_cache[path] = cached
+        frame = cached["frame"] if cached["frame"] is not None else pd.DataFrame(columns=_SPAN_COLUMNS)
+    if since is not None:
+        frame = frame[frame["start"] >= since]
+    return frame
+
+
+def latency_by_stage(spans: pd.DataFrame) -> pd.DataFrame:
+    """p50/p95/p99 wall time, count and error rate per run, stage and assistant call"""
+    spans = spans[spans["kind"].isin([RUN, STAGE, CALL])]
+    if spans.empty:
+        return pd.DataFrame(columns=["kind", "name", "count", "p50_ms", "p95_ms", "p99_ms", "error_rate"])
+    grouped = spans.groupby(["kind", "name"])
+    table = grouped["wall_ms"].quantile([0.5, 0.95, 0.99]).unstack()
+    table.columns = ["p50_ms", "p95_ms", "p99_ms"]
+    table.insert(0, "count", grouped.size())
+    table["error_rate"] = grouped["status"].apply(lambda status: (status == "error").mean())
+    order = {RUN: 0, STAGE: 1, CALL: 2}
+    return table.reset_index().sort_values(["kind", "p95_ms"], key=lambda col: col.map(order) if col.name == "kind" else -col)
+
+
+def cache_hit_rates(spans: pd.DataFrame) -> pd.DataFrame:
+    """Hit rate and lookup count for every span that reports cache_hit"""
+    lookups = spans[spans["cache_hit"].notna()]
+    if lookups.empty:
+        return pd.DataFrame(columns=["name", "lookups", "hit_rate"])
+    hits = lookups["cache_hit"].astype(bool)
+    return hits.groupby(lookups["name"]).agg(lookups="size", hit_rate="mean").reset_index()
+
+
+def per_run_usage(spans: pd.DataFrame) -> pd.DataFrame:
+    """Model calls and tokens for each graph run (a run span's trace)"""
+    runs = spans.loc[spans["kind"] == RUN, ["trace_id", "start", "wall_ms"]]
+    llm = spans[(spans["kind"] == LLM) & spans["trace_id"].isin(runs["trace_id"])]
+    tokens = llm["prompt_tokens"].fillna(0) + llm["response_tokens"].fillna(0)
+    usage = pd.DataFrame({"calls": llm.groupby("trace_id").size(), "tokens": tokens.groupby(llm["trace_id"]).sum()})
+    return runs.set_index("trace_id").join(usage).fillna({"calls": 0, "tokens": 0})
+
+
+def parse_failure_rates(spans: pd.DataFrame) -> pd.DataFrame:
+    """Share of assistant calls whose response fell back to defaults or had no usable structure"""
+    calls = spans[(spans["kind"] == CALL) & spans["parse_outcome"].notna()]
+    if calls.empty:
+        return pd.DataFrame(columns=["name", "calls", "failure_rate"])
+    failed = calls["parse_outcome"].isin(PARSE_FAILURES)
+    return failed.groupby(calls["name"]).agg(calls="size", failure_rate="mean").reset_index()
+
+
+def throughput(spans: pd.DataFrame, freq: str = "5min") -> pd.DataFrame:
+    """Completed runs and model calls per interval, plus the interval's p95 run latency"""
+    timed = spans[spans["kind"].isin([RUN, LLM])]
+    if timed.empty:
+        return pd.DataFrame(columns=["runs", "llm_calls", "run_p95_ms"])
+    timed = timed.set_index(pd.to_datetime(timed["start"], unit="s")).sort_index()
+    runs = timed[timed["kind"] == RUN]
+    frame = pd.DataFrame({
+        "runs": runs["wall_ms"].resample(freq).count(),
+        "llm_calls": timed.loc[timed["kind"] == LLM, "wall_ms"].resample(freq).count(),
+        "run_p95_ms": runs["wall_ms"].resample(freq).quantile(0.95)
+    })
+    return frame.fillna({"runs": 0, "llm_calls": 0})
+
+
+def performance_summary(path: str = DEFAULT_TRACE_PATH, window_hours: Optional[float] = 24, freq: str = "5min") -> Dict:
+    """Every table the Performance tab shows, from one load of the trace file"""
+    since = time.time() - window_hours * 3600 if window_hours else None
+    spans = load_spans(path, since=since)
+    runs = per_run_usage(spans)
+    return {
+        "spans": len(spans),
+        "latency": latency_by_stage(spans),
+        "cache": cache_hit_rates(spans),
+        "runs": runs,
+        "parse": parse_failure_rates(spans),
+        "throughput": throughput(spans, freq)
+    }
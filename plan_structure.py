@@ -0,0 +1,240 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Compiled once at import; each is anchored to a single line so matching stays linear in the plan size
+_MONTH_RE = re.compile(r'month\s*(\d{1,2})(?:\s*[-–]\s*\d{1,2}(?!\d))?\s*[-:–.)]?\s*', re.IGNORECASE)
+_NUMBERED_RE = re.compile(r'\d+[.)]\s+')
+
+_BULLET_MARKERS = ('-', '•', '*', '+')
+_EMPHASIS = ('**', '__')
+
+# Section titles are matched on these keywords to pick out courses and checkpoints
+_COURSE_KEYWORDS = ('course', 'certification', 'learning resource')
+_CHECKPOINT_KEYWORDS = ('checkpoint', 'progress tracking', 'measurable')
+
+
+@dataclass(slots=True)
+class PlanMilestone:
+    """A monthly milestone parsed from the action plan"""
+    month: int
+    title: str
+    tasks: List[str] = field(default_factory=list)
+    # Line span [start_line, end_line) of the milestone in the source markdown, used for section patching
+    start_line: int = 0
+    end_line: int = 0
+
+
+@dataclass(slots=True)
+class PlanSection:
+    """A non-monthly section of the action plan (priorities, courses, networking, ...)"""
+    title: str
+    level: int
+    items: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class PlanStructure:
+    """Milestones, courses and checkpoints extracted from an action plan's markdown"""
+    milestones: List[PlanMilestone] = field(default_factory=list)
+    sections: List[PlanSection] = field(default_factory=list)
+    courses: List[str] = field(default_factory=list)
+    checkpoints: List[str] = field(default_factory=list)
+
+    def milestone(self, month: int) -> Optional[PlanMilestone]:
+        for milestone in self.milestones:
+            if milestone.month == month:
+                return milestone
+        return None
+
+    def to_dict(self) -> Dict:
+        # Built by hand: dataclasses.asdict deep-copies every nested value and is several times slower
+        return {
+            'milestones': [
+                {'month': m.month, 'title': m.title, 'tasks': list(m.tasks), 'start_line': m.start_line, 'end_line': m.end_line}
+                for m in self.milestones
+            ],
+            'sections': [{'title': s.title, 'level': s.level, 'items': list(s.items)} for s in self.sections],
+            'courses': list(self.courses),
+            'checkpoints': list(self.checkpoints)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PlanStructure':
+        return cls(
+            milestones=[PlanMilestone(**m) for m in data.get('milestones', [])],
+            sections=[PlanSection(**s) for s in data.get('sections', [])],
+            courses=list(data.get('courses', [])),
+            checkpoints=list(data.get('checkpoints', []))
+        )
+
+    def to_prompt(self, max_tasks: int = 3) -> str:
+        """Compact one-line-per-milestone rendering for prompts that need the plan's shape, not its prose"""
+        lines = []
+        for milestone in self.milestones:
+            tasks = '; '.join(milestone.tasks[:max_tasks])
+            lines.append(f"Month {milestone.month}: {milestone.title}" + (f" | {tasks}" if tasks else ""))
+        if self.courses:
+            lines.append(f"Courses: {'; '.join(self.courses)}")
+        if self.checkpoints:
+            lines.append(f"Checkpoints: {'; '.join(self.checkpoints)}")
+        return '\n'.join(lines)
+
+
+def as_plan_structure(value) -> Optional[PlanStructure]:
+    """Accept a PlanStructure or its dict form (e.g. from a JSON export) and return a PlanStructure"""
+    if value is None or isinstance(value, PlanStructure):
+        return value
+    if isinstance(value, dict):
+        return PlanStructure.from_dict(value)
+    return None
+
+
+def _strip_emphasis(text: str) -> str:
+    for marker in _EMPHASIS:
+        text = text.replace(marker, '')
+    return text.strip()
+
+
+def _heading_level(line: str) -> int:
+    level = 0
+    while level < len(line) and line[level] == '#':
+        level += 1
+    return level
+
+
+def _bullet_text(line: str) -> Optional[str]:
+    """Return the text of a top-level bullet or numbered item, or None if the line is not one"""
+    if line[:1] in _BULLET_MARKERS and line[1:2] in (' ', '\t'):
+        return line[2:].strip()
+    match = _NUMBERED_RE.match(line)
+    if match:
+        return line[match.end():].strip()
+    return None
+
+
+def _month_header(line: str):
+    """Return (month, rest_of_line) if the line opens a monthly milestone"""
+    text = line.lstrip('#').strip().lstrip('*_').lstrip()
+    match = _MONTH_RE.match(text)
+    if not match:
+        return None
+    return int(match.group(1)), _strip_emphasis(text[match.end():].lstrip('*_:'))
+
+
+def _title_from(text: str) -> str:
+    # Keep at most the first two sentences of the first line, stopping at inline bullets
+    text = text.split('•', 1)[0]
+    parts = text.split('.')
+    title = parts[0]
+    if len(parts) > 1 and parts[1].strip():
+        title += '.' + parts[1]
+    return title.strip()
+
+
+def parse_action_plan(plan_text: str) -> PlanStructure:
+    """Convert plan markdown into milestones and sections with a single pass over its lines"""
+    structure = PlanStructure()
+    if not plan_text:
+        return structure
+
+    seen_months = set()
+    milestone = None
+    milestone_level = 0
+    section = None
+    first_line = None
+    task = None
+
+    def _finish_task():
+        nonlocal task
+        if task is not None:
+            text = _strip_emphasis(' '.join(task))
+            if len(text) > 3:
+                target = milestone.tasks if milestone is not None else section.items
+                target.append(text)
+            task = None
+
+    def _finish_milestone(end_line):
+        nonlocal milestone, first_line
+        _finish_task()
+        if milestone is not None:
+            milestone.end_line = end_line
+            if not milestone.title:
+                title = _title_from(first_line) if first_line else ''
+                milestone.title = title or f"Month {milestone.month} Milestones"
+            if milestone.month not in seen_months:
+                seen_months.add(milestone.month)
+                structure.milestones.append(milestone)
+        milestone = None
+        first_line = None
+
+    lines = plan_text.splitlines()
+    for index, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        if not line:
+            continue
+        level = _heading_level(line)
+        header = _month_header(line)
+
+        if header is not None:
+            _finish_milestone(index)
+            month, rest = header
+            milestone = PlanMilestone(month=month, title=_title_from(rest) if rest else '', start_line=index)
+            milestone_level = level
+            continue
+
+        if level:
+            # A heading ends the current milestone unless it is nested below the month heading
+            if milestone is not None and (not milestone_level or level <= milestone_level):
+                _finish_milestone(index)
+            _finish_task()
+            heading = _strip_emphasis(line[level:])
+            if milestone is None:
+                section = PlanSection(title=heading, level=level)
+                structure.sections.append(section)
+            elif first_line is None:
+                first_line = heading
+            continue
+
+        if milestone is None and section is None:
+            continue
+
+        indented = len(raw_line) - len(raw_line.lstrip()) > 1
+        bullet = None if indented else _bullet_text(line)
+        if bullet is not None:
+            _finish_task()
+            task = [bullet]
+        elif task is not None:
+            task.append(line)
+        if milestone is not None and first_line is None:
+            first_line = _strip_emphasis(bullet if bullet is not None else line)
+
+    _finish_milestone(len(lines))
+    _finish_task()
+
+    structure.milestones.sort(key=lambda m: m.month)
+    for plan_section in structure.sections:
+        title = plan_section.title.lower()
+        if any(keyword in title for keyword in _COURSE_KEYWORDS):
+            structure.courses.extend(plan_section.items)
+        elif any(keyword in title for keyword in _CHECKPOINT_KEYWORDS):
+            structure.checkpoints.extend(plan_section.items)
+    return structure
+
+
+def milestone_markdown(plan_text: str, milestone: PlanMilestone) -> str:
+    """Return the markdown lines that make up a milestone's section"""
+    return '\n'.join(plan_text.splitlines()[milestone.start_line:milestone.end_line]).strip()
+
+
+def patch_milestones(plan_text: str, structure: PlanStructure, replacements: Dict[int, str]) -> str:
+    """Replace the sections of the given months with new markdown, leaving the rest of the plan untouched"""
+    lines = plan_text.splitlines()
+    targets = [m for m in structure.milestones if m.month in replacements and m.end_line > m.start_line]
+    # Patch from the bottom up so earlier line spans stay valid
+    for milestone in sorted(targets, key=lambda m: m.start_line, reverse=True):
+        new_lines = replacements[milestone.month].strip().splitlines()
+        if milestone.end_line < len(lines):
+            new_lines.append('')
+        lines[milestone.start_line:milestone.end_line] = new_lines
+    return '\n'.join(lines)
@@ -0,0 +1,67 @@
+import math
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class ProgressEngine:
+    """Recompute progress tracker state locally and decide when a plan refresh is worth an LLM call.
+
+    Checking skills off only updates local state. Skills completed since the plan was last refreshed are
+    batched, and a refresh is due once they reach refresh_fraction of the tracked skills and at least
+    debounce_seconds have passed since the previous refresh.
+    """
+
+    def __init__(self, skill_gaps: List[str], refresh_fraction: float = 0.3, debounce_seconds: float = 120.0):
+        # Skill gaps arrive ordered by impact and urgency; that order is kept for the remaining list
+        self.skill_gaps = [gap for gap in skill_gaps if gap and gap.strip().lower() not in ["none", "undefined"]]
+        self.refresh_fraction = refresh_fraction
+        self.debounce_seconds = debounce_seconds
+        self.completed: List[str] = []
+        self.synced: List[str] = []
+        self.last_refresh = 0.0
+
+    def state(self) -> Dict:
+        """Progress tracker fields derived from the current completion set"""
+        total = len(self.skill_gaps)
+        completed = [gap for gap in self.skill_gaps if gap in self.completed]
+        return {
+            "total_skills_needed": total,
+            "skills_completed": len(completed),
+            "completion_percentage": len(completed) / max(total, 1) * 100,
+            "completed_skills": completed,
+            "remaining_skills": [gap for gap in self.skill_gaps if gap not in self.completed],
+            "pending_changes": self.pending_changes(),
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def update(self, completed_skills: List[str]) -> Dict:
+        """Record the user's current completion set and return the recomputed tracker state"""
+        self.completed = [gap for gap in self.skill_gaps if gap in completed_skills]
+        return self.state()
+
+    def pending_changes(self) -> int:
+        """Number of skills completed since the last plan refresh.
+
+        Un-checking a skill is not counted: the incremental update only rewrites months for newly completed
+        skills, so a refresh for removals alone would spend a model call and change nothing.
+        """
+        return len(set(self.completed).difference(self.synced))
+
+    def refresh_threshold(self) -> int:
+        return max(1, math.ceil(len(self.skill_gaps) * self.refresh_fraction))
+
+    def should_refresh(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        if self.pending_changes() < self.refresh_threshold():
+            return False
+        return now - self.last_refresh >= self.debounce_seconds
+
+    def mark_failed(self, now: Optional[float] = None):
+        """Call after a refresh attempt failed: the batch stays pending, but the next try waits out the debounce window"""
+        self.last_refresh = time.time() if now is None else now
+
+    def mark_refreshed(self, now: Optional[float] = None):
+        """Call after the plan has been refreshed with the current completion set"""
+        self.synced = list(self.completed)
+        self.last_refresh = time.time() if now is None else now
@@ -0,0 +1,111 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from career_results import CareerResults
+
+from history_store import decode_results, encode_results, get_history_store, result_key
+
+DEFAULT_MAX_BYTES = int(os.getenv('VISHCRAFT_RESULT_STORE_MB', '64')) * 1024 * 1024
+
+
+class ResultStore:
+    """Process-wide, content-addressed store for run results.
+
+    Sessions keep only a result key; the results themselves are held once, zlib-compressed, under the
+    hash of their encoded content, so identical results from different users share one copy. Entries
+    are evicted least-recently-used once max_bytes is exceeded. Evicted entries are handed to the
+    spill callback (if any) and transparently reloaded on the next get.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 spill: Optional[Callable[[str, bytes], None]] = None,
+                 load: Optional[Callable[[str], Optional[bytes]]] = None):
+        self.max_bytes = max_bytes
+        self._spill = spill
+        self._load = load
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: str):
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def put(self, results: CareerResults) -> str:
+        """Store results and return their content key"""
+        encoded = encode_results(results)
+        key = result_key(encoded)
+        self._insert(key, encoded)
+        return key
+
+    def _insert(self, key: str, encoded: bytes):
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = encoded
+            self._bytes += len(encoded)
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_data = self._entries.popitem(last=False)
+                self._bytes -= len(old_data)
+                evicted.append((old_key, old_data))
+        if self._spill:
+            for old_key, old_data in evicted:
+                try:
+                    self._spill(old_key, old_data)
+                except Exception as e:
+                    print(f"Error spilling result {old_key[:12]}: {str(e)}")
+
+    def get(self, key: str) -> Optional[CareerResults]:
+        """Decode a fresh copy of the results for key (callers may mutate it and put it back)"""
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if encoded is None:
+            encoded = self._load(key) if self._load else None
+            if encoded is None:
+                return None
+            self._insert(key, encoded)
+        return decode_results(encoded)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Process-wide result store, spilling evicted entries that a saved run references to the history database"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            history = get_history_store()
+            _store = ResultStore(spill=history.put_referenced_result_data, load=history.get_result_data)
+        return _store
@@ -1,20 +1,25 @@
 
 
 
-import google.generativeai as genai
 import re
-from typing import List, Dict
+from typing import Callable, List, Dict
 import os
 from dotenv import load_dotenv
 import ast
 
+from key_pool import register_api_key
+from llm_gateway import generate
+from tracing import trace_span
+from stream_parser import iter_response_text, stream_list_items
+
 
 class RoleFitAssistant:
     def __init__(self, api_key: str = None, model: str = 'gemini-2.0-flash'):
         load_dotenv()
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.model = model
-        genai.configure(api_key=self.api_key)
+        # Keys live in the shared pool, each with its own client; genai.configure is process-global
+        register_api_key(self.api_key)
 
     def _infer_personality_traits(self, skills: List[str], interests: List[str]) -> Dict:
         """Micro-agent for personality inference from skills and interests"""
@@ -32,38 +37,43 @@ class RoleFitAssistant:
             f"INSTRUCTIONS: Base personality on Big Five + Holland Code alignment. Be diagnostic and non-generic."
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
-        
-        try:
-            # Clean and extract personality data
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+        with trace_span("personality") as span:
+            response = generate(self.model, prompt)
             
-            personality_data = ast.literal_eval(text)
-            if not isinstance(personality_data, dict):
+            try:
+                # Clean and extract personality data
+                text = response.text.strip()
+                if text.startswith('```'):
+                    text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                
+                personality_data = ast.literal_eval(text)
+                span.set(parse_outcome="literal")
+                if not isinstance(personality_data, dict):
+                    span.set(parse_outcome="fallback")
+                    personality_data = {
+                        'personality_traits': ['adaptable', 'analytical'],
+                        'work_style': 'collaborative',
+                        'preferred_environment': 'structured'
+                    }
+            except Exception:
+                span.set(parse_outcome="fallback")
                 personality_data = {
                     'personality_traits': ['adaptable', 'analytical'],
-                    'work_style': 'collaborative',
+                    'work_style': 'collaborative', 
                     'preferred_environment': 'structured'
                 }
-        except Exception:
-            personality_data = {
-                'personality_traits': ['adaptable', 'analytical'],
-                'work_style': 'collaborative', 
-                'preferred_environment': 'structured'
-            }
         
         return personality_data
 
-    def run(self, input: Dict) -> Dict:
+    def run(self, input: Dict, on_item: Callable[[str, str], None] = None, on_stage: Callable[[str, object], None] = None) -> Dict:
         skills = input.get('skills', [])
         interests = input.get('interests', [])
         experience = input.get('experience', 0)
         
         # Enhanced personality inference
         personality_data = self._infer_personality_traits(skills, interests)
+        if on_stage:
+            on_stage("personality", personality_data)
         
         # Enhanced role matching with personality consideration
         prompt = (
@@ -82,22 +92,35 @@ class RoleFitAssistant:
             f"OUTPUT: Return a Python list of specific job role titles. Each role must match both technical skills AND personality fit."
         )
         
-        model = genai.GenerativeModel(self.model)
-        response = model.generate_content(prompt)
-        
-        try:
-            text = response.text.strip()
-            if text.startswith('```'):
-                text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+        def _emit_role(role):
+            if on_item and role and str(role).lower() != 'undefined':
+                on_item("recommended_roles", role)
+
+        with trace_span("roles", parse_outcome="stream") as span:
+            # Stream the response so each role reaches the caller as soon as it is complete
+            response = generate(self.model, prompt, stream=True)
+            recommended_roles, raw_text = stream_list_items(iter_response_text(response), _emit_role)
             
-            recommended_roles = ast.literal_eval(text)
-            if not isinstance(recommended_roles, list):
-                recommended_roles = [str(response.text)]
-        except Exception:
-            recommended_roles = [str(response.text)]
-        
-        # Filter out any empty or undefined entries
-        recommended_roles = [role for role in recommended_roles if role and str(role).lower() != 'undefined']
+            if recommended_roles is None:
+                try:
+                    text = raw_text.strip()
+                    if text.startswith('```'):
+                        text = re.sub(r'```[a-zA-Z]*\n?', '', text).strip()
+                    
+                    recommended_roles = ast.literal_eval(text)
+                    span.set(parse_outcome="literal")
+                    if not isinstance(recommended_roles, list):
+                        span.set(parse_outcome="fallback")
+                        recommended_roles = [str(raw_text)]
+                except Exception:
+                    span.set(parse_outcome="fallback")
+                    recommended_roles = [str(raw_text)]
+            
+            # Filter out any empty or undefined entries
+            recommended_roles = [role for role in recommended_roles if role and str(role).lower() != 'undefined']
+            span.set(items=len(recommended_roles))
+        if on_stage:
+            on_stage("roles", recommended_roles)
         
         return {
             "recommended_roles": recommended_roles,
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "skill_taxonomy.json")
+
+UNKNOWN_CATEGORY = "Other"
+
+# Match confidence doubles as the radar chart level: exact names and aliases score highest
+EXACT_SCORE = 100
+FUZZY_SCORE = 80
+PARTIAL_SCORE = 65
+UNKNOWN_SCORE = 50
+
+# Keys shorter than this are too ambiguous for typo matching ("go" vs "git")
+_FUZZY_MIN_LENGTH = 4
+
+_NON_KEY_CHARS = re.compile(r"[^a-z0-9+#./&]+")
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    canonical: Optional[str]
+    category: str
+    score: int
+
+
+def normalize_skill(name: str) -> str:
+    """Lowercase, drop punctuation that varies between spellings and collapse whitespace"""
+    return " ".join(_NON_KEY_CHARS.sub(" ", str(name).lower()).split()).strip(" .")
+
+
+def _deletions(key: str):
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class SkillTaxonomy:
+    """Hash index over canonical skill names and aliases with single-edit fuzzy matching.
+
+    Exact and alias lookups are one dict probe on the normalized name. Misses fall back to a
+    symmetric-deletion index (built lazily on the first miss), which finds keys within one
+    insertion, deletion, substitution or transposition without scanning the taxonomy.
+    """
+
+    def __init__(self, categories: Dict[str, Dict[str, List[str]]]):
+        self._index: Dict[str, Tuple[str, str]] = {}
+        for category, skills in categories.items():
+            for canonical, aliases in skills.items():
+                for name in [canonical] + list(aliases):
+                    key = normalize_skill(name)
+                    if key and key not in self._index:
+                        self._index[key] = (canonical, category)
+        self._fuzzy: Optional[Dict[str, List[str]]] = None
+        self._fuzzy_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._index)
+
+    @classmethod
+    def from_file(cls, path: str = TAXONOMY_PATH) -> 'SkillTaxonomy':
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["categories"])
+
+    def _fuzzy_index(self) -> Dict[str, List[str]]:
+        if self._fuzzy is None:
+            with self._fuzzy_lock:
+                if self._fuzzy is None:
+                    fuzzy: Dict[str, List[str]] = {}
+                    for key in self._index:
+                        if len(key) >= _FUZZY_MIN_LENGTH:
+                            for variant in _deletions(key):
+                                fuzzy.setdefault(variant, []).append(key)
+                    self._fuzzy = fuzzy
+        return self._fuzzy
+
+    def _fuzzy_key(self, key: str) -> Optional[str]:
+        if len(key) < _FUZZY_MIN_LENGTH:
+            return None
+        fuzzy = self._fuzzy_index()
+        candidates = list(fuzzy.get(key, []))  # query is missing one character
+        for variant in _deletions(key):
+            if variant in self._index and len(variant) >= _FUZZY_MIN_LENGTH:
+                candidates.append(variant)  # query has one extra character
+            candidates.extend(fuzzy.get(variant, []))  # substitution or transposition
+        if not candidates:
+            return None
+        # Prefer the closest length, then the alphabetically first key for determinism
+        return min(candidates, key=lambda candidate: (abs(len(candidate) - len(key)), candidate))
+
+    def classify(self, skill: str) -> SkillMatch:
+        # Most inputs only differ from their key by case, so try that before full normalization
+        hit = self._index.get(skill.lower())
+        if hit:
+            return SkillMatch(skill, hit[0], hit[1], EXACT_SCORE)
+        key = normalize_skill(skill)
+        hit = self._index.get(key)
+        if hit:
+            return SkillMatch(skill, hit[0], hit[1], EXACT_SCORE)
+
+        fuzzy_key = self._fuzzy_key(key)
+        if fuzzy_key:
+            canonical, category = self._index[fuzzy_key]
+            return SkillMatch(skill, canonical, category, FUZZY_SCORE)
+
+        # Multi-word skills such as "advanced python programming": use the longest known word run
+        words = key.split()
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size + 1):
+                hit = self._index.get(" ".join(words[start:start + size]))
+                if hit:
+                    return SkillMatch(skill, hit[0], hit[1], PARTIAL_SCORE)
+
+        return SkillMatch(skill, None, UNKNOWN_CATEGORY, UNKNOWN_SCORE)
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    """Load the bundled taxonomy once per process"""
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = SkillTaxonomy.from_file()
+        return _taxonomy
+
+
+@lru_cache(maxsize=65536)
+def classify_skill(skill: str) -> SkillMatch:
+    return get_taxonomy().classify(skill)
+
+
+@lru_cache(maxsize=1024)
+def classify_skills(skills: Tuple[str, ...]) -> Tuple[SkillMatch, ...]:
+    """Classify a skill list; results are cached per list (pass a tuple)"""
+    return tuple(classify_skill(skill) for skill in skills)
@@ -0,0 +1,104 @@
+import ast
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+class IncrementalListParser:
+    """Incrementally parse a streamed Python/JSON list literal, emitting each element as soon as it closes"""
+
+    _OPENERS = '[{('
+    _CLOSERS = ']})'
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.started = False
+        self.complete = False
+        self._depth = 0
+        self._quote = None
+        self._escape = False
+        self._item: List[str] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume the next piece of the stream and return the elements completed by it"""
+        emitted = []
+        for ch in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                # Skip code fences and any preamble before the list opens
+                if ch == '[':
+                    self.started = True
+                continue
+            if self._quote:
+                self._item.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+                continue
+            if ch == '"' or ch == "'":
+                self._quote = ch
+            elif ch in self._OPENERS:
+                self._depth += 1
+            elif ch in self._CLOSERS:
+                if self._depth == 0:
+                    self._emit(emitted)
+                    self.complete = True
+                    continue
+                self._depth -= 1
+            elif ch == ',' and self._depth == 0:
+                self._emit(emitted)
+                continue
+            self._item.append(ch)
+        return emitted
+
+    def close(self) -> List[Any]:
+        """Flush a trailing element left open by a truncated stream"""
+        emitted = []
+        if self.started and not self.complete and not self._quote and self._depth == 0:
+            self._emit(emitted)
+        return emitted
+
+    def _emit(self, emitted: List[Any]):
+        source = ''.join(self._item).strip()
+        self._item = []
+        if not source:
+            return
+        try:
+            value = ast.literal_eval(source)
+        except Exception:
+            value = source.strip('\'" ')
+        self.items.append(value)
+        emitted.append(value)
+
+
+def iter_response_text(response) -> Iterable[str]:
+    """Yield the text of each chunk of a streamed generate_content response"""
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks carrying only finish metadata have no text parts
+            continue
+        if text:
+            yield text
+
+
+def stream_list_items(chunks: Iterable[str], on_item: Optional[Callable[[Any], None]] = None) -> Tuple[Optional[List[Any]], str]:
+    """Parse a streamed list, calling on_item for each element as it arrives.
+
+    Returns the parsed list (None if the stream never held a complete list) and the full text,
+    so callers can apply their usual fallbacks to unparseable responses.
+    """
+    parser = IncrementalListParser()
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        for item in parser.feed(chunk):
+            if on_item:
+                on_item(item)
+    for item in parser.close():
+        if on_item:
+            on_item(item)
+    return (parser.items if parser.complete else None), ''.join(parts)
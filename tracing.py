@@ -0,0 +1,309 @@
+import argparse
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+DEFAULT_TRACE_PATH = os.getenv('VISHCRAFT_TRACE_FILE', 'vishcraft_traces.jsonl')
+TRACING_ENABLED = os.getenv('VISHCRAFT_TRACING', '1').lower() not in ('0', 'false', 'no')
+# The trace file rolls over to <path>.1, <path>.2, ... once it reaches this size; 0 disables rotation
+DEFAULT_TRACE_MAX_BYTES = int(float(os.getenv('VISHCRAFT_TRACE_MAX_MB', '50')) * 1024 * 1024)
+DEFAULT_TRACE_BACKUPS = int(os.getenv('VISHCRAFT_TRACE_BACKUPS', '3'))
+# Recent durations kept per span name for in-process percentiles
+AGGREGATE_WINDOW = 2000
+
+# Span kinds: a whole graph run, one of its stages, one assistant call (prompt + parse), one model request
+RUN = "run"
+STAGE = "stage"
+CALL = "call"
+LLM = "llm"
+
+_current = contextvars.ContextVar('trace_span', default=None)
+
+
+class Span:
+    """One timed operation; attributes hold model, queue wait, token counts, cache hit and parse outcome"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "_started", "wall_ms", "status", "attrs", "_ended")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, **attrs):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.wall_ms = None
+        self.status = "ok"
+        self.attrs = attrs
+        self._ended = False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self, error: Exception = None):
+        """Finish the span and hand it to the tracer; later calls are ignored"""
+        if self._ended:
+            return
+        self._ended = True
+        self.wall_ms = (time.perf_counter() - self._started) * 1000
+        if error is not None:
+            self.status = "error"
+            self.attrs["error"] = f"{type(error).__name__}: {str(error)}"[:300]
+        get_tracer().export(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "wall_ms": round(self.wall_ms, 3) if self.wall_ms is not None else None,
+            "status": self.status,
+            **self.attrs
+        }
+
+
+class JsonlExporter:
+    """Appends each finished span as one JSON line, rolling the file over once it reaches max_bytes"""
+
+    def __init__(self, path: str = DEFAULT_TRACE_PATH, max_bytes: int = DEFAULT_TRACE_MAX_BYTES,
+                 backups: int = DEFAULT_TRACE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate_if_needed(self, incoming: int):
+        if self.max_bytes <= 0 or self._size + incoming <= self.max_bytes:
+            return
+        self._file.close()
+        # Another process sharing the file may have rolled it over already; then just reopen the new one
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + incoming > self.max_bytes:
+            for index in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"):
+                    os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            if self.backups > 0:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+        self._open()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        size = len(line.encode("utf-8"))
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._rotate_if_needed(size)
+            self._file.write(line)
+            self._file.flush()
+            self._size += size
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class TraceAggregator:
+    """In-process rollup of finished spans by (kind, name)"""
+
+    def __init__(self, window: int = AGGREGATE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._groups: Dict[tuple, Dict] = {}
+
+    def export(self, span: Span):
+        self.add(span.to_dict())
+
+    def add(self, record: Dict):
+        """Fold one span record (as exported to JSONL) into the rollup"""
+        key = (record.get("kind"), record.get("name"))
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = {
+                    "count": 0, "errors": 0, "wall_ms": deque(maxlen=self.window), "queue_wait_ms": 0.0,
+                    "prompt_tokens": 0, "response_tokens": 0, "cache_hits": 0, "cache_lookups": 0, "parse": {}
+                }
+            group["count"] += 1
+            group["errors"] += record.get("status") == "error"
+            group["wall_ms"].append(record.get("wall_ms") or 0.0)
+            group["queue_wait_ms"] += record.get("queue_wait_ms") or 0.0
+            group["prompt_tokens"] += record.get("prompt_tokens") or 0
+            group["response_tokens"] += record.get("response_tokens") or 0
+            if "cache_hit" in record:
+                group["cache_lookups"] += 1
+                group["cache_hits"] += bool(record["cache_hit"])
+            if "parse_outcome" in record:
+                outcome = record["parse_outcome"]
+                group["parse"][outcome] = group["parse"].get(outcome, 0) + 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per "kind:name": count, error count, p50/p95/p99 wall time, mean queue wait, tokens, cache hit rate, parse outcomes"""
+        with self._lock:
+            groups = {key: dict(group, wall_ms=list(group["wall_ms"]), parse=dict(group["parse"])) for key, group in self._groups.items()}
+        summary = {}
+        for (kind, name), group in sorted(groups.items()):
+            wall = group["wall_ms"]
+            summary[f"{kind}:{name}"] = {
+                "count": group["count"],
+                "errors": group["errors"],
+                "p50_ms": round(_percentile(wall, 0.50), 3),
+                "p95_ms": round(_percentile(wall, 0.95), 3),
+                "p99_ms": round(_percentile(wall, 0.99), 3),
+                "mean_queue_wait_ms": round(group["queue_wait_ms"] / group["count"], 3),
+                "prompt_tokens": group["prompt_tokens"],
+                "response_tokens": group["response_tokens"],
+                "cache_hit_rate": group["cache_hits"] / group["cache_lookups"] if group["cache_lookups"] else None,
+                "parse": group["parse"]
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._groups.clear()
+
+
+class Tracer:
+    """Creates spans and fans finished ones out to the exporters"""
+
+    def __init__(self, exporters: List = None, enabled: bool = TRACING_ENABLED):
+        self.enabled = enabled
+        self.aggregator = TraceAggregator()
+        self.exporters = [self.aggregator] + list(exporters if exporters is not None else [JsonlExporter()])
+
+    def export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                # Tracing must never break the pipeline it observes
+                print(f"Trace export failed: {str(e)}")
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off"""
+
+    def set(self, **attrs):
+        pass
+
+    def end(self, error: Exception = None):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def start_span(name: str, kind: str = CALL, **attrs):
+    """Start a child of the current span without making it current; the caller must end() it"""
+    if not get_tracer().enabled:
+        return _NOOP
+    return Span(name, kind, _current.get(), **attrs)
+
+
+@contextmanager
+def trace_span(name: str, kind: str = CALL, **attrs):
+    """Time the enclosed block as a span nested under the current one"""
+    if not get_tracer().enabled:
+        yield _NOOP
+        return
+    span = Span(name, kind, _current.get(), **attrs)
+    token = _current.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.end(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+
+
+def current_span():
+    return _current.get() or _NOOP
+
+
+def read_spans(path: str = DEFAULT_TRACE_PATH, since: float = None) -> List[Dict]:
+    """Load exported spans from a JSONL trace file, skipping lines that do not parse"""
+    spans = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or span.get("start", 0) >= since:
+                    spans.append(span)
+    except FileNotFoundError:
+        pass
+    return spans
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer writing to VISHCRAFT_TRACE_FILE"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    """Replace the process-wide tracer (e.g. a different trace file, or enabled=False)"""
+    global _tracer
+    with _tracer_lock:
+        _tracer = tracer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize spans from a trace file")
+    parser.add_argument("path", nargs="?", default=DEFAULT_TRACE_PATH)
+    parser.add_argument("--since-hours", type=float, default=None, help="Only spans started in the last N hours")
+    args = parser.parse_args(argv)
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    aggregator = TraceAggregator(window=10 ** 9)
+    for record in read_spans(args.path, since=since):
+        aggregator.add(record)
+    print(f"{'span':<34}{'count':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queue ms':>10}{'tokens in/out':>16}  parse")
+    for name, row in aggregator.summary().items():
+        tokens = f"{row['prompt_tokens']}/{row['response_tokens']}" if row["prompt_tokens"] or row["response_tokens"] else ""
+        parse = ", ".join(f"{outcome}={count}" for outcome, count in row["parse"].items())
+        print(f"{name:<34}{row['count']:>7}{row['errors']:>5}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+              f"{row['mean_queue_wait_ms']:>10.1f}{tokens:>16}  {parse}")
+
+
+if __name__ == "__main__":
+    main()